@@ -0,0 +1,59 @@
+// Searches the offline catalog on the create forms and links the results to the form prefilled from them.
+(function () {
+    var container = document.getElementById('bv-catalog');
+    if (!container) {
+        return;
+    }
+    var input = container.querySelector('input');
+    var list = container.querySelector('ul');
+    var delay = 200;
+    var timer = null;
+    var latest = '';
+
+    function escape(text) {
+        return String(text).replace(/[&<>"]/g, function (c) { return '&#' + c.charCodeAt(0) + ';'; });
+    }
+
+    function link(url, key, text) {
+        return '<a href="' + url + '?catalog=' + encodeURIComponent(key) + '">' + escape(text) + '</a>';
+    }
+
+    function render(results) {
+        list.innerHTML = results.map(function (result) {
+            if (container.dataset.target === 'author') {
+                return result.author_key ?
+                    '<li>' + link(window.location.pathname, result.author_key, result.author_name) +
+                    ' <span class="uk-text-muted">' + escape(result.title) + '</span></li>' : '';
+            }
+            var author = result.author_name ?
+                ' <span class="uk-text-muted">' + escape(result.author_name) + '</span>' : '';
+            if (result.author_key && !result.author_id) {
+                // the author has to be added before the book can refer to it.
+                author += ' ' + link(container.dataset.authorUrl, result.author_key, '+');
+            }
+            return '<li>' + link(window.location.pathname, result.key, result.title) + author + '</li>';
+        }).join('');
+    }
+
+    function search() {
+        var query = input.value.trim();
+        latest = query;
+        if (!query) {
+            render([]);
+            return;
+        }
+        fetch(container.dataset.url + '?q=' + encodeURIComponent(query), {credentials: 'same-origin'})
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                // responses of superseded queries may arrive late.
+                if (query === latest) {
+                    render(data.results);
+                }
+            });
+    }
+
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(search, delay);
+    });
+})();
@@ -0,0 +1,75 @@
+// Renders progress of the user's active background jobs on the dashboard.
+// Updates come from the job events stream, or from polling the job list where streams are not served.
+(function () {
+    var container = document.getElementById('bv-jobs');
+    if (!container) {
+        return;
+    }
+    var interval = 2000;
+    var hadJobs = false;
+
+    function render(jobs) {
+        container.innerHTML = jobs.map(function (job) {
+            var text = job.message || job.name;
+            return '<div class="uk-margin-small uk-text-small uk-text-muted">' +
+                text.replace(/[&<>"]/g, function (c) { return '&#' + c.charCodeAt(0) + ';'; }) +
+                '<progress class="uk-progress uk-margin-remove" value="' + job.progress + '" max="100"></progress>' +
+                '</div>';
+        }).join('');
+    }
+
+    function update(jobs) {
+        render(jobs);
+        if (jobs.length) {
+            hadJobs = true;
+        }
+    }
+
+    function finish() {
+        if (hadJobs) {
+            // the jobs changed the data shown on the page.
+            window.location.reload();
+        }
+    }
+
+    function poll() {
+        fetch(container.dataset.url, {credentials: 'same-origin'})
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                update(data.jobs);
+                if (data.jobs.length) {
+                    setTimeout(poll, interval);
+                } else {
+                    finish();
+                }
+            });
+    }
+
+    function listen() {
+        var source = new EventSource(container.dataset.eventsUrl);
+        var received = false;
+        source.addEventListener('jobs', function (event) {
+            received = true;
+            update(JSON.parse(event.data));
+        });
+        source.addEventListener('done', function () {
+            source.close();
+            finish();
+        });
+        source.onerror = function () {
+            source.close();
+            // the stream is not served or was interrupted.
+            if (received) {
+                listen();
+            } else {
+                poll();
+            }
+        };
+    }
+
+    if (window.EventSource && container.dataset.eventsUrl) {
+        listen();
+    } else {
+        poll();
+    }
+})();
@@ -0,0 +1,86 @@
+// Filters, sorts and pages the dashboard lists by loading only the list fragment and swapping it in place.
+(function () {
+    var list = document.getElementById('bv-list');
+    if (!list) {
+        return;
+    }
+    var form = document.querySelector('#bv-filter form');
+    var latest = '';
+
+    function syncForm(params) {
+        if (!form) {
+            return;
+        }
+        Array.prototype.forEach.call(form.elements, function (element) {
+            if (!element.name) {
+                return;
+            }
+            if (element.type === 'checkbox' || element.type === 'radio') {
+                element.checked = params.getAll(element.name).indexOf(element.value) >= 0;
+            } else if (element.type !== 'submit') {
+                element.value = params.get(element.name) || '';
+            }
+        });
+    }
+
+    function syncLinks(params) {
+        // links passing the list query on, such as the export.
+        var query = new URLSearchParams(params);
+        query.delete('page');
+        Array.prototype.forEach.call(document.querySelectorAll('[data-keep-query]'), function (link) {
+            link.search = query.toString();
+        });
+    }
+
+    function load(url, push) {
+        latest = url;
+        fetch(url, {credentials: 'same-origin', headers: {'X-Fragment': '1'}})
+            .then(function (response) {
+                // expired sessions are redirected to the login page.
+                if (!response.ok || response.redirected) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                // responses of superseded requests may arrive late.
+                if (url !== latest) {
+                    return;
+                }
+                list.innerHTML = html;
+                if (push) {
+                    history.pushState(null, '', url);
+                }
+                var params = new URL(url, window.location.href).searchParams;
+                syncForm(params);
+                syncLinks(params);
+            })
+            .catch(function () {
+                window.location.href = url;
+            });
+    }
+
+    list.addEventListener('click', function (event) {
+        var link = event.target.closest('a');
+        if (!link || link.hasAttribute('disabled') || event.ctrlKey || event.metaKey || event.shiftKey) {
+            return;
+        }
+        if (link.origin !== window.location.origin || link.pathname !== window.location.pathname) {
+            return;
+        }
+        event.preventDefault();
+        load(link.href, true);
+    });
+
+    if (form) {
+        form.addEventListener('submit', function (event) {
+            event.preventDefault();
+            var query = new URLSearchParams(new FormData(form));
+            load(window.location.pathname + '?' + query.toString(), true);
+        });
+    }
+
+    window.addEventListener('popstate', function () {
+        load(window.location.href, false);
+    });
+})();
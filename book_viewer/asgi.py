@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'book_viewer.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from viewer.streaming import StreamingRouter  # noqa: E402 the app registry has to be ready
+from viewer.warmup import warmup_on_startup  # noqa: E402
+
+application = StreamingRouter(django_application)
+
+warmup_on_startup()
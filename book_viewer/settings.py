@@ -23,9 +23,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ.get('SECRET_KEY', default='foo')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.environ.get('DEBUG', default=True)
+DEBUG = os.environ.get('DEBUG', default='True').lower() in ('true', '1', 'yes')
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', default='').split(',') if host]
 
 
 # Application definition
@@ -44,29 +44,34 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
-    'viewer'
+    'viewer.apps.ViewerConfig'
 ]
 
 INSTALLED_APPS = DJANGO_APPS + LOCAL_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'viewer.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'viewer.middleware.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'book_viewer.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates']
-        ,
-        'APP_DIRS': True,
+        'DIRS': [BASE_DIR / 'templates'],
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -74,6 +79,8 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # compiled templates are kept in memory unless they are edited during development.
+            'loaders': TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
         },
     },
 ]
@@ -145,6 +152,16 @@ STATICFILES_DIRS = [
     BASE_DIR / 'assets'
 ]
 
+# `collectstatic` writes content hashed names with a manifest and gzip and brotli variants, see `viewer.storage`.
+# Templates reference the hashed names when DEBUG is disabled, so run `collectstatic` on every deployment.
+STATICFILES_STORAGE = 'viewer.storage.CompressedManifestStaticFilesStorage'
+
+# Serve the collected files by `viewer.middleware.StaticFilesMiddleware`, unless a web server in front does it.
+STATIC_SERVE = os.environ.get('STATIC_SERVE', default=str(not DEBUG)).lower() in ('true', '1', 'yes')
+
+# Seconds browsers keep files with hashed names, which never change.
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
 
 # MEDIA FILES CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#media-root
@@ -152,3 +169,96 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = '/media/'
+
+
+# BACKGROUND JOBS CONFIGURATION
+# Jobs are stored in the database and executed by `./manage.py run_workers`.
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', default=3))
+
+# Base delay in seconds before a failed job is retried, doubled on every attempt.
+JOBS_RETRY_DELAY = int(os.environ.get('JOBS_RETRY_DELAY', default=10))
+
+# Seconds without a progress report after which a running job is considered abandoned by a dead worker.
+JOBS_STALE_TIMEOUT = int(os.environ.get('JOBS_STALE_TIMEOUT', default=30 * 60))
+
+# Seconds an idle worker waits before checking the queue again.
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', default=1))
+
+
+# FILTER FACETS CONFIGURATION
+# Seconds to keep facet counts cached. Cache keys include the library version, so changes are visible at once.
+FACETS_CACHE_TIMEOUT = 60 * 60
+
+# Maximum number of values shown in a facet panel.
+FACETS_MAX_VALUES = 10
+
+
+# CHANGE LOG CONFIGURATION
+# Days to keep tombstones of deleted objects. Clients which did not sync for longer have to download everything.
+CHANGELOG_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('CHANGELOG_TOMBSTONE_RETENTION_DAYS', default=30))
+
+# Seconds before a change log entry is served, so entries of transactions committed out of order are not skipped.
+CHANGELOG_SETTLE_DELAY = float(os.environ.get('CHANGELOG_SETTLE_DELAY', default=2))
+
+
+# STREAMING CONFIGURATION
+# Streaming views (exports, job events) are served natively under ASGI, see `viewer.streaming`.
+# Threads running their database queries, independent of the threads of the regular views.
+STREAMING_DATABASE_THREADS = int(os.environ.get('STREAMING_DATABASE_THREADS', default=4))
+
+# Seconds between comments sent on idle event streams to keep them open.
+STREAMING_HEARTBEAT_INTERVAL = 15
+
+
+# REQUEST PROFILER CONFIGURATION
+# Staff users get a request profiled by sending the header or the query parameter, see `viewer.middleware`.
+PROFILER_HEADER = 'HTTP_X_PROFILE'
+
+PROFILER_QUERY_PARAM = '_profile'
+
+# Directory with the captured profiles, only the latest captures are kept.
+PROFILER_DIR = os.environ.get('PROFILER_DIR', default=BASE_DIR / 'profiles')
+
+PROFILER_MAX_CAPTURES = int(os.environ.get('PROFILER_MAX_CAPTURES', default=50))
+
+# Number of functions listed in the text report.
+PROFILER_REPORT_LINES = 60
+
+
+# DELETION CONFIGURATION
+# Bookcases and authors are hidden at once and deleted by background jobs in transactions of this many
+# slots or books, see `viewer.deletion`.
+DELETION_CHUNK_SIZE = int(os.environ.get('DELETION_CHUNK_SIZE', default=500))
+
+
+# PAGE CACHE CONFIGURATION
+# Rendered dashboard lists are cached compressed per user, query and library version, see `viewer.page_cache`.
+# `memory` keeps them in every worker process, `disk` in a directory shared by the workers, empty disables it.
+PAGE_CACHE_BACKEND = os.environ.get('PAGE_CACHE_BACKEND', default='' if DEBUG else 'memory')
+
+# Bytes of compressed pages kept, the least recently used pages are evicted above it.
+PAGE_CACHE_MAX_SIZE = int(os.environ.get('PAGE_CACHE_MAX_SIZE', default=64 * 2 ** 20))
+
+PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR', default=BASE_DIR / 'page_cache')
+
+# Seconds a page is served, which bounds how long pages rendered by the templates of a previous deployment live.
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+
+# BOOKCASE CONFIGURATION
+# Largest bookcases users can create. The bookcase grid reads all slots by one query, see `viewer.tables.BookcaseGrid`.
+BOOKCASE_MAX_SHELVES = int(os.environ.get('BOOKCASE_MAX_SHELVES', default=50))
+
+BOOKCASE_MAX_SHELF_CAPACITY = int(os.environ.get('BOOKCASE_MAX_SHELF_CAPACITY', default=50))
+
+
+# ADMIN CONFIGURATION
+# Admin lists of tables with more rows than this show an estimated number of rows instead of counting them.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+# STARTUP WARMUP CONFIGURATION
+# Compile templates and build URL resolvers when the application is loaded, before the first request,
+# see `viewer.warmup`. Loading the WSGI application in the master process (e.g. `gunicorn --preload`)
+# shares the warmed up state with all forked workers.
+WARMUP_ON_STARTUP = os.environ.get('WARMUP_ON_STARTUP', default=str(not DEBUG)).lower() in ('true', '1', 'yes')
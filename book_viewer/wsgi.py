@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'book_viewer.settings')
 
 application = get_wsgi_application()
+
+from viewer.warmup import warmup_on_startup  # noqa: E402 the app registry has to be ready
+
+warmup_on_startup()
@@ -1,9 +1,148 @@
+from functools import reduce
+from operator import or_
+from typing import Callable, Optional
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, Max
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.translation import ugettext_lazy as _
+
+from viewer.models import Bookcase, Book, BookAuthor, BookcaseSlot, Job, ProfileCapture
+from viewer.utils import collation_key, prefix_q
+
+
+def estimate_count(queryset) -> int:
+    """Estimated number of rows of the model table, read without scanning it.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+    # the largest primary key is read from the index and is close enough for auto-incremented keys.
+    return model._default_manager.using(queryset.db).aggregate(last=Max('pk'))['last'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using the table size estimate instead of `COUNT(*)` for unfiltered big tables.
+    """
+    @cached_property
+    def count(self) -> int:
+        if not self.object_list.query.where:
+            estimate = estimate_count(self.object_list)
+            if estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(ModelAdmin):
+    """Admin for tables too big for full counts, sorting by any column and substring search.
+
+    Lists are ordered by the primary key and can be sorted only by indexed columns, the pages are
+    still offsets of that index scan. The search matches the primary key or prefixes of the
+    `search_prefixes` fields, normalized by the paired function, so every search is an index range scan.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    sortable_by = ('id',)
+    search_prefixes: tuple[tuple[str, Optional[Callable[[str], str]]], ...] = ()
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        # shows the search box, the search itself is done by `get_search_results`.
+        self.search_fields = [field_name for field_name, _normalize in self.search_prefixes]
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        conditions = [prefix_q(field_name, normalize(search_term) if normalize else search_term)
+                      for field_name, normalize in self.search_prefixes]
+        if search_term.isdigit():
+            conditions.append(Q(pk=int(search_term)))
+        if not conditions:
+            # a text search of a model searched by the primary key only.
+            return queryset.none(), False
+        return queryset.filter(reduce(or_, conditions)), False
+
+
+@admin.register(Bookcase)
+class BookcaseAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'user', 'is_deleted')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    sortable_by = ('id', 'name')
+    search_prefixes = (
+        ('name', None),
+    )
+
+
+@admin.register(BookcaseSlot)
+class BookcaseSlotAdmin(LargeTableAdmin):
+    list_display = ('id', 'bookcase', 'bookshelf_number', 'number')
+    list_select_related = ('bookcase',)
+    raw_id_fields = ('bookcase',)
+
+
+@admin.register(BookAuthor)
+class BookAuthorAdmin(LargeTableAdmin):
+    list_display = ('id', 'lastname', 'firstname', 'is_deleted')
+    sortable_by = ('id', 'lastname')
+    search_prefixes = (
+        ('lastname', None),
+        ('firstname', None),
+    )
+
+
+@admin.register(Book)
+class BookAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'author', 'bookcase_slot', 'owner')
+    list_select_related = ('author', 'bookcase_slot__bookcase', 'owner')
+    raw_id_fields = ('bookcase_slot',)
+    autocomplete_fields = ('author',)
+    search_prefixes = (
+        ('sort_name', collation_key),
+    )
+
+    def get_queryset(self, request):
+        # the book queryset selects related objects on every filter, so the changelist skips `list_select_related`.
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'status', 'progress', 'attempts', 'user', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(ProfileCapture)
+class ProfileCaptureAdmin(ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'view_name', 'status_code', 'duration', 'query_count',
+                    'query_duration', 'user')
+    list_filter = ('view_name',)
+    list_select_related = ('user',)
+    fields = ('created_at', 'user', 'method', 'path', 'view_name', 'status_code', 'duration', 'query_count',
+              'query_duration', 'file_name', 'report')
+    readonly_fields = fields
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        return False
 
-from viewer.models import Bookcase, Book, BookAuthor, BookcaseSlot
+    def has_change_permission(self, request, obj=None):
+        return False
 
-admin.site.register(Bookcase, ModelAdmin)
-admin.site.register(BookcaseSlot, ModelAdmin)
-admin.site.register(BookAuthor, ModelAdmin)
-admin.site.register(Book, ModelAdmin)
+    def report(self, obj: 'ProfileCapture') -> str:
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', obj.read_report())
+    report.short_description = _('Report')
@@ -0,0 +1,304 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.files.storage import default_storage
+from django.db.models import Q, QuerySet
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.views.generic import View
+from django_filters import FilterSet
+
+from viewer.filters import BookFilter, BookcaseFilter, BookAuthorFilter
+from viewer.models import Book, Bookcase, BookcaseSlot, BookAuthor, Library, ChangeLogEntry, ChangeLogCompaction
+
+
+def media_url(name: Optional[str]) -> Optional[str]:
+    return default_storage.url(name) if name else None
+
+
+class ApiError(Exception):
+    """Error of the API request rendered as a JSON response.
+    """
+    def __init__(self, errors: dict, status: int = 400):
+        super().__init__(errors)
+        self.errors = errors
+        self.status = status
+
+
+class ApiListView(LoginRequiredMixin, View):
+    """Base view for read-only JSON lists with sparse fieldsets and cursor pagination.
+
+    Rows are read with `values_list()` of the requested fields only, so no model instances
+    are built. Pages are selected by a keyset condition on the ordering fields of the last
+    row instead of an offset, so every page costs the same.
+    """
+    filterset_class: type[FilterSet] = None
+    # public field name: ORM lookup.
+    fields: dict[str, str] = {}
+    default_fields: tuple[str, ...] = ()
+    converters: dict[str, Callable] = {}
+    ordering: tuple[str, ...] = ('-id',)
+    page_size = 50
+    max_page_size = 500
+
+    def handle_no_permission(self):
+        return JsonResponse({'errors': {'detail': 'Authentication credentials were not provided.'}}, status=401)
+
+    def get_queryset(self) -> QuerySet:
+        raise NotImplementedError
+
+    def get_version(self) -> str:
+        """Version of the data behind the list, used as a part of the ETag.
+
+        The lists hold the user's objects only, and every change of them bumps the library version.
+        """
+        return f'{self.request.user.pk}:{Library.get_version(self.request.user.pk)}'
+
+    def get(self, request, *args, **kwargs):
+        etag = self.make_etag(self.get_version())
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            # `304 Not Modified` has to repeat the headers of the full response.
+            return self.set_cache_headers(response, etag)
+        try:
+            data = self.get_data()
+        except ApiError as error:
+            return JsonResponse({'errors': error.errors}, status=error.status)
+        return self.set_cache_headers(JsonResponse(data), etag)
+
+    @staticmethod
+    def set_cache_headers(response: 'HttpResponse', etag: str) -> 'HttpResponse':
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def make_etag(self, version: str) -> str:
+        digest = hashlib.md5(f'{version}:{self.request.get_full_path()}'.encode()).hexdigest()
+        return f'"{digest}"'
+
+    def get_data(self) -> dict:
+        filterset = self.filterset_class(self.request.GET, queryset=self.get_queryset(), request=self.request)
+        if not filterset.is_valid():
+            raise ApiError(filterset.errors)
+        queryset = filterset.qs
+        fields = self.get_fields()
+        ordering = self.get_ordering(queryset)
+        page_size = self.get_page_size()
+
+        queryset = queryset.order_by(*ordering)
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_condition(ordering, self.decode_cursor(cursor, ordering)))
+
+        ordering_lookups = [field.lstrip('-') for field in ordering]
+        lookups = [self.fields[field] for field in fields]
+        rows = list(queryset.values_list(*lookups, *ordering_lookups)[:page_size + 1])
+
+        converters = [self.converters.get(field) for field in fields]
+        results = []
+        for row in rows[:page_size]:
+            item = {}
+            for field, converter, value in zip(fields, converters, row):
+                item[field] = converter(value) if converter else value
+            results.append(item)
+
+        next_url = None
+        if len(rows) > page_size:
+            query = self.request.GET.copy()
+            query['cursor'] = self.encode_cursor(rows[page_size - 1][len(lookups):])
+            next_url = self.request.build_absolute_uri(f'{self.request.path}?{query.urlencode()}')
+        return {'results': results, 'next': next_url}
+
+    def get_fields(self) -> list[str]:
+        fields_param = self.request.GET.get('fields')
+        if not fields_param:
+            return list(self.default_fields or self.fields)
+        fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in self.fields]
+        if unknown:
+            raise ApiError({'fields': [f'Unknown fields: {", ".join(unknown)}.']})
+        return fields
+
+    def get_ordering(self, queryset: QuerySet) -> list[str]:
+        ordering = list(queryset.query.order_by or self.ordering)
+        # the primary key makes the ordering total, so keyset pages never skip or repeat rows.
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+    def get_page_size(self) -> int:
+        try:
+            page_size = int(self.request.GET.get('limit', self.page_size))
+        except ValueError:
+            raise ApiError({'limit': ['A whole number is required.']})
+        return max(1, min(page_size, self.max_page_size))
+
+    @staticmethod
+    def encode_cursor(values: tuple) -> str:
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str, ordering: list[str]) -> list:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, binascii.Error):
+            values = None
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ApiError({'cursor': ['Invalid cursor.']})
+        return values
+
+    @staticmethod
+    def get_keyset_condition(ordering: list[str], values: list) -> 'Q':
+        """Condition selecting rows after the given values in the lexicographic ordering.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            field = field.lstrip('-')
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+
+class BookApiListView(ApiListView):
+    """JSON list of the user's books.
+    """
+    filterset_class = BookFilter
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'picture': 'picture',
+        'author_id': 'author_id',
+        'author_firstname': 'author__firstname',
+        'author_lastname': 'author__lastname',
+        'bookcase_slot_id': 'bookcase_slot_id',
+        'bookcase_id': 'bookcase_slot__bookcase_id',
+        'bookcase_name': 'bookcase_slot__bookcase__name',
+        'bookshelf_number': 'bookcase_slot__bookshelf_number',
+        'slot_number': 'bookcase_slot__number',
+    }
+    default_fields = ('id', 'name', 'picture', 'author_id', 'bookcase_slot_id')
+    converters = {
+        'picture': media_url
+    }
+
+    def get_queryset(self):
+        return Book.objects.visible().filter(owner=self.request.user)
+
+
+class BookcaseApiListView(ApiListView):
+    """JSON list of the user's bookcases.
+    """
+    filterset_class = BookcaseFilter
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'slot_count': 'stats__slot_count',
+        'occupied_slot_count': 'stats__occupied_slot_count',
+    }
+    default_fields = ('id', 'name')
+
+    def get_queryset(self):
+        return Bookcase.objects.filter(user=self.request.user, is_deleted=False)
+
+
+class BookAuthorApiListView(ApiListView):
+    """JSON list of the user's book authors.
+    """
+    filterset_class = BookAuthorFilter
+    fields = {
+        'id': 'id',
+        'firstname': 'firstname',
+        'lastname': 'lastname',
+        'book_count': 'book_count',
+    }
+
+    def get_queryset(self):
+        return BookAuthor.get_user_authors(self.request.user.pk)
+
+
+class ChangeFeedApiView(LoginRequiredMixin, View):
+    """JSON feed of the changes of the user's library after the `since` cursor.
+
+    Every page holds the latest change of each object with its current data, so the cost of a
+    sync depends on the number of changes only. Cursors behind the compaction horizon get 410,
+    such clients have to download the library again starting with `since=0`.
+    """
+    page_size = 200
+    max_page_size = 1000
+
+    def handle_no_permission(self):
+        return JsonResponse({'errors': {'detail': 'Authentication credentials were not provided.'}}, status=401)
+
+    def get_sources(self) -> dict:
+        """Querysets of the objects visible to the user and their fields by the change log model name.
+        """
+        user = self.request.user
+        return {
+            'book': (Book.objects.visible().filter(owner=user), BookApiListView.default_fields),
+            'bookcase': (Bookcase.objects.filter(user=user, is_deleted=False), ('id', 'name')),
+            'bookcaseslot': (BookcaseSlot.objects.filter(bookcase__user=user, bookcase__is_deleted=False),
+                             ('id', 'bookcase_id', 'bookshelf_number', 'number')),
+            'bookauthor': (BookAuthor.objects.filter(stats__user=user, is_deleted=False),
+                           ('id', 'firstname', 'lastname')),
+        }
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = int(request.GET.get('since', 0))
+            page_size = max(1, min(int(request.GET.get('limit', self.page_size)), self.max_page_size))
+        except ValueError:
+            return JsonResponse({'errors': {'detail': '"since" and "limit" must be whole numbers.'}}, status=400)
+        if 0 < since < ChangeLogCompaction.get_horizon():
+            return JsonResponse({'errors': {'since': ['The changes were compacted, download the library again.']}},
+                                status=410)
+
+        settled = timezone.now() - timedelta(seconds=settings.CHANGELOG_SETTLE_DELAY)
+        entries = list(
+            ChangeLogEntry.objects
+            .filter(user=request.user, id__gt=since, created_at__lt=settled)
+            .order_by('id')
+            .values_list('id', 'model', 'object_id', 'action')[:page_size + 1]
+        )
+        has_more = len(entries) > page_size
+        entries = entries[:page_size]
+        cursor = entries[-1][0] if entries else since
+
+        # only the latest change of an object in the page matters.
+        latest = {}
+        for entry_id, model, object_id, action in entries:
+            latest.pop((model, object_id), None)
+            latest[(model, object_id)] = (entry_id, action)
+
+        data = {}
+        for model, (queryset, fields) in self.get_sources().items():
+            ids = [object_id for (entry_model, object_id), (_id, action) in latest.items()
+                   if entry_model == model and action == ChangeLogEntry.SAVE]
+            if ids:
+                for row in queryset.filter(id__in=ids).values(*fields):
+                    if 'picture' in row:
+                        row['picture'] = media_url(row['picture'])
+                    data[(model, row['id'])] = row
+
+        changes = []
+        for (model, object_id), (entry_id, action) in latest.items():
+            row = data.get((model, object_id))
+            if action == ChangeLogEntry.SAVE and row is None:
+                # the object was deleted or left the library later, its tombstone follows.
+                action = ChangeLogEntry.DELETE
+            changes.append({'cursor': entry_id, 'model': model, 'id': object_id, 'action': action, 'data': row})
+
+        next_url = None
+        if has_more:
+            query = request.GET.copy()
+            query['since'] = cursor
+            next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+        return JsonResponse({'changes': changes, 'cursor': cursor, 'next': next_url})
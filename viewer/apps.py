@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ViewerConfig(AppConfig):
     name = 'viewer'
+
+    def ready(self):
+        # register background job handlers, model signal receivers and system checks.
+        from viewer import signals, tasks, checks  # noqa
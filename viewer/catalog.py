@@ -0,0 +1,204 @@
+import gzip
+import json
+import re
+from collections import defaultdict
+from functools import reduce
+from itertools import islice
+from operator import or_
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from viewer.models import CatalogAuthor, CatalogBook, CatalogIsbn, CatalogImport, BookAuthor
+from viewer.utils import collation_key, prefix_q
+
+ISBN_SEPARATORS_RE = re.compile(r'[\s-]')
+ISBN10_RE = re.compile(r'\d{9}[\dX]')
+ISBN13_RE = re.compile(r'\d{13}')
+
+AUTHOR_TYPE = 'author'
+BOOK_TYPES = ('edition', 'work')
+# dump lines of other types are skipped without parsing their JSON.
+IMPORTED_LINE_PREFIXES = tuple(f'/type/{record_type}\t'.encode() for record_type in (AUTHOR_TYPE, *BOOK_TYPES))
+
+# keeps the number of query parameters below the SQLite limit.
+QUERY_CHUNK_SIZE = 500
+
+
+def normalize_isbn(value: str) -> Optional[str]:
+    """ISBN-13 for the ISBN-10 or ISBN-13 with any separators, None for other values.
+    """
+    value = ISBN_SEPARATORS_RE.sub('', value).upper()
+    if ISBN13_RE.fullmatch(value):
+        return value
+    if ISBN10_RE.fullmatch(value):
+        value = '978' + value[:9]
+        checksum = sum(int(digit) * (3 if index % 2 else 1) for index, digit in enumerate(value))
+        return value + str(-checksum % 10)
+    return None
+
+
+def get_key(value) -> str:
+    """Short catalog key from the Open Library reference such as `/authors/OL23919A` or `{"key": ...}`.
+    """
+    if isinstance(value, dict):
+        value = value.get('key') or ''
+    return str(value).rsplit('/', 1)[-1][:32]
+
+
+def parse_line(line: bytes) -> Optional[dict]:
+    """Record of the dump line, either a JSON line or an Open Library dump line with the JSON in the last column.
+    """
+    if line.startswith(b'/type/') and not line.startswith(IMPORTED_LINE_PREFIXES):
+        return None
+    start = line.find(b'{')
+    if start < 0:
+        return None
+    try:
+        record = json.loads(line[start:])
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def get_author_key(record: dict) -> str:
+    """Key of the first author, referenced directly by editions and by a role object by works.
+    """
+    for author in record.get('authors') or []:
+        if isinstance(author, dict):
+            key = get_key(author.get('author') or author)
+            if key:
+                return key
+    return ''
+
+
+def import_records(records: Iterable[dict]) -> int:
+    """Store the authors, books and ISBNs of the records, keeping already imported ones.
+
+    Returns the number of imported records.
+    """
+    authors, books, isbns = {}, {}, defaultdict(set)
+    for record in records:
+        record_type = get_key(record.get('type'))
+        key = get_key(record)
+        if not key:
+            continue
+        if record_type == AUTHOR_TYPE and record.get('name'):
+            authors[key] = CatalogAuthor(key=key, name=str(record['name'])[:254])
+        elif record_type in BOOK_TYPES and record.get('title'):
+            title = str(record['title'])
+            books[key] = CatalogBook(key=key, title=title[:254], sort_title=collation_key(title),
+                                     author_key=get_author_key(record))
+            for value in [*(record.get('isbn_13') or []), *(record.get('isbn_10') or [])]:
+                isbn = normalize_isbn(str(value))
+                if isbn:
+                    isbns[key].add(isbn)
+
+    CatalogAuthor.objects.bulk_create(authors.values(), ignore_conflicts=True)
+    CatalogBook.objects.bulk_create(books.values(), ignore_conflicts=True)
+    # ids of the books are not returned when conflicts are ignored.
+    book_ids = {}
+    keys = list(isbns)
+    for start in range(0, len(keys), QUERY_CHUNK_SIZE):
+        chunk = keys[start:start + QUERY_CHUNK_SIZE]
+        book_ids.update(CatalogBook.objects.filter(key__in=chunk).values_list('key', 'id'))
+    CatalogIsbn.objects.bulk_create([
+        CatalogIsbn(isbn=isbn, book_id=book_ids[key])
+        for key, values in isbns.items() if key in book_ids for isbn in values
+    ], ignore_conflicts=True)
+    return len(authors) + len(books)
+
+
+def open_dump(path: Path) -> BinaryIO:
+    return gzip.open(path, 'rb') if path.suffix == '.gz' else path.open('rb')
+
+
+def import_dump(path: Path, batch_size: int = 1000, restart: bool = False) -> Iterator['CatalogImport']:
+    """Import the dump in batches of lines, yielding the import state after every batch.
+
+    The position in the dump is committed together with the batch, so an interrupted import
+    continues after the last imported batch. A dump with a changed size is imported from the start.
+    """
+    size = path.stat().st_size
+    state, _created = CatalogImport.objects.get_or_create(path=str(path), defaults={'size': size})
+    if restart or state.size != size:
+        state.size, state.position, state.record_count, state.finished_at = size, 0, 0, None
+        state.save()
+    if state.finished_at:
+        return
+    with open_dump(path) as dump:
+        # gzip streams are decompressed up to the position, which is still much faster than importing.
+        dump.seek(state.position)
+        while True:
+            lines = list(islice(dump, batch_size))
+            if not lines:
+                break
+            with transaction.atomic():
+                state.record_count += import_records(filter(None, map(parse_line, lines)))
+                state.position += sum(map(len, lines))
+                state.save(update_fields=['record_count', 'position', 'updated_at'])
+            yield state
+    state.finished_at = timezone.now()
+    state.save(update_fields=['finished_at', 'updated_at'])
+
+
+def lookup(query: str, user_id: int, limit: int = 10) -> list[dict]:
+    """Catalog books with the ISBN or a title starting with the query, with the matching authors of the user.
+    """
+    isbn = normalize_isbn(query)
+    if isbn:
+        books = CatalogBook.objects.filter(isbns__isbn=isbn)
+    else:
+        sort_title = collation_key(query)
+        if not sort_title:
+            return []
+        books = CatalogBook.objects.filter(prefix_q('sort_title', sort_title))
+    books = list(books.order_by('sort_title', 'id')[:limit])
+    authors = CatalogAuthor.objects.in_bulk({book.author_key for book in books if book.author_key}, field_name='key')
+    local_author_ids = {}
+    if authors:
+        local_authors = BookAuthor.get_user_authors(user_id).filter(reduce(or_, [
+            Q(firstname=firstname, lastname=lastname) for firstname, lastname in {a.names for a in authors.values()}
+        ]))
+        local_author_ids = {(author.firstname, author.lastname): author.pk for author in local_authors}
+    results = []
+    for book in books:
+        author = authors.get(book.author_key)
+        firstname, lastname = author.names if author else ('', '')
+        results.append({
+            'key': book.key,
+            'title': book.title,
+            'author_key': author.key if author else None,
+            'author_name': author.name if author else None,
+            'author_firstname': firstname,
+            'author_lastname': lastname,
+            'author_id': local_author_ids.get((firstname, lastname)),
+        })
+    return results
+
+
+def get_book_initial(key: str, user_id: int) -> dict:
+    """Initial data of the book form prefilled from the catalog book, the author only when it is the user's author.
+    """
+    book = CatalogBook.objects.filter(key=key).first()
+    if not book:
+        return {}
+    initial = {'name': book.title}
+    author = CatalogAuthor.objects.filter(key=book.author_key).first() if book.author_key else None
+    if author:
+        firstname, lastname = author.names
+        initial['author'] = BookAuthor.get_user_authors(user_id).filter(firstname=firstname, lastname=lastname).first()
+    return initial
+
+
+def get_author_initial(key: str) -> dict:
+    """Initial data of the book author form prefilled from the catalog author.
+    """
+    author = CatalogAuthor.objects.filter(key=key).first()
+    if not author:
+        return {}
+    firstname, lastname = author.names
+    return {'firstname': firstname, 'lastname': lastname}
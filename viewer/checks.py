@@ -0,0 +1,68 @@
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage, ManifestFilesMixin
+from django.core.checks import Error, Tags, register
+from django.template import engines
+
+from viewer.deletion import MAX_CHUNK_SIZE
+from viewer.warmup import iter_template_files
+
+STATIC_TAG_RE = re.compile(r'''{%\s*static\s+(["'])(?P<name>[^"']+)\1''')
+
+
+def iter_static_references():
+    """Template names and static file names of the `{% static %}` tags with literal names.
+    """
+    for backend in engines.all():
+        for template_name, path in iter_template_files(backend):
+            for match in STATIC_TAG_RE.finditer(path.read_text(encoding='utf-8', errors='replace')):
+                yield template_name, match.group('name')
+
+
+# a deployment check: `migrate` and the test runner run the regular checks before `collectstatic` built
+# the manifest, and `collectstatic` runs the `Tags.staticfiles` checks.
+@register(Tags.templates, deploy=True)
+def check_static_references(app_configs, **kwargs):
+    """Every static file referenced by the templates is in the manifest of the hashed names.
+
+    Templates reference the hashed names when DEBUG is disabled, and a missing name fails the whole page.
+    With DEBUG enabled the files are looked up in the static files directories instead. Run by
+    `./manage.py check --deploy`.
+    """
+    if not isinstance(staticfiles_storage, ManifestFilesMixin):
+        return []
+    manifest = staticfiles_storage.hashed_files
+    if not settings.DEBUG and not manifest:
+        return [Error(
+            'The static files manifest is missing.',
+            hint='Run `./manage.py collectstatic` to build the hashed and compressed static files.',
+            id='viewer.E001',
+        )]
+    errors = []
+    for template_name, name in iter_static_references():
+        found = finders.find(name) if settings.DEBUG else name in manifest
+        if found:
+            continue
+        errors.append(Error(
+            f'Template "{template_name}" references the static file "{name}", which is '
+            f'{"missing from the manifest" if not settings.DEBUG else "not found"}.',
+            hint='Add the file to the assets and run `./manage.py collectstatic`, or fix the reference.',
+            id='viewer.E002',
+        ))
+    return errors
+
+
+@register()
+def check_deletion_chunk_size(app_configs, **kwargs):
+    """The chunks of the background deletions are bounded, so none of their transactions holds the locks for long.
+    """
+    chunk_size = settings.DELETION_CHUNK_SIZE
+    if isinstance(chunk_size, int) and 0 < chunk_size <= MAX_CHUNK_SIZE:
+        return []
+    return [Error(
+        f'DELETION_CHUNK_SIZE must be a whole number from 1 to {MAX_CHUNK_SIZE}, got {chunk_size!r}.',
+        hint='Run `./manage.py check_deletion` to verify the chunked deletion with the configured size.',
+        id='viewer.E003',
+    )]
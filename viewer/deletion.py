@@ -0,0 +1,121 @@
+from collections import defaultdict
+from typing import Iterator
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from viewer.models import (
+    Bookcase, BookcaseSlot, BookAuthor, Book, Library, BookcaseStats, AuthorStats, ChangeLogEntry
+)
+from viewer.signals import apply_book_placements
+
+# every chunk is one write transaction, larger ones block the other writers for too long.
+MAX_CHUNK_SIZE = 5000
+
+
+def raw_delete(queryset: 'QuerySet') -> int:
+    """Delete the rows with a single `DELETE`, without the collector loading them and sending signals.
+
+    Callers update the related rows, statistics and the change log themselves.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_bookcase(pk: int, chunk_size: int = None) -> Iterator[tuple[int, int]]:
+    """Delete the bookcase in chunks of slots, yielding the numbers of deleted and all slots after every chunk.
+
+    Every chunk is a short transaction, which leaves the books of a range of slots without a slot and
+    deletes the slots by set-based queries. The empty bookcase is deleted the same way at the end.
+    """
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    bookcase = Bookcase.objects.filter(pk=pk).first()
+    if not bookcase:
+        return
+    total = BookcaseSlot.objects.filter(bookcase_id=pk).count()
+    done = last_id = 0
+    while True:
+        with transaction.atomic():
+            slot_ids = list(
+                BookcaseSlot.objects
+                .filter(bookcase_id=pk, id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:chunk_size]
+            )
+            if not slot_ids:
+                break
+            slots = BookcaseSlot.objects.filter(bookcase_id=pk, id__range=(slot_ids[0], slot_ids[-1]))
+            books = Book.objects.filter(bookcase_slot__in=slots.values('id'))
+            book_ids = list(books.values_list('id', flat=True))
+            books.update(bookcase_slot=None, sort_bookcase='', sort_shelf=0, sort_slot=0)
+            raw_delete(slots)
+
+            ChangeLogEntry.record(BookcaseSlot, ChangeLogEntry.DELETE, slot_ids, user_id=bookcase.user_id)
+            ChangeLogEntry.record(Book, ChangeLogEntry.SAVE, book_ids, user_id=bookcase.user_id)
+            Library.change_counters(bookcase.user_id, unplaced_book_count=len(book_ids))
+            BookcaseStats.change_counters(pk, slot_count=-len(slot_ids), occupied_slot_count=-len(book_ids))
+            Library.bump_version(bookcase.user_id)
+        done += len(slot_ids)
+        last_id = slot_ids[-1]
+        yield done, total
+    with transaction.atomic():
+        raw_delete(BookcaseStats.objects.filter(bookcase_id=pk))
+        raw_delete(Bookcase.objects.filter(pk=pk))
+        # a bookcase hidden by `Bookcase.mark_deleted` is logged as deleted already.
+        if not bookcase.is_deleted:
+            ChangeLogEntry.record(Bookcase, ChangeLogEntry.DELETE, [pk], user_id=bookcase.user_id)
+            Library.bump_version(bookcase.user_id)
+        Library.change_counters(bookcase.user_id, bookcase_count=-1)
+
+
+def delete_book_author(pk: int, chunk_size: int = None, user_id: int = None) -> Iterator[tuple[int, int]]:
+    """Delete the author in chunks of books, yielding the numbers of deleted and all books after every chunk.
+
+    Every chunk is a short transaction deleting a range of the author's books by a set-based query.
+    With `user_id` only the user's books are deleted and the author is removed from the user's authors,
+    the author itself is deleted once it has no books and no users. The empty author is deleted by
+    set-based queries as well.
+    """
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    author = BookAuthor.objects.filter(pk=pk).first()
+    if not author:
+        return
+    books = Book.objects.filter(author_id=pk)
+    if user_id:
+        books = books.filter(owner_id=user_id)
+    total = books.count()
+    done = last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                books
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'owner_id', 'bookcase_slot_id')[:chunk_size]
+            )
+            if not rows:
+                break
+            raw_delete(books.filter(id__range=(rows[0][0], rows[-1][0])))
+
+            book_ids = defaultdict(list)
+            for book_id, owner_id, _slot_id in rows:
+                book_ids[owner_id].append(book_id)
+            for owner_id, ids in book_ids.items():
+                ChangeLogEntry.record(Book, ChangeLogEntry.DELETE, ids, user_id=owner_id)
+            apply_book_placements(*(((owner_id, slot_id, pk), -1) for _book_id, owner_id, slot_id in rows))
+            Library.bump_version(*book_ids)
+        done += len(rows)
+        last_id = rows[-1][0]
+        yield done, total
+    with transaction.atomic():
+        if user_id:
+            AuthorStats.remove(user_id, pk)
+            if author.is_used():
+                return
+        user_ids = author.get_user_ids()
+        raw_delete(AuthorStats.objects.filter(author_id=pk))
+        raw_delete(BookAuthor.objects.filter(pk=pk))
+        # an author hidden by `BookAuthor.mark_deleted` is logged as deleted already.
+        if not author.is_deleted:
+            ChangeLogEntry.record_for_users(BookAuthor, ChangeLogEntry.DELETE, [pk], user_ids)
+            Library.bump_version(*user_ids)
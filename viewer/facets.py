@@ -0,0 +1,91 @@
+import hashlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Value, CharField
+from django.db.models.functions import Cast, Concat, Trim
+from django.utils.http import urlencode
+from django.utils.translation import ugettext_lazy as _
+from django_filters import FilterSet
+
+from viewer.models import Library
+
+BOOKCASE = 'bookcase'
+AUTHOR = 'author'
+SHELF = 'shelf'
+
+# facet name, filter parameter name and title.
+BOOK_FACETS = (
+    (BOOKCASE, 'bookcase', _('Bookcases')),
+    (AUTHOR, 'author', _('Authors')),
+    (SHELF, 'bookcase_slot__bookshelf_number', _('Bookshelves')),
+)
+
+# query parameters not affecting the counts.
+IGNORED_PARAMETERS = ('ordering', 'page', 'paginate_by')
+
+
+def count_book_facets(queryset) -> dict[str, list[tuple]]:
+    """Count books of the queryset per bookcase, author and shelf in one grouped query.
+
+    Returns (value, label, count) tuples of every facet, the most frequent values first.
+    """
+    queryset = queryset.order_by()
+    bookcases = queryset.values(
+        kind=Value(BOOKCASE, CharField()),
+        value=F('bookcase_slot__bookcase_id'),
+        label=F('bookcase_slot__bookcase__name')
+    )
+    authors = queryset.values(
+        kind=Value(AUTHOR, CharField()),
+        value=F('author_id'),
+        label=Trim(Concat('author__firstname', Value(' '), 'author__lastname', output_field=CharField()))
+    )
+    shelves = queryset.values(
+        kind=Value(SHELF, CharField()),
+        value=F('sort_shelf'),
+        label=Cast('sort_shelf', CharField())
+    )
+    grouped = [part.annotate(count=Count('id')) for part in (bookcases, authors, shelves)]
+    facets = defaultdict(list)
+    for row in grouped[0].union(*grouped[1:], all=True):
+        # books without a slot have neither a bookcase nor a shelf.
+        if row['value']:
+            facets[row['kind']].append((row['value'], row['label'], row['count']))
+    for values in facets.values():
+        values.sort(key=lambda value: (-value[2], value[1]))
+    return dict(facets)
+
+
+def get_book_facets(request, filterset: 'FilterSet') -> list[dict]:
+    """Facet panels for the current state of the book filter.
+
+    Counts are cached per user library version, so any change of the library invalidates them.
+    """
+    params = sorted(
+        (key, value) for key, values in request.GET.lists() if key not in IGNORED_PARAMETERS for value in values
+    )
+    digest = hashlib.md5(urlencode(params).encode()).hexdigest()
+    cache_key = f'viewer:book-facets:{request.user.pk}:{Library.get_version(request.user.pk)}:{digest}'
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = count_book_facets(filterset.qs)
+        cache.set(cache_key, counts, settings.FACETS_CACHE_TIMEOUT)
+
+    facets = []
+    for name, parameter, title in BOOK_FACETS:
+        current = request.GET.get(parameter)
+        values = []
+        for value, label, count in counts.get(name, [])[:settings.FACETS_MAX_VALUES]:
+            query = request.GET.copy()
+            query.pop('page', None)
+            query[parameter] = str(value)
+            values.append({
+                'label': label,
+                'count': count,
+                'url': f'?{query.urlencode()}',
+                'active': current == str(value)
+            })
+        facets.append({'title': title, 'values': values})
+    return facets
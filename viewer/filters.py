@@ -1,7 +1,8 @@
 from django import forms
 from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
-from django_filters import FilterSet, OrderingFilter, CharFilter
+from django_filters import FilterSet, OrderingFilter, CharFilter, NumberFilter
+from django_filters.constants import EMPTY_VALUES
 
 from viewer.forms import StyledFormMixin
 from viewer.models import Book, Bookcase, BookAuthor
@@ -13,25 +14,50 @@ class StyledFilterForm(StyledFormMixin, forms.Form):
     submit_text = _('Search')
 
 
+class SortKeyOrderingFilter(OrderingFilter):
+    """Ordering filter where every parameter sorts by a sequence of stored sort key fields.
+
+    `sort_keys` is a sequence of (parameter name, sort key fields) pairs. The fields and the
+    final `id` tie-breaker are sorted in the same direction, so a matching index is usable.
+    """
+    def __init__(self, *args, **kwargs):
+        self.sort_keys = dict(kwargs.pop('sort_keys'))
+        kwargs['fields'] = tuple((param, param) for param in self.sort_keys)
+        super().__init__(*args, **kwargs)
+
+    def get_ordering_value(self, param) -> list[str]:
+        descending = param.startswith('-')
+        param = param[1:] if descending else param
+        fields = [*self.sort_keys[param], 'id']
+        return [f'-{field}' for field in fields] if descending else fields
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+
+        ordering = [field for param in value for field in self.get_ordering_value(param)]
+        return qs.order_by(*ordering)
+
+
 class BookFilter(FilterSet):
     """Filter class for book filter view.
     """
-    _order_fields = [
-        'bookcase_slot__bookcase__name',
-        'bookcase_slot__bookshelf_number',
-        'bookcase_slot__number',
-        'name',
-        'author__firstname'
-    ]
-    ordering = OrderingFilter(
-        fields=tuple(
-            (field_name, field_name) for field_name in _order_fields
+    ordering = SortKeyOrderingFilter(
+        sort_keys=(
+            ('bookcase', ('sort_bookcase', 'sort_shelf', 'sort_slot')),
+            ('shelf', ('sort_shelf', 'sort_bookcase', 'sort_slot')),
+            ('slot', ('sort_slot', 'sort_bookcase', 'sort_shelf')),
+            ('name', ('sort_name',)),
+            ('author', ('sort_author',)),
         )
     )
 
     bookcase_name = CharFilter(label=_('Bookcase name'), field_name='bookcase_slot__bookcase__name',
                                lookup_expr='icontains')
     author_name = CharFilter(label=_('Author name'), method='author_filter')
+    # filters applied by facet links.
+    bookcase = NumberFilter(field_name='bookcase_slot__bookcase', widget=forms.HiddenInput)
+    author = NumberFilter(field_name='author', widget=forms.HiddenInput)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -78,7 +104,8 @@ class BookAuthorFilter(FilterSet):
     """
     _order_fields = [
         'firstname',
-        'lastname'
+        'lastname',
+        'book_count'
     ]
     ordering = OrderingFilter(
         fields=tuple(
@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import AuthenticationForm
 from django.utils.translation import ugettext_lazy as _
 
@@ -54,7 +55,13 @@ class BookForm(StyledFormMixin, forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['bookcase_slot'].queryset = BookcaseSlot.objects.filter(bookcase__user=self.user)
+        self.fields['bookcase_slot'].queryset = (
+            BookcaseSlot.objects.filter(bookcase__user=self.user, bookcase__is_deleted=False).select_related('bookcase')
+        )
+        # the most used authors come first.
+        self.fields['author'].queryset = (
+            BookAuthor.get_user_authors(self.user.pk).order_by('-book_count', 'lastname', 'firstname')
+        )
 
     class Meta:
         model = Book
@@ -68,8 +75,9 @@ class BookcaseCreateForm(StyledFormMixin, forms.ModelForm):
         'name': 'pencil'
     }
 
-    shelf_count = forms.IntegerField(label=_('Shelf count'), min_value=1, max_value=10)
-    shelf_capacity = forms.IntegerField(label=_('Shelf capacity'), min_value=1, max_value=10)
+    shelf_count = forms.IntegerField(label=_('Shelf count'), min_value=1, max_value=settings.BOOKCASE_MAX_SHELVES)
+    shelf_capacity = forms.IntegerField(label=_('Shelf capacity'), min_value=1,
+                                        max_value=settings.BOOKCASE_MAX_SHELF_CAPACITY)
 
     class Meta:
         model = Bookcase
@@ -96,6 +104,15 @@ class BookAuthorForm(StyledFormMixin, forms.ModelForm):
         'lastname': 'pencil'
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # authors known by a single name have the last name only.
+        self.fields['firstname'].required = False
+
+    def validate_unique(self):
+        # authors are shared by all users, adding or renaming to an existing author makes it the user's author.
+        pass
+
     class Meta:
         model = BookAuthor
         fields = '__all__'
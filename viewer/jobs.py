@@ -0,0 +1,116 @@
+import logging
+import traceback
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from viewer.models import Job, JobLockLost
+
+logger = logging.getLogger(__name__)
+
+JobHandlerType = Callable[..., None]
+
+_registry: dict[str, JobHandlerType] = {}
+
+
+def register_job(name: str) -> Callable[[JobHandlerType], JobHandlerType]:
+    """Decorator to register a function as a background job handler.
+
+    The handler is called as `handler(job, **job.kwargs)` and may report progress with `job.set_progress()`.
+    """
+    def decorator(func: JobHandlerType) -> JobHandlerType:
+        if name in _registry:
+            raise RuntimeError(f'Job "{name}" is already registered.')
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_job_handler(name: str) -> JobHandlerType:
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f'Job "{name}" is not registered.') from None
+
+
+def enqueue(name: str, *, user=None, max_attempts: int = None, **kwargs) -> 'Job':
+    """Store a new pending job. The job is started by a worker only after the current transaction commits.
+    """
+    get_job_handler(name)
+    return Job.objects.create(
+        name=name,
+        user=user,
+        kwargs=kwargs,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS
+    )
+
+
+def claim_next(worker_id: str) -> Optional['Job']:
+    """Atomically take the next due job for the given worker.
+
+    Claiming is a conditional UPDATE on the job status, so it works without row locks and
+    concurrent workers never run the same job twice.
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects
+        .filter(status=Job.PENDING, run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = Job.objects.filter(id=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def run_job(job: 'Job') -> None:
+    """Execute a claimed job and store its outcome, scheduling a retry on failure.
+
+    The outcome is stored only while the worker still holds the lock, a job requeued as stale in the
+    meantime belongs to the worker running it again.
+    """
+    try:
+        handler = get_job_handler(job.name)
+        handler(job, **job.kwargs)
+    except JobLockLost:
+        logger.warning('Job %s lost its lock and was stopped', job)
+        return
+    except Exception:  # noqa
+        logger.exception('Job %s failed', job)
+        fields = {'error': traceback.format_exc(), 'locked_by': '', 'locked_at': None}
+        if job.attempts < job.max_attempts:
+            # exponential backoff between attempts.
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            fields.update(status=Job.PENDING, run_after=timezone.now() + timedelta(seconds=delay))
+        else:
+            fields.update(status=Job.FAILED, finished_at=timezone.now())
+    else:
+        fields = {'status': Job.SUCCEEDED, 'progress': 100, 'error': '', 'locked_by': '', 'locked_at': None,
+                  'finished_at': timezone.now()}
+    updated = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(**fields)
+    if not updated:
+        logger.warning('Job %s lost its lock, its outcome is discarded', job)
+
+
+def requeue_stale(timeout: int) -> int:
+    """Return jobs locked by dead workers back to the queue, failing those without attempts left.
+
+    Running jobs renew `locked_at` on every progress report, so the timeout is counted from the last one.
+    """
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=timeout))
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        error='Worker stopped while running the job.',
+        finished_at=timezone.now()
+    )
+    return stale.update(status=Job.PENDING, locked_by='', locked_at=None)
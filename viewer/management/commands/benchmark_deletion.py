@@ -0,0 +1,106 @@
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from viewer import deletion
+from viewer.models import Bookcase, BookcaseSlot, BookAuthor, Book, Library, AuthorStats, BookcaseStats
+
+USERNAME = 'benchmark-deletion'
+SHELF_CAPACITY = 100
+
+
+def seed_books(user: 'User', book_count: int) -> tuple['Bookcase', 'BookAuthor']:
+    """A new bookcase of the user full of books by a new author, with the library statistics rebuilt.
+    """
+    with transaction.atomic():
+        bookcase = Bookcase.objects.create(user=user, name=f'Benchmark {time.time_ns()}')
+        BookcaseSlot.bulk_create_for_bookcase(bookcase, book_count // SHELF_CAPACITY + 1, SHELF_CAPACITY)
+        author = BookAuthor.objects.create(firstname='Benchmark', lastname=f'Deletion {time.time_ns()}')
+        slots = BookcaseSlot.objects.filter(bookcase=bookcase).select_related('bookcase').order_by('id')
+        books = []
+        for index, slot in enumerate(slots[:book_count]):
+            book = Book(bookcase_slot=slot, author=author, name=f'Book {index + 1}')
+            book.fill_sort_keys()
+            books.append(book)
+        Book.objects.bulk_create(books, batch_size=1000)
+        Library.rebuild([user.pk])
+        AuthorStats.rebuild([user.pk])
+        BookcaseStats.rebuild(Bookcase.objects.filter(user=user))
+    return bookcase, author
+
+
+def collector_delete(model, pk: int) -> Iterator[None]:
+    """Delete the object by the Django collector in one transaction, as done before the chunked deletion.
+    """
+    with transaction.atomic():
+        model.objects.filter(pk=pk).delete()
+    yield
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a bookcase and an author with many books, delete them by the Django collector and in chunks, and '
+        'report the duration, the longest transaction and the peak memory of every deletion.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=10000,
+                            help='Number of books in the bookcase and by the author.')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Number of slots or books per transaction.')
+
+    def handle(self, *args, **options):
+        user, _created = User.objects.get_or_create(username=USERNAME)
+        try:
+            results = []
+            bookcase, author = self.seed(user, options['books'])
+            results.append(('collector', 'bookcase', self.measure(lambda: collector_delete(Bookcase, bookcase.pk))))
+            results.append(('collector', 'author', self.measure(lambda: collector_delete(BookAuthor, author.pk))))
+            bookcase, author = self.seed(user, options['books'])
+            chunk_size = options['chunk_size']
+            results.append(('chunked', 'bookcase',
+                            self.measure(lambda: deletion.delete_bookcase(bookcase.pk, chunk_size))))
+            results.append(('chunked', 'author',
+                            self.measure(lambda: deletion.delete_book_author(author.pk, chunk_size))))
+            self.check_counters(user)
+        finally:
+            for bookcase_id in Bookcase.objects.filter(user=user).values_list('id', flat=True):
+                list(deletion.delete_bookcase(bookcase_id))
+            user.delete()
+
+        self.stdout.write(f'{"mode":<11}{"object":<10}{"total, s":>10}{"longest transaction, ms":>25}'
+                          f'{"peak memory, MB":>17}')
+        for mode, name, (total, longest, peak) in results:
+            self.stdout.write(f'{mode:<11}{name:<10}{total:>10.2f}{longest * 1000:>25.1f}{peak / 2 ** 20:>17.1f}')
+
+    def seed(self, user: 'User', book_count: int) -> tuple['Bookcase', 'BookAuthor']:
+        self.stdout.write(f'Seeding {book_count} books...')
+        return seed_books(user, book_count)
+
+    def measure(self, run: Callable[[], Iterator]) -> tuple[float, float, int]:
+        """Total duration, the longest time between chunks, which are separate transactions, and peak memory.
+        """
+        tracemalloc.start()
+        started = last = time.perf_counter()
+        longest = 0
+        for _progress in run():
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return now - started, longest, peak
+
+    def check_counters(self, user: 'User') -> None:
+        counters = Library.objects.filter(user=user).values(*Library.COUNTER_FIELDS).first()
+        Library.rebuild([user.pk])
+        rebuilt = Library.objects.filter(user=user).values(*Library.COUNTER_FIELDS).first()
+        if counters == rebuilt:
+            self.stdout.write(self.style.SUCCESS('Library counters match a rebuild after the chunked deletion.'))
+        else:
+            self.stdout.write(self.style.ERROR(f'Library counters {counters} differ from a rebuild {rebuilt}.'))
@@ -0,0 +1,117 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+
+# loads the WSGI application in a fresh process and times the first and the second request to every path.
+CHILD_SCRIPT = '''
+import json
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+application = import_string(settings.WSGI_APPLICATION)
+boot = (time.perf_counter() - started) * 1000
+paths, cookie = json.loads(sys.argv[1])
+
+
+def request(path):
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update({'PATH_INFO': path, 'HTTP_HOST': 'localhost', 'HTTP_COOKIE': cookie})
+    statuses = []
+    started = time.perf_counter()
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    return (time.perf_counter() - started) * 1000, int(statuses[0].split()[0])
+
+
+result = {'boot': boot, 'first': {}, 'second': {}}
+for path in paths:
+    result['first'][path] = request(path)
+for path in paths:
+    result['second'][path] = request(path)
+print(json.dumps(result))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the time to the first response of a fresh worker process with and without the startup warmup. '
+        'Workers run with DEBUG disabled, so templates are cached as in production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username of the user making the requests.')
+        parser.add_argument('--runs', type=int, default=5, help='Number of processes started per mode.')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Dashboard path to request, the main dashboard lists by default.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist.')
+        if not getattr(staticfiles_storage, 'hashed_files', True):
+            raise CommandError('Workers reference the hashed static files, run `./manage.py collectstatic` first.')
+        session = SessionStore()
+        session.update({
+            SESSION_KEY: str(user.pk),
+            BACKEND_SESSION_KEY: settings.AUTHENTICATION_BACKENDS[0],
+            HASH_SESSION_KEY: user.get_session_auth_hash(),
+        })
+        session.create()
+        paths = options['paths'] or [
+            reverse(name) for name in
+            ('viewer:book_list', 'viewer:bookcase_list', 'viewer:book_author_list', 'viewer:statistics')
+        ]
+        cookie = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+        try:
+            for warmup in (False, True):
+                runs = [self.run_worker(paths, cookie, warmup) for _index in range(options['runs'])]
+                self.report(paths, runs, warmup)
+        finally:
+            session.delete()
+
+    def run_worker(self, paths: list[str], cookie: str, warmup: bool) -> dict:
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE,
+            'PYTHONPATH': os.pathsep.join(sys.path),
+            'DEBUG': 'False',
+            'ALLOWED_HOSTS': 'localhost',
+            'WARMUP_ON_STARTUP': str(warmup),
+        }
+        process = subprocess.run([sys.executable, '-c', CHILD_SCRIPT, json.dumps([paths, cookie])], env=env,
+                                 cwd=settings.BASE_DIR, capture_output=True, text=True)
+        if process.returncode:
+            raise CommandError(f'The worker process failed:\n{process.stderr}')
+        return json.loads(process.stdout.splitlines()[-1])
+
+    def report(self, paths: list[str], runs: list[dict], warmup: bool) -> None:
+        boot = statistics.median(run['boot'] for run in runs)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{"With" if warmup else "Without"} warmup: loading the application {boot:.1f} ms (median)'
+        ))
+        self.stdout.write(f'{"path":<34}{"first, ms":>11}{"second, ms":>12}{"status":>8}')
+        for path in paths:
+            first = statistics.median(run['first'][path][0] for run in runs)
+            second = statistics.median(run['second'][path][0] for run in runs)
+            status = runs[-1]['first'][path][1]
+            self.stdout.write(f'{path:<34}{first:>11.1f}{second:>12.1f}{status:>8}')
+        first_response = statistics.median(run['boot'] + run['first'][paths[0]][0] for run in runs)
+        self.stdout.write(self.style.SUCCESS(f'Time to the first response: {first_response:.1f} ms (median)'))
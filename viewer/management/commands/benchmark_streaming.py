@@ -0,0 +1,140 @@
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from viewer.models import Job
+
+
+def build_scope(path: str, session_key: str) -> dict:
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [
+            (b'host', b'localhost'),
+            (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_key}'.encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Measure dashboard latency under the ASGI application while many slow streaming clients are connected.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username of the user making the requests.')
+        parser.add_argument('--clients', type=int, default=200,
+                            help='Number of job event streams and slow exports held open.')
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Number of dashboard requests measured with and without the streams.')
+        parser.add_argument('--path', default=reverse('viewer:book_list'), help='Dashboard path to measure.')
+        parser.add_argument('--read-delay', type=float, default=0.5,
+                            help='Seconds a slow export client waits before reading every chunk.')
+
+    def handle(self, *args, **options):
+        from book_viewer.asgi import application
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist.')
+        session = SessionStore()
+        session.update({
+            SESSION_KEY: str(user.pk),
+            BACKEND_SESSION_KEY: settings.AUTHENTICATION_BACKENDS[0],
+            HASH_SESSION_KEY: user.get_session_auth_hash(),
+        })
+        session.create()
+        # a pending job which is never due keeps the job event streams open.
+        job = Job.objects.create(user=user, name='benchmark_streaming', run_after=timezone.now() + timedelta(days=1))
+        try:
+            baseline, loaded, stats = asyncio.run(self.run(application, session.session_key, options))
+        finally:
+            job.delete()
+            session.delete()
+
+        self.stdout.write(f'{"":<24}{"p50, ms":>10}{"p95, ms":>10}{"max, ms":>10}')
+        for title, timings in (('idle', baseline), (f'{options["clients"]} streams open', loaded)):
+            timings = sorted(timings)
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(f'{title:<24}{statistics.median(timings):>10.1f}{p95:>10.1f}{timings[-1]:>10.1f}')
+        self.stdout.write(
+            f'Streams open during the measurement: {stats["open"]}/{stats["total"]}, '
+            f'export chunks sent: {stats["chunks"]}.'
+        )
+
+    async def run(self, application, session_key: str, options: dict) -> tuple[list, list, dict]:
+        stop = asyncio.Event()
+        stats = {'total': 0, 'open': 0, 'chunks': 0}
+
+        async def request(path: str) -> float:
+            started = time.perf_counter()
+            messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+
+            async def receive():
+                return next(messages, {'type': 'http.disconnect'})
+
+            async def send(message):
+                pass
+
+            await application(build_scope(path, session_key), receive, send)
+            return (time.perf_counter() - started) * 1000
+
+        async def slow_client(path: str, read_delay: float) -> None:
+            started = asyncio.Event()
+            messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+
+            async def receive():
+                message = next(messages, None)
+                if message is None:
+                    await stop.wait()
+                    message = {'type': 'http.disconnect'}
+                return message
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    started.set()
+                elif message.get('more_body'):
+                    if path != events_path:
+                        stats['chunks'] += 1
+                    await asyncio.sleep(read_delay)
+
+            stats['total'] += 1
+            task = asyncio.ensure_future(application(build_scope(path, session_key), receive, send))
+            await started.wait()
+            stats['open'] += 1
+            await task
+            stats['open'] -= 1
+
+        events_path = reverse('viewer:job_events')
+        export_path = reverse('viewer:book_export')
+        baseline = [await request(options['path']) for _index in range(options['requests'])]
+
+        clients = [
+            asyncio.ensure_future(slow_client(events_path if index % 2 else export_path, options['read_delay']))
+            for index in range(options['clients'])
+        ]
+        # let the clients connect before measuring.
+        await asyncio.sleep(1)
+        loaded = [await request(options['path']) for _index in range(options['requests'])]
+        open_streams = stats['open']
+        stop.set()
+        await asyncio.gather(*clients)
+        stats['open'] = open_streams
+        return baseline, loaded, stats
@@ -0,0 +1,148 @@
+import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils.html import escape
+from template_tables.components import TR, TD
+
+from viewer.models import Bookcase, BookcaseSlot, BookAuthor, Book
+from viewer.tables import BookTable, BookcaseTable, BookAuthorTable, BookPicture, TableLink
+
+
+# user input is rendered into the cells, so every rendering has to escape it the same way.
+UNSAFE_TEXT = '<b>"Tom" & Jerry\'s</b>'
+
+
+def render_links(data_item, links: tuple) -> str:
+    return ''.join(
+        TableLink(
+            html_params={
+                'uk-icon': icon,
+                'href': reverse(url_pattern, kwargs=dict(pk=data_item.pk))
+            }
+        ).render() for icon, url_pattern in links
+    )
+
+
+class BaselineBookTable(BookTable):
+    """Books rendered by the per-cell `get_body_row` the tables had before the columns, the benchmark baseline.
+
+    Cells are the same as those of the columns, escaped like them, so all renderings can be compared.
+    """
+    compiled = False
+
+    def get_body_row(self, index: int, data_item: 'Book') -> 'TR':
+        links = render_links(data_item, (('pencil', 'viewer:book_update'), ('trash', 'viewer:book_delete')))
+        book_picture = BookPicture(html_params={'src': data_item.picture.url}).render() if data_item.picture else None
+        slot = data_item.bookcase_slot
+        return TR([
+            TD(escape(slot.bookcase.name) if slot else None),
+            TD(slot.bookshelf_number if slot else None),
+            TD(slot.number if slot else None),
+            TD(escape(data_item.name)),
+            TD(escape(data_item.author)),
+            TD(book_picture),
+            TD(links)
+        ])
+
+
+class BaselineBookcaseTable(BookcaseTable):
+    """Bookcases rendered by the per-cell `get_body_row`, see `BaselineBookTable`.
+    """
+    compiled = False
+
+    def get_body_row(self, index: int, data_item: 'Bookcase') -> 'TR':
+        links = render_links(data_item, (('grid', 'viewer:bookcase_detail'), ('pencil', 'viewer:bookcase_update'),
+                                         ('trash', 'viewer:bookcase_delete')))
+        return TR([
+            TD(escape(data_item.name)),
+            TD(self.total_slots.get(data_item.id)),
+            TD(links)
+        ])
+
+
+class BaselineBookAuthorTable(BookAuthorTable):
+    """Authors rendered by the per-cell `get_body_row`, see `BaselineBookTable`.
+    """
+    compiled = False
+
+    def get_body_row(self, index: int, data_item: 'BookAuthor') -> 'TR':
+        links = render_links(data_item, (('pencil', 'viewer:book_author_update'),
+                                         ('trash', 'viewer:book_author_delete')))
+        return TR([
+            TD(escape(data_item.firstname)),
+            TD(escape(data_item.lastname)),
+            TD(str(data_item.book_count)),
+            TD(links)
+        ])
+
+
+def build_books(count: int) -> list['Book']:
+    bookcase = Bookcase(pk=1, name=f'Bookcase {UNSAFE_TEXT}')
+    books = []
+    for index in range(1, count + 1):
+        author = BookAuthor(pk=index, firstname=f'Firstname {index}', lastname=f'Lastname {UNSAFE_TEXT}')
+        slot = BookcaseSlot(pk=index, bookcase=bookcase, bookshelf_number=index // 10 + 1, number=index % 10 + 1)
+        books.append(Book(pk=index, bookcase_slot=slot, author=author, name=f'Book {index} {UNSAFE_TEXT}',
+                          picture=f'book-{index}&"<>.png' if index % 2 else None))
+    return books
+
+
+def build_bookcases(count: int) -> list['Bookcase']:
+    return [Bookcase(pk=index, name=f'Bookcase {index} {UNSAFE_TEXT}') for index in range(1, count + 1)]
+
+
+def build_authors(count: int) -> list['BookAuthor']:
+    authors = []
+    for index in range(1, count + 1):
+        author = BookAuthor(pk=index, firstname=f'Firstname {UNSAFE_TEXT}', lastname=f'Lastname {index}')
+        # annotated by the author list view.
+        author.book_count = index % 3
+        authors.append(author)
+    return authors
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-cell, the column component based and the compiled rendering of the viewer tables.'
+
+    tables = (
+        (BaselineBookTable, BookTable, build_books),
+        (BaselineBookcaseTable, BookcaseTable, build_bookcases),
+        (BaselineBookAuthorTable, BookAuthorTable, build_authors),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[25, 100, 1000],
+                            help='Page sizes to benchmark.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of renders per measurement, the best one is reported.')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/', {'ordering': 'name'})
+        request.user = AnonymousUser()
+        self.stdout.write(
+            f'{"table":<18}{"rows":>6}{"baseline, ms":>15}{"components, ms":>17}{"compiled, ms":>15}{"speedup":>10}'
+        )
+        for baseline_class, table_class, build in self.tables:
+            for rows in options['rows']:
+                object_list = build(rows)
+                renders = (
+                    lambda: baseline_class(request, object_list).render(),
+                    lambda: table_class(request, object_list, compiled=False).render(),
+                    lambda: table_class(request, object_list, compiled=True).render(),
+                )
+                baseline_html, components_html, compiled_html = [render() for render in renders]
+                if not baseline_html == components_html == compiled_html:
+                    raise CommandError(f'{table_class.__name__} renderings differ for {rows} rows.')
+                if UNSAFE_TEXT in compiled_html:
+                    raise CommandError(f'{table_class.__name__} renders unescaped text for {rows} rows.')
+                timings = [
+                    min(timeit.Timer(render).repeat(repeat=options['repeat'], number=1)) * 1000
+                    for render in renders
+                ]
+                self.stdout.write(
+                    f'{table_class.__name__:<18}{rows:>6}{timings[0]:>15.2f}{timings[1]:>17.2f}{timings[2]:>15.2f}'
+                    f'{timings[0] / timings[2]:>9.1f}x'
+                )
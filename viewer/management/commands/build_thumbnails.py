@@ -0,0 +1,34 @@
+from django.core.management import BaseCommand
+
+from viewer.models import Book
+
+
+class Command(BaseCommand):
+    help = 'Make the missing thumbnails of the book pictures shown by the bookcase grid.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of books loaded at once.')
+
+    def handle(self, *args, **options):
+        books = (
+            Book.objects
+            .exclude(picture__isnull=True).exclude(picture='')
+            .filter(thumbnail__isnull=True)
+            .order_by('id')
+        )
+        batch_size = options['batch_size']
+        done = last_id = 0
+        while True:
+            # the book queryset selects the related objects on every filter, the thumbnails need none of them.
+            batch = list(
+                books.filter(id__gt=last_id).select_related(None).only('id', 'picture', 'thumbnail')[:batch_size]
+            )
+            if not batch:
+                break
+            for book in batch:
+                book.update_thumbnail()
+            done += len(batch)
+            last_id = batch[-1].pk
+            self.stdout.write(f'Processed {done} books.')
+        self.stdout.write(self.style.SUCCESS('Done.'))
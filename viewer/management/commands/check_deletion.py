@@ -0,0 +1,110 @@
+import time
+from typing import Iterator
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from viewer import deletion
+from viewer.management.commands.benchmark_deletion import seed_books
+from viewer.models import Bookcase, BookcaseSlot, BookAuthor, Book, Library, AuthorStats, ChangeLogEntry
+
+USERNAME = 'check-deletion'
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete a seeded bookcase and author in chunks inside a transaction which is rolled back, and fail unless '
+        'every chunk is within the chunk size and the deleted rows, tombstones and library counters add up.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000,
+                            help='Number of books in the bookcase and by the author.')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Number of slots or books per transaction, `DELETION_CHUNK_SIZE` by default.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size'] or settings.DELETION_CHUNK_SIZE
+        book_count = options['books']
+        with transaction.atomic():
+            user = User.objects.create(username=f'{USERNAME}-{time.time_ns()}')
+            bookcase, author = seed_books(user, book_count)
+            errors = [
+                *self.check_bookcase(bookcase, chunk_size, book_count),
+                *self.check_author(author, chunk_size, book_count),
+                *self.check_counters(user),
+            ]
+            transaction.set_rollback(True)
+        if errors:
+            raise CommandError('\n'.join(errors))
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted a bookcase and an author of {book_count} books in chunks of at most {chunk_size} rows.'
+        ))
+
+    @staticmethod
+    def check_chunks(name: str, progress: Iterator[tuple[int, int]], chunk_size: int, expected: int) -> list[str]:
+        errors = []
+        previous = 0
+        for done, total in progress:
+            if total != expected:
+                errors.append(f'{name}: {total} rows to delete reported instead of {expected}.')
+            if not 0 < done - previous <= chunk_size:
+                errors.append(f'{name}: a chunk deleted {done - previous} rows, the chunk size is {chunk_size}.')
+            previous = done
+        if previous != expected:
+            errors.append(f'{name}: {previous} rows deleted instead of {expected}.')
+        return errors
+
+    def check_bookcase(self, bookcase: 'Bookcase', chunk_size: int, book_count: int) -> list[str]:
+        slot_count = BookcaseSlot.objects.filter(bookcase=bookcase).count()
+        last_entry_id = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        bookcase.mark_deleted()
+        errors = []
+        if Book.objects.visible().filter(bookcase_slot__bookcase=bookcase).exists():
+            errors.append('bookcase: books of the deleted bookcase are still visible.')
+        errors += self.check_chunks('bookcase', deletion.delete_bookcase(bookcase.pk, chunk_size), chunk_size,
+                                    slot_count)
+        if Bookcase.objects.filter(pk=bookcase.pk).exists() or BookcaseSlot.objects.filter(bookcase=bookcase).exists():
+            errors.append('bookcase: the bookcase or its slots are left.')
+        unplaced = Book.objects.filter(owner=bookcase.user, bookcase_slot__isnull=True).count()
+        if unplaced != book_count:
+            errors.append(f'bookcase: {unplaced} books are left without a slot instead of {book_count}.')
+        tombstones = ChangeLogEntry.objects.filter(
+            id__gt=last_entry_id, model='bookcaseslot', action=ChangeLogEntry.DELETE
+        ).count()
+        if tombstones != slot_count:
+            errors.append(f'bookcase: {tombstones} slot tombstones are logged instead of {slot_count}.')
+        tombstones = ChangeLogEntry.objects.filter(
+            id__gt=last_entry_id, model='bookcase', action=ChangeLogEntry.DELETE
+        ).count()
+        if tombstones != 1:
+            errors.append(f'bookcase: {tombstones} bookcase tombstones are logged instead of 1.')
+        return errors
+
+    def check_author(self, author: 'BookAuthor', chunk_size: int, book_count: int) -> list[str]:
+        last_entry_id = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        author.mark_deleted()
+        errors = []
+        if Book.objects.visible().filter(author=author).exists():
+            errors.append('author: books of the deleted author are still visible.')
+        errors += self.check_chunks('author', deletion.delete_book_author(author.pk, chunk_size), chunk_size,
+                                    book_count)
+        if BookAuthor.objects.filter(pk=author.pk).exists() or AuthorStats.objects.filter(author=author).exists():
+            errors.append('author: the author or its statistics are left.')
+        tombstones = ChangeLogEntry.objects.filter(
+            id__gt=last_entry_id, model='book', action=ChangeLogEntry.DELETE
+        ).count()
+        if tombstones != book_count:
+            errors.append(f'author: {tombstones} book tombstones are logged instead of {book_count}.')
+        return errors
+
+    @staticmethod
+    def check_counters(user: 'User') -> list[str]:
+        counters = Library.objects.filter(user=user).values(*Library.COUNTER_FIELDS).first()
+        Library.rebuild([user.pk])
+        rebuilt = Library.objects.filter(user=user).values(*Library.COUNTER_FIELDS).first()
+        if counters != rebuilt:
+            return [f'library: counters {counters} differ from a rebuild {rebuilt}.']
+        return []
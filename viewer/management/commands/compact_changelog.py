@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from viewer.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = 'Remove superseded change log entries and old tombstones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.CHANGELOG_TOMBSTONE_RETENTION_DAYS,
+                            help='Days to keep the tombstones of deleted objects.')
+
+    def handle(self, *args, **options):
+        superseded, tombstones = ChangeLogEntry.compact(timezone.now() - timedelta(days=options['retention_days']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {superseded} superseded entries and {tombstones} tombstones.'
+        ))
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from viewer.catalog import import_dump
+
+
+class Command(BaseCommand):
+    help = (
+        'Import an Open Library dump or a JSON Lines file of authors, editions and works into the local catalog. '
+        'Interrupted imports continue from the last imported batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Dump files, optionally gzip-compressed.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Number of lines imported in one transaction.')
+        parser.add_argument('--restart', action='store_true', help='Import the files from the start.')
+
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            path = Path(path).resolve()
+            if not path.is_file():
+                raise CommandError(f'File {path} does not exist.')
+            self.stdout.write(f'Importing {path}...')
+            state = None
+            for index, state in enumerate(import_dump(path, options['batch_size'], options['restart'])):
+                if index % 50 == 0:
+                    self.stdout.write(f'{state.record_count} records, {state.position} bytes read.')
+            if state is None:
+                self.stdout.write('Already imported, pass --restart to import again.')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Imported {state.record_count} records.'))
@@ -0,0 +1,248 @@
+import http.cookiejar
+import os
+import queue
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import reverse, resolve
+
+from viewer.models import Bookcase, BookcaseSlot, BookAuthor, Book
+
+CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+# scenario name, weight.
+SCENARIOS = (
+    ('list', 25),
+    ('filter', 15),
+    ('sort', 15),
+    ('paginate', 15),
+    ('other_lists', 10),
+    ('create', 8),
+    ('update', 12),
+)
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Keep redirects as responses, so only the requested view is timed.
+    """
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def percentile(timings: list[float], value: float) -> float:
+    return timings[min(len(timings) - 1, int(len(timings) * value))]
+
+
+class Client:
+    """HTTP client with its own session cookies recording the latency of every request.
+    """
+    def __init__(self, base_url: str, results: dict, lock: 'threading.Lock'):
+        self.base_url = base_url
+        self.results = results
+        self.lock = lock
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), NoRedirectHandler()
+        )
+
+    def request(self, path: str, data: Optional[dict] = None) -> tuple[int, str]:
+        """Send a GET request, or a POST request of the data, and record it.
+
+        Successful form posts redirect, a posted form rendered again has errors and is recorded as failed.
+        """
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body)
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                status, content = response.status, response.read().decode()
+        except urllib.error.HTTPError as error:
+            status, content = error.code, ''
+        except OSError:
+            status, content = 0, ''
+        duration = (time.perf_counter() - started) * 1000
+        name = f'{"POST" if data is not None else "GET"} {resolve(urllib.parse.urlsplit(path).path).view_name}'
+        succeeded = status == 302 if data is not None else 200 <= status < 400
+        with self.lock:
+            self.results[name].append((duration, succeeded))
+        return status, content
+
+    def post_form(self, path: str, data: dict) -> int:
+        _status, content = self.request(path)
+        match = CSRF_TOKEN_RE.search(content)
+        return self.request(path, {**data, 'csrfmiddlewaretoken': match.group(1) if match else ''})[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed users with libraries, start a local server and replay a mix of dashboard traffic, '
+        'reporting throughput and latency percentiles per URL name.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5, help='Number of seeded users logging in.')
+        parser.add_argument('--concurrency', type=int, default=10, help='Number of concurrent clients.')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to generate the traffic for.')
+        parser.add_argument('--books', type=int, default=200, help='Number of books seeded per user.')
+        parser.add_argument('--url', help='Base URL of an already running server, a local one is started otherwise.')
+        parser.add_argument('--password', default='load-test-password', help='Password of the seeded users.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the traffic mix.')
+
+    def handle(self, *args, **options):
+        users = self.seed(options['users'], options['books'], options['password'])
+        server = None
+        base_url = options['url']
+        if not base_url:
+            server, base_url = self.start_server()
+        try:
+            results, elapsed = self.run(base_url, users, options)
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+        self.report(results, elapsed)
+
+    def seed(self, user_count: int, book_count: int, password: str) -> list['User']:
+        """Create the load test users with bookcases and books, keeping the ones already seeded.
+        """
+        authors = [
+            BookAuthor.objects.get_or_create(firstname=f'Load{index}', lastname=f'Test{index % 7}')[0]
+            for index in range(50)
+        ]
+        users = []
+        for index in range(user_count):
+            user, created = User.objects.get_or_create(username=f'load-test-{index}')
+            users.append(user)
+            if not created:
+                continue
+            self.stdout.write(f'Seeding {user.username}...')
+            user.set_password(password)
+            user.save()
+            with transaction.atomic():
+                # a quarter of the slots stays free for the created books.
+                slot_count = book_count * 4 // 3 + 1
+                shelf_capacity = 10
+                bookcase_count = max(1, slot_count // (10 * shelf_capacity) + 1)
+                for bookcase_index in range(bookcase_count):
+                    bookcase = Bookcase.objects.create(user=user, name=f'Bookcase {bookcase_index + 1}')
+                    BookcaseSlot.bulk_create_for_bookcase(bookcase, 10, shelf_capacity)
+                slots = list(BookcaseSlot.objects.filter(bookcase__user=user).order_by('?')[:book_count])
+                for book_index, slot in enumerate(slots):
+                    Book.objects.create(bookcase_slot=slot, author=random.choice(authors),
+                                        name=f'Book {book_index + 1}')
+        return users
+
+    def start_server(self) -> tuple['subprocess.Popen', str]:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        server = subprocess.Popen(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver', '--noreload', f'127.0.0.1:{port}'],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise CommandError('The local server exited on start.')
+                time.sleep(0.2)
+        else:
+            server.terminate()
+            raise CommandError('The local server did not start in 30 seconds.')
+        self.stdout.write(f'Started a local server on port {port}.')
+        return server, f'http://127.0.0.1:{port}'
+
+    def run(self, base_url: str, users: list['User'], options: dict) -> tuple[dict, float]:
+        results = defaultdict(list)
+        lock = threading.Lock()
+        books = {
+            user.pk: list(Book.objects.filter(owner=user).values_list('id', 'bookcase_slot_id', 'author_id'))
+            for user in users
+        }
+        free_slots = {user.pk: queue.Queue() for user in users}
+        slots = BookcaseSlot.objects.filter(bookcase__user__in=users, book__isnull=True)
+        for slot_id, user_id in slots.values_list('id', 'bookcase__user_id'):
+            free_slots[user_id].put(slot_id)
+        # the book form offers the user's authors only.
+        author_ids = {
+            user.pk: list(BookAuthor.get_user_authors(user.pk).values_list('id', flat=True)) for user in users
+        }
+        scenarios, weights = zip(*SCENARIOS)
+        deadline = time.monotonic() + options['duration']
+
+        def work(index: int) -> None:
+            rng = random.Random(options['seed'] + index)
+            user = users[index % len(users)]
+            client = Client(base_url, results, lock)
+            status = client.post_form(reverse('sign_in'), {'username': user.username, 'password': options['password']})
+            if status != 302:
+                self.stderr.write(f'Login of {user.username} failed with {status}.')
+                return
+            book_list = reverse('viewer:book_list')
+            while time.monotonic() < deadline:
+                scenario = rng.choices(scenarios, weights)[0]
+                if scenario == 'list':
+                    client.request(book_list)
+                elif scenario == 'filter':
+                    client.request(f'{book_list}?author_name=Test{rng.randrange(7)}')
+                elif scenario == 'sort':
+                    ordering = rng.choice(('bookcase', 'shelf', 'slot', 'name', 'author'))
+                    client.request(f'{book_list}?ordering={rng.choice(("", "-"))}{ordering}')
+                elif scenario == 'paginate':
+                    client.request(f'{book_list}?page={rng.randint(1, 5)}')
+                elif scenario == 'other_lists':
+                    client.request(reverse(rng.choice(('viewer:bookcase_list', 'viewer:book_author_list'))))
+                elif scenario == 'create' and author_ids[user.pk]:
+                    try:
+                        slot_id = free_slots[user.pk].get_nowait()
+                    except queue.Empty:
+                        continue
+                    client.post_form(reverse('viewer:book_add'), {
+                        'bookcase_slot': slot_id,
+                        'author': rng.choice(author_ids[user.pk]),
+                        'name': f'Load test {slot_id}',
+                    })
+                elif scenario == 'update' and books[user.pk]:
+                    book_id, slot_id, author_id = rng.choice(books[user.pk])
+                    client.post_form(reverse('viewer:book_update', args=[book_id]), {
+                        'bookcase_slot': slot_id or '', 'author': author_id, 'name': f'Book {rng.randrange(10 ** 6)}'
+                    })
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(options['concurrency'])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.monotonic() - started
+
+    def report(self, results: dict, elapsed: float) -> None:
+        total = sum(len(samples) for samples in results.values())
+        self.stdout.write(
+            f'{"url name":<34}{"requests":>9}{"errors":>8}{"req/s":>8}{"p50, ms":>9}{"p95, ms":>9}{"p99, ms":>9}'
+        )
+        for name, samples in sorted(results.items()):
+            timings = sorted(duration for duration, _succeeded in samples)
+            errors = sum(1 for _duration, succeeded in samples if not succeeded)
+            self.stdout.write(
+                f'{name:<34}{len(samples):>9}{errors:>8}{len(samples) / elapsed:>8.1f}'
+                f'{percentile(timings, 0.5):>9.1f}{percentile(timings, 0.95):>9.1f}{percentile(timings, 0.99):>9.1f}'
+            )
+        self.stdout.write(self.style.SUCCESS(f'{total} requests in {elapsed:.1f} s, {total / elapsed:.1f} req/s.'))
@@ -0,0 +1,53 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from viewer.models import Book
+
+
+class Command(BaseCommand):
+    help = 'Merge the books of the same owner and author with names differing only in case, accents or spacing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='+', dest='user_ids',
+                            help='Ids of the users to merge the duplicates for, all users by default.')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of duplicate groups merged in one transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the number of duplicates.')
+
+    def handle(self, *args, **options):
+        books = Book.objects.visible()
+        if options['user_ids']:
+            books = books.filter(owner_id__in=options['user_ids'])
+        batch_size = options['batch_size']
+        group_count = book_count = conflict_count = 0
+        last = None
+        while True:
+            duplicates = Book.get_duplicates(books)
+            if last:
+                # continues after the last merged group over the (owner, fingerprint) index.
+                owner_id, fingerprint = last
+                duplicates = duplicates.filter(Q(owner_id__gt=owner_id) | Q(owner_id=owner_id,
+                                                                            fingerprint__gt=fingerprint))
+            batch = list(duplicates[:batch_size])
+            if not batch:
+                break
+            groups = [(row['owner_id'], row['fingerprint']) for row in batch]
+            group_count += len(groups)
+            if options['dry_run']:
+                # placed books are kept, the unplaced ones are merged into one of them.
+                book_count += sum(row['count'] - max(row['placed'], 1) for row in batch)
+                conflict_count += sum(row['placed'] > 1 for row in batch)
+            else:
+                with transaction.atomic():
+                    deleted, conflicts = Book.merge_duplicates(groups)
+                book_count += deleted
+                conflict_count += conflicts
+                self.stdout.write(f'Merged {group_count} groups.')
+            last = groups[-1]
+        verb = 'Found' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {book_count} duplicate books in {group_count} groups.'))
+        if conflict_count:
+            self.stdout.write(self.style.WARNING(
+                f'{conflict_count} groups have books in several bookcase slots, they are kept to be merged by hand.'
+            ))
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from viewer.models import Library, BookcaseStats, AuthorStats, Bookcase
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the library summary tables from the books and bookcases.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='+', dest='user_ids',
+                            help='Ids of the users to rebuild the statistics for, all users by default.')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of users rebuilt in one transaction.')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options['user_ids']:
+            users = users.filter(id__in=options['user_ids'])
+        user_ids = list(users.values_list('id', flat=True))
+        batch_size = options['batch_size']
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            with transaction.atomic():
+                Library.rebuild(batch)
+                AuthorStats.rebuild(batch)
+                BookcaseStats.rebuild(Bookcase.objects.filter(user_id__in=batch))
+            self.stdout.write(f'Rebuilt {start + len(batch)}/{len(user_ids)} libraries.')
+        self.stdout.write(self.style.SUCCESS('Done.'))
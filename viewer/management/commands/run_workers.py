@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import signal
+import socket
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connections
+
+from viewer.jobs import claim_next, run_job, requeue_stale
+
+
+def work(stop: 'multiprocessing.synchronize.Event', burst: bool) -> None:
+    """Worker process loop: claim and run jobs until asked to stop.
+    """
+    # the parent process coordinates the shutdown, so the current job is always finished.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    try:
+        while not stop.is_set():
+            job = claim_next(worker_id)
+            if job is None:
+                if burst:
+                    break
+                stop.wait(settings.JOBS_POLL_INTERVAL)
+                continue
+            run_job(job)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run a pool of worker processes executing background jobs from the database queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue has no due jobs left.')
+
+    def handle(self, *args, **options):
+        # forked workers must open their own database connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        workers = [
+            context.Process(target=work, args=(stop, options['burst']), name=f'viewer-worker-{index}')
+            for index in range(options['processes'])
+        ]
+
+        def shutdown(signum, frame):
+            self.stdout.write('Stopping workers after their current jobs...')
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        requeued = requeue_stale(settings.JOBS_STALE_TIMEOUT)
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} abandoned jobs.')
+        connections.close_all()
+
+        for worker in workers:
+            worker.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {len(workers)} workers.'))
+
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=settings.JOBS_POLL_INTERVAL)
+            if not stop.is_set():
+                requeue_stale(settings.JOBS_STALE_TIMEOUT)
+        connections.close_all()
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
@@ -1,8 +1,27 @@
-from django.db.models import QuerySet
+from django.apps import apps
+from django.db.models import QuerySet, Exists, OuterRef
 
 
 class BookQuerySet(QuerySet):
     """QuerySet for book model.
     """
     def filter(self, *args, **kwargs):
-        return super().filter(*args, **kwargs).select_related('bookcase_slot__bookcase', 'author')
+        queryset = super().filter(*args, **kwargs)
+        if queryset._fields is not None:
+            # values querysets return no model instances to select the related objects for.
+            return queryset
+        return queryset.select_related('bookcase_slot__bookcase', 'author')
+
+    def visible(self) -> 'BookQuerySet':
+        """Books except those in the bookcases and of the authors being deleted by a background job,
+        the authors deleted for everybody or by the owner.
+        """
+        hidden_authors = apps.get_model('viewer', 'AuthorStats').objects.filter(
+            user_id=OuterRef('owner_id'), author_id=OuterRef('author_id'), is_deleted=True
+        )
+        return (
+            self
+            .exclude(author__is_deleted=True)
+            .exclude(bookcase_slot__bookcase__is_deleted=True)
+            .exclude(Exists(hidden_authors))
+        )
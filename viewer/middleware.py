@@ -0,0 +1,197 @@
+import cProfile
+import io
+import mimetypes
+import pstats
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotFound, HttpResponseNotModified
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from viewer.models import ProfileCapture
+from viewer.storage import ENCODING_SUFFIXES
+from viewer.utils import accepted_encodings
+
+
+class QueryLog:
+    """Database execute wrapper recording the SQL of a request with durations.
+    """
+    def __init__(self):
+        self.queries: list[tuple[str, str, object, float]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.queries.append((context['connection'].alias, sql, params, duration))
+
+    @property
+    def duration(self) -> float:
+        return sum(duration for _alias, _sql, _params, duration in self.queries)
+
+
+class ProfilerMiddleware:
+    """Profile requests of staff users asking for it with a header or a query parameter.
+
+    Add `?<PROFILER_QUERY_PARAM>=1` to the URL or send the `X-Profile` header to store the cProfile
+    stats and the SQL log of the request, listed in the admin as profile captures. Other requests
+    only pay for a dictionary lookup.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_requested(request):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def is_requested(self, request) -> bool:
+        if settings.PROFILER_HEADER not in request.META and settings.PROFILER_QUERY_PARAM not in request.GET:
+            return False
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        query_log = QueryLog()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_log))
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        capture = ProfileCapture(
+            user=request.user,
+            method=request.method,
+            path=request.get_full_path()[:2048],
+            view_name=match.view_name if match else '',
+            status_code=response.status_code,
+            duration=duration,
+            query_count=len(query_log.queries),
+            query_duration=query_log.duration,
+            file_name=f'{timezone.now():%Y%m%d-%H%M%S-%f}',
+        )
+        self.save(capture, profiler, query_log)
+        ProfileCapture.prune(settings.PROFILER_MAX_CAPTURES)
+        response['X-Profile-Capture'] = capture.pk
+        return response
+
+    @staticmethod
+    def save(capture: 'ProfileCapture', profiler: 'cProfile.Profile', query_log: 'QueryLog') -> None:
+        stats_path, report_path = capture.get_files()
+        Path(settings.PROFILER_DIR).mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(stats_path)
+
+        report = io.StringIO()
+        report.write(f'{capture.method} {capture.path}\n{capture.view_name} -> {capture.status_code}\n')
+        report.write(f'Total: {capture.duration:.1f} ms, SQL: {capture.query_count} queries, '
+                     f'{capture.query_duration:.1f} ms\n\n')
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(settings.PROFILER_REPORT_LINES)
+        report.write('\nSQL\n')
+        for index, (alias, sql, params, duration) in enumerate(query_log.queries, start=1):
+            report.write(f'\n#{index} [{alias}] {duration:.2f} ms\n{sql}\nparams: {params!r}\n')
+        report_path.write_text(report.getvalue())
+        capture.save()
+
+
+class StaticFile:
+    """Collected static file with the paths and sizes of its precompressed variants by content encoding.
+    """
+    def __init__(self, path: Path, immutable: bool):
+        self.path = path
+        self.immutable = immutable
+        stat = path.stat()
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        self.variants = {}
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                self.variants[encoding] = variant
+
+    def negotiate(self, accept_encoding: str) -> tuple[Path, Optional[str]]:
+        """Path of the preferred variant accepted by the client and its encoding, the file itself otherwise.
+        """
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, variant in self.variants.items():
+            if encoding in accepted:
+                return variant, encoding
+        return self.path, None
+
+
+class StaticFilesMiddleware:
+    """Serve the collected static files with precompressed variants and far-future caching of hashed names.
+
+    Files with content hashed names never change, so browsers keep them for a year without revalidating.
+    Other files are revalidated on every use. Found files are looked up once per worker, as they only change
+    by deployments, and missing ones on every request, so the lookups are bounded by the collected files.
+    Enabled by `STATIC_SERVE` when no web server in front of the application serves them.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.files: dict[Path, 'StaticFile'] = {}
+        # the storage lists the hashed names only when it keeps a manifest.
+        self.hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if not settings.STATIC_SERVE or not request.path_info.startswith(settings.STATIC_URL):
+            return self.get_response(request)
+        if request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+        static_file = self.get_file(request.path_info[len(settings.STATIC_URL):])
+        if static_file is None:
+            return HttpResponseNotFound()
+        return self.serve(request, static_file)
+
+    def get_file(self, name: str) -> Optional['StaticFile']:
+        try:
+            # the normalized path is the key, so spellings of the same name share the entry.
+            path = Path(safe_join(settings.STATIC_ROOT, name))
+        except SuspiciousFileOperation:
+            return None
+        static_file = self.files.get(path)
+        if static_file is None and path.is_file():
+            static_file = self.files[path] = StaticFile(path, name in self.hashed_names)
+        return static_file
+
+    @staticmethod
+    def serve(request, static_file: 'StaticFile'):
+        if not static_file.immutable and not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'), static_file.mtime, static_file.size
+        ):
+            response = HttpResponseNotModified()
+        else:
+            path, encoding = static_file.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            response = FileResponse(path.open('rb'), content_type=static_file.content_type)
+            # FileResponse derives it from the file name, but the assets are used by pages, not downloaded.
+            del response['Content-Disposition']
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(static_file.mtime)
+        if static_file.immutable:
+            response['Cache-Control'] = f'public, max-age={settings.STATIC_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = 'public, no-cache'
+        if static_file.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
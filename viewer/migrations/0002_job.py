@@ -0,0 +1,61 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('viewer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'verbose_name': 'Book', 'verbose_name_plural': 'Books'},
+        ),
+        migrations.AlterModelOptions(
+            name='bookauthor',
+            options={'verbose_name': 'Book author', 'verbose_name_plural': 'Book authors'},
+        ),
+        migrations.AlterModelOptions(
+            name='bookcase',
+            options={'verbose_name': 'Bookcase', 'verbose_name_plural': 'Bookcases'},
+        ),
+        migrations.AlterModelOptions(
+            name='bookcaseslot',
+            options={'verbose_name': 'Bookcase slot', 'verbose_name_plural': 'Bookcase slots'},
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=254, verbose_name='Job name')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Job arguments')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=16, verbose_name='Status')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Progress')),
+                ('message', models.CharField(blank=True, max_length=254, verbose_name='Message')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Max attempts')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run after')),
+                ('locked_by', models.CharField(blank=True, max_length=254, verbose_name='Locked by')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Locked at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished at')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_after'], name='viewer_job_status_a7477f_idx'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from viewer.utils import collation_key
+
+
+def fill_sort_keys(apps, schema_editor):
+    Book = apps.get_model('viewer', 'Book')
+    books = Book.objects.select_related('bookcase_slot__bookcase', 'author').order_by('id')
+    batch = []
+    for book in books.iterator(chunk_size=1000):
+        slot = book.bookcase_slot
+        if slot:
+            book.owner_id = slot.bookcase.user_id
+            book.sort_bookcase = collation_key(slot.bookcase.name)
+            book.sort_shelf = slot.bookshelf_number
+            book.sort_slot = slot.number
+        book.sort_name = collation_key(book.name)
+        book.sort_author = collation_key(f'{book.author.lastname} {book.author.firstname}', max_length=510)
+        batch.append(book)
+        if len(batch) == 1000:
+            Book.objects.bulk_update(batch, ['owner', 'sort_bookcase', 'sort_shelf', 'sort_slot', 'sort_name',
+                                             'sort_author'])
+            batch = []
+    Book.objects.bulk_update(batch, ['owner', 'sort_bookcase', 'sort_shelf', 'sort_slot', 'sort_name',
+                                     'sort_author'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('viewer', '0002_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='owner',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='books', to=settings.AUTH_USER_MODEL, verbose_name='Owner'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='sort_author',
+            field=models.CharField(blank=True, editable=False, max_length=510),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='sort_bookcase',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='sort_name',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='sort_shelf',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='sort_slot',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_sort_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['owner', 'id'], name='viewer_book_owner_i_b26721_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['owner', 'sort_bookcase', 'sort_shelf', 'sort_slot', 'id'], name='viewer_book_owner_i_dab35c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['owner', 'sort_shelf', 'sort_bookcase', 'sort_slot', 'id'], name='viewer_book_owner_i_15465b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['owner', 'sort_slot', 'sort_bookcase', 'sort_shelf', 'id'], name='viewer_book_owner_i_f9c444_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['owner', 'sort_name', 'id'], name='viewer_book_owner_i_eab406_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['owner', 'sort_author', 'id'], name='viewer_book_owner_i_4eac96_idx'),
+        ),
+    ]
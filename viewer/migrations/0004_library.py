@@ -0,0 +1,26 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('viewer', '0003_book_sort_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Library',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='library', serialize=False, to='auth.user', verbose_name='User')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Library',
+                'verbose_name_plural': 'Libraries',
+            },
+        ),
+    ]
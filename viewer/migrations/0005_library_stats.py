@@ -0,0 +1,124 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q
+
+
+def build_library_stats(apps, schema_editor):
+    Book = apps.get_model('viewer', 'Book')
+    Bookcase = apps.get_model('viewer', 'Bookcase')
+    Library = apps.get_model('viewer', 'Library')
+    BookcaseStats = apps.get_model('viewer', 'BookcaseStats')
+    AuthorStats = apps.get_model('viewer', 'AuthorStats')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    existing = set(Library.objects.values_list('user_id', flat=True))
+    Library.objects.bulk_create(
+        [Library(user_id=user_id) for user_id in User.objects.values_list('id', flat=True) if user_id not in existing]
+    )
+    books = (
+        Book.objects
+        .filter(owner__isnull=False)
+        .order_by()
+        .values('owner_id')
+        .annotate(total=Count('id'), unplaced=Count('id', filter=Q(bookcase_slot__isnull=True)))
+    )
+    for row in books:
+        Library.objects.filter(user_id=row['owner_id']).update(book_count=row['total'],
+                                                                unplaced_book_count=row['unplaced'])
+    for row in Bookcase.objects.order_by().values('user_id').annotate(total=Count('id')):
+        Library.objects.filter(user_id=row['user_id']).update(bookcase_count=row['total'])
+
+    BookcaseStats.objects.bulk_create([
+        BookcaseStats(bookcase_id=row['id'], user_id=row['user_id'], slot_count=row['total'],
+                      occupied_slot_count=row['occupied'])
+        for row in Bookcase.objects.order_by().values('id', 'user_id').annotate(
+            total=Count('slots'),
+            occupied=Count('slots__book')
+        )
+    ], batch_size=1000)
+    AuthorStats.objects.bulk_create([
+        AuthorStats(user_id=row['owner_id'], author_id=row['author_id'], book_count=row['total'])
+        for row in Book.objects.filter(owner__isnull=False).order_by().values('owner_id', 'author_id').annotate(
+            total=Count('id')
+        )
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('viewer', '0004_library'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_count', models.IntegerField(default=0, verbose_name='Books')),
+            ],
+            options={
+                'verbose_name': 'Author statistics',
+                'verbose_name_plural': 'Author statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='BookcaseStats',
+            fields=[
+                ('bookcase', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='viewer.bookcase', verbose_name='Bookcase')),
+                ('slot_count', models.IntegerField(default=0, verbose_name='Slots')),
+                ('occupied_slot_count', models.IntegerField(default=0, verbose_name='Occupied slots')),
+            ],
+            options={
+                'verbose_name': 'Bookcase statistics',
+                'verbose_name_plural': 'Bookcase statistics',
+            },
+        ),
+        migrations.AddField(
+            model_name='library',
+            name='book_count',
+            field=models.IntegerField(default=0, verbose_name='Books'),
+        ),
+        migrations.AddField(
+            model_name='library',
+            name='bookcase_count',
+            field=models.IntegerField(default=0, verbose_name='Bookcases'),
+        ),
+        migrations.AddField(
+            model_name='library',
+            name='unplaced_book_count',
+            field=models.IntegerField(default=0, verbose_name='Books without a slot'),
+        ),
+        migrations.AddIndex(
+            model_name='library',
+            index=models.Index(fields=['-book_count'], name='viewer_libr_book_co_1d0e43_idx'),
+        ),
+        migrations.AddField(
+            model_name='bookcasestats',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookcase_stats', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddField(
+            model_name='authorstats',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='viewer.bookauthor', verbose_name='Book author'),
+        ),
+        migrations.AddField(
+            model_name='authorstats',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_stats', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='authorstats',
+            index=models.Index(fields=['user', '-book_count'], name='viewer_auth_user_id_b6060c_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='authorstats',
+            unique_together={('user', 'author')},
+        ),
+        migrations.RunPython(build_library_stats, migrations.RunPython.noop),
+    ]
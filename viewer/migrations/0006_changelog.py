@@ -0,0 +1,73 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_changelog(apps, schema_editor):
+    """Log the existing objects as saved, so a client syncing from scratch receives the whole library.
+    """
+    ChangeLogEntry = apps.get_model('viewer', 'ChangeLogEntry')
+    sources = (
+        ('BookAuthor', None),
+        ('Bookcase', 'user_id'),
+        ('BookcaseSlot', 'bookcase__user_id'),
+        ('Book', 'owner_id'),
+    )
+    for model_name, user_lookup in sources:
+        objects = apps.get_model('viewer', model_name).objects.order_by('id')
+        rows = objects.values_list('id', user_lookup) if user_lookup else objects.values_list('id', 'id')
+        ChangeLogEntry.objects.bulk_create(
+            (ChangeLogEntry(user_id=user_id if user_lookup else None, model=model_name.lower(), object_id=object_id,
+                            action='save')
+             for object_id, user_id in rows.iterator()),
+            batch_size=1000
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('viewer', '0005_library_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogCompaction',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.PositiveBigIntegerField(verbose_name='Horizon')),
+                ('removed_count', models.PositiveIntegerField(default=0, verbose_name='Removed entries')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+            ],
+            options={
+                'verbose_name': 'Change log compaction',
+                'verbose_name_plural': 'Change log compactions',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('book', 'Book'), ('bookcase', 'Bookcase'), ('bookcaseslot', 'Bookcase slot'), ('bookauthor', 'Book author')], max_length=16, verbose_name='Model')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Object id')),
+                ('action', models.CharField(choices=[('save', 'Save'), ('delete', 'Delete')], max_length=8, verbose_name='Action')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('user', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='changes', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Change log entry',
+                'verbose_name_plural': 'Change log entries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['user', 'id'], name='viewer_chan_user_id_07bdde_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['model', 'object_id', 'id'], name='viewer_chan_model_025740_idx'),
+        ),
+        migrations.RunPython(seed_changelog, migrations.RunPython.noop),
+    ]
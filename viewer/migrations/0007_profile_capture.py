@@ -0,0 +1,36 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('viewer', '0006_changelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileCapture',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=8, verbose_name='Method')),
+                ('path', models.CharField(max_length=2048, verbose_name='Path')),
+                ('view_name', models.CharField(blank=True, max_length=254, verbose_name='View name')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Status code')),
+                ('duration', models.FloatField(verbose_name='Duration, ms')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Queries')),
+                ('query_duration', models.FloatField(verbose_name='Query duration, ms')),
+                ('file_name', models.CharField(max_length=254, verbose_name='File name')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profile_captures', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Profile capture',
+                'verbose_name_plural': 'Profile captures',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0007_profile_capture'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['sort_name', 'id'], name='viewer_book_sort_na_b31434_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookauthor',
+            index=models.Index(fields=['lastname', 'firstname'], name='viewer_book_lastnam_a57925_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookcase',
+            index=models.Index(fields=['name'], name='viewer_book_name_500bbe_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.14 on 2026-10-19 05:58
+
+from django.db import migrations, models
+
+from viewer.utils import book_fingerprint
+
+
+def fill_fingerprints(apps, schema_editor):
+    Book = apps.get_model('viewer', 'Book')
+    batch = []
+    for book in Book.objects.only('id', 'name', 'author_id').order_by('id').iterator(chunk_size=1000):
+        book.fingerprint = book_fingerprint(book.name, book.author_id)
+        batch.append(book)
+        if len(batch) == 1000:
+            Book.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    Book.objects.bulk_update(batch, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0008_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['owner', 'fingerprint', 'id'], name='viewer_book_owner_i_3dca6c_idx'),
+        ),
+    ]
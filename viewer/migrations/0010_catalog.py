@@ -0,0 +1,77 @@
+# Generated by Django 3.1.14 on 2026-10-19 06:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0009_book_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogAuthor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32, unique=True, verbose_name='Key')),
+                ('name', models.CharField(max_length=254, verbose_name='Name')),
+            ],
+            options={
+                'verbose_name': 'Catalog author',
+                'verbose_name_plural': 'Catalog authors',
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogBook',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32, unique=True, verbose_name='Key')),
+                ('title', models.CharField(max_length=254, verbose_name='Title')),
+                ('sort_title', models.CharField(editable=False, max_length=254, verbose_name='Sort title')),
+                ('author_key', models.CharField(blank=True, max_length=32, verbose_name='Author key')),
+            ],
+            options={
+                'verbose_name': 'Catalog book',
+                'verbose_name_plural': 'Catalog books',
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogImport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=512, unique=True, verbose_name='Path')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('position', models.PositiveBigIntegerField(default=0, verbose_name='Position')),
+                ('record_count', models.PositiveBigIntegerField(default=0, verbose_name='Records')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished at')),
+            ],
+            options={
+                'verbose_name': 'Catalog import',
+                'verbose_name_plural': 'Catalog imports',
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogIsbn',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('isbn', models.CharField(max_length=13, verbose_name='ISBN')),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='isbns', to='viewer.catalogbook', verbose_name='Book')),
+            ],
+            options={
+                'verbose_name': 'Catalog ISBN',
+                'verbose_name_plural': 'Catalog ISBNs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='catalogbook',
+            index=models.Index(fields=['sort_title', 'id'], name='viewer_cata_sort_ti_4b5bd2_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='catalogisbn',
+            unique_together={('isbn', 'book')},
+        ),
+    ]
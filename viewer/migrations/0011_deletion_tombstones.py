@@ -0,0 +1,23 @@
+# Generated by Django 3.1.14 on 2026-10-19 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0010_catalog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookauthor',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Deleted'),
+        ),
+        migrations.AddField(
+            model_name='bookcase',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Deleted'),
+        ),
+    ]
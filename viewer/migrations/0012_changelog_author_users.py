@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def assign_author_entries(apps, schema_editor):
+    """Replace the shared book author entries by entries of every user having the author.
+
+    Users of deleted authors are unknown, so their tombstones are removed and the compaction horizon
+    is moved past them: clients synced before have to download the library again.
+    """
+    ChangeLogEntry = apps.get_model('viewer', 'ChangeLogEntry')
+    ChangeLogCompaction = apps.get_model('viewer', 'ChangeLogCompaction')
+    AuthorStats = apps.get_model('viewer', 'AuthorStats')
+    shared = ChangeLogEntry.objects.filter(user__isnull=True)
+    horizon = shared.filter(action='delete').aggregate(horizon=Max('id'))['horizon']
+    removed, _deleted = shared.delete()
+    if not removed:
+        return
+    ChangeLogEntry.objects.bulk_create(
+        (ChangeLogEntry(user_id=user_id, model='bookauthor', object_id=author_id, action='save')
+         for user_id, author_id in AuthorStats.objects.order_by('id').values_list('user_id', 'author_id').iterator()),
+        batch_size=1000
+    )
+    if horizon is not None:
+        ChangeLogCompaction.objects.create(horizon=horizon, removed_count=removed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0011_deletion_tombstones'),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_author_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-19 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0012_changelog_author_users'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='', verbose_name='Book thumbnail'),
+        ),
+    ]
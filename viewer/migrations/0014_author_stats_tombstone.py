@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0013_book_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Deleted'),
+        ),
+    ]
@@ -1,5 +1,17 @@
+import hashlib
+from typing import Optional
+
 from django.contrib import messages
+from django.http import HttpResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.translation import get_language
+
+from viewer.models import Library
+from viewer.page_cache import get_page_cache, CachedPage
+
+# request header of the list script asking for the list fragment instead of the whole page.
+FRAGMENT_HEADER = 'X-Fragment'
 
 
 class MessageMixin:
@@ -30,3 +42,83 @@ class RedirectMixin:
         if self.redirect_url_pattern:
             return reverse(self.redirect_url_pattern, args=(self.object.pk,))
         return self.success_url
+
+
+class FragmentMixin:
+    """Mixin rendering only the list fragment, the table with its pagination and facets, on requests with
+    the fragment header, which are sent by the list script on filtering, sorting and paging.
+
+    Both the pages and the fragments are validated by an ETag of the user's library version, so a repeated
+    request is answered before the list is queried. `Vary` keeps them apart in caches as they share URLs.
+    """
+    fragment_template_name = 'blocks/_list.html'
+
+    def is_fragment(self) -> bool:
+        return FRAGMENT_HEADER in self.request.headers
+
+    def get_template_names(self):
+        if self.is_fragment():
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def get(self, request, *args, **kwargs):
+        etag = None
+        # pending messages are shown by the next page, a cached page would hide them.
+        if self.is_fragment() or not len(messages.get_messages(request)):
+            etag = self.make_etag()
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                # `304 Not Modified` has to repeat the headers of the full response.
+                return self.set_cache_headers(response, etag)
+        response = self.get_page_response(request, etag, *args, **kwargs)
+        return self.set_cache_headers(response, etag)
+
+    @staticmethod
+    def set_cache_headers(response, etag: Optional[str]):
+        if etag is not None:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, (FRAGMENT_HEADER,))
+        return response
+
+    def get_page_response(self, request, etag: Optional[str], *args, **kwargs):
+        """Response with the page or the fragment, `etag` is None when the response must not be cached.
+        """
+        return super().get(request, *args, **kwargs)
+
+    def make_etag(self) -> str:
+        user_id = self.request.user.pk
+        version = f'{user_id}:{Library.get_version(user_id)}:{get_language()}:{self.is_fragment()}'
+        # the query as seen by the view, the pagination may have reset the page.
+        digest = hashlib.md5(f'{version}:{self.request.path}?{self.request.GET.urlencode()}'.encode()).hexdigest()
+        return f'"{digest}"'
+
+
+class PageCacheMixin(FragmentMixin):
+    """Mixin serving pages and fragments from the page cache of compressed responses, see `viewer.page_cache`.
+
+    Pages are cached under their ETag, which includes the user's library version, so every change of
+    the library is visible at once. The body is sent compressed when the client accepts an encoding.
+    """
+    def get_page_response(self, request, etag: Optional[str], *args, **kwargs):
+        page_cache = get_page_cache()
+        if page_cache is None or etag is None:
+            return super().get_page_response(request, etag, *args, **kwargs)
+        key = etag.strip('"')
+        page = page_cache.get(key)
+        status = 'hit'
+        if page is None:
+            response = super().get_page_response(request, etag, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.render()
+            page = CachedPage.create(response.content, response['Content-Type'])
+            page_cache.set(key, page)
+            status = 'miss'
+        content, encoding = page.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = HttpResponse(content, content_type=page.content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['X-Page-Cache'] = status
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
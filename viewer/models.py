@@ -1,15 +1,39 @@
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Count, Q, Exists, OuterRef, Max
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from viewer.managers import BookQuerySet
+from viewer.thumbnails import get_thumbnail_name, make_thumbnail
+from viewer.utils import collation_key, book_fingerprint
+
+
+class ChangeLoggedModel(models.Model):
+    """Base of the models whose changes are appended to the `ChangeLogEntry` log by `viewer.signals`.
+
+    Saving runs in a transaction, so the change and its entry written by the `post_save` receiver are
+    committed together. Deletions are atomic with their signals already.
+    """
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
-class Bookcase(models.Model):
+class Bookcase(ChangeLoggedModel):
     """A bookcase model for grouping shelves with books.
     """
     user = models.ForeignKey(User, blank=True, on_delete=models.CASCADE)
     name = models.CharField(verbose_name=_('Bookcase name'), max_length=254)
+    # set when the bookcase is hidden until it is deleted by a background job.
+    is_deleted = models.BooleanField(verbose_name=_('Deleted'), default=False, editable=False)
 
     class Meta:
         verbose_name = _('Bookcase')
@@ -17,12 +41,24 @@ class Bookcase(models.Model):
         unique_together = (
             ('user', 'name'),
         )
+        indexes = [
+            models.Index(fields=['name']),
+        ]
 
     def __str__(self):
         return self.name
 
+    def mark_deleted(self) -> None:
+        """Hide the bookcase at once, its slots are deleted in chunks by `viewer.deletion.delete_bookcase`.
+        """
+        with transaction.atomic():
+            Bookcase.objects.filter(pk=self.pk).update(is_deleted=True)
+            Library.bump_version(self.user_id)
+            ChangeLogEntry.record(Bookcase, ChangeLogEntry.DELETE, [self.pk], user_id=self.user_id)
+        self.is_deleted = True
+
 
-class BookcaseSlot(models.Model):
+class BookcaseSlot(ChangeLoggedModel):
     """Model to store book placement in the bookcase.
     """
     bookcase = models.ForeignKey('viewer.Bookcase', verbose_name=_('Bookcase'), related_name='slots',
@@ -50,13 +86,19 @@ class BookcaseSlot(models.Model):
             ) for shelf_number in range(bookshelf_count) for slot_number in range(bookshelf_capacity)
         ]
         cls.objects.bulk_create(batch)
+        slot_ids = cls.objects.filter(bookcase=bookcase).values_list('id', flat=True)
+        ChangeLogEntry.record(cls, ChangeLogEntry.SAVE, slot_ids, user_id=bookcase.user_id)
+        BookcaseStats.change_counters(bookcase.pk, slot_count=len(batch))
+        Library.bump_version(bookcase.user_id)
 
 
-class BookAuthor(models.Model):
+class BookAuthor(ChangeLoggedModel):
     """A book author model.
     """
     firstname = models.CharField(verbose_name=_('First name'), max_length=254)
     lastname = models.CharField(verbose_name=_('Last name'), max_length=254)
+    # set when the author is hidden until it is deleted by a background job.
+    is_deleted = models.BooleanField(verbose_name=_('Deleted'), default=False, editable=False)
 
     class Meta:
         verbose_name = _('Book author')
@@ -64,13 +106,85 @@ class BookAuthor(models.Model):
         unique_together = (
             ('firstname', 'lastname'),
         )
+        indexes = [
+            models.Index(fields=['lastname', 'firstname']),
+        ]
 
     def __str__(self):
-        return f'{self.firstname} {self.lastname}'
+        return f'{self.firstname} {self.lastname}'.strip()
 
+    @property
+    def sort_key(self) -> str:
+        return collation_key(f'{self.lastname} {self.firstname}', max_length=510)
 
-class Book(models.Model):
+    def mark_deleted(self) -> None:
+        """Hide the author at once, its books are deleted in chunks by `viewer.deletion.delete_book_author`.
+        """
+        with transaction.atomic():
+            BookAuthor.objects.filter(pk=self.pk).update(is_deleted=True)
+            user_ids = self.get_user_ids()
+            Library.bump_version(*user_ids)
+            ChangeLogEntry.record_for_users(BookAuthor, ChangeLogEntry.DELETE, [self.pk], user_ids)
+        self.is_deleted = True
+
+    def get_user_ids(self) -> set[int]:
+        """Users having the author among their authors, including those without books by it.
+        """
+        user_ids = set(AuthorStats.objects.filter(author=self).values_list('user_id', flat=True))
+        user_ids.update(Book.objects.filter(author=self).order_by().values_list('owner_id', flat=True).distinct())
+        return user_ids
+
+    def is_shared(self, user_id: int) -> bool:
+        """Whether users other than the user have the author among their authors or own books by it.
+        """
+        return (
+            AuthorStats.objects.filter(author=self).exclude(user_id=user_id).exists() or
+            Book.objects.filter(author=self).exclude(owner_id=user_id).exists()
+        )
+
+    def is_deleted_for(self, user_id: int) -> bool:
+        """Whether the author is being deleted for everybody or by the user from the user's authors.
+        """
+        return self.is_deleted or AuthorStats.objects.filter(user_id=user_id, author=self, is_deleted=True).exists()
+
+    def is_used(self) -> bool:
+        return AuthorStats.objects.filter(author=self).exists() or Book.objects.filter(author=self).exists()
+
+    def move_user_books(self, user_id: int, author: 'BookAuthor') -> None:
+        """Move the user's books by the author to the other author, which replaces it among the user's authors.
+
+        The author is left to the other users and deleted when nobody uses it anymore.
+        """
+        books = [
+            Book(id=book_id, author=author, sort_author=author.sort_key, fingerprint=book_fingerprint(name, author.pk))
+            for book_id, name in Book.objects.filter(author=self, owner_id=user_id).values_list('id', 'name')
+        ]
+        Book.objects.bulk_update(books, ['author', 'sort_author', 'fingerprint'], batch_size=500)
+        AuthorStats.remove(user_id, self.pk)
+        AuthorStats.add(user_id, author.pk)
+        AuthorStats.change_count(user_id, author.pk, len(books))
+        ChangeLogEntry.record(Book, ChangeLogEntry.SAVE, [book.pk for book in books], user_id=user_id)
+        Library.bump_version(user_id)
+        if not self.is_used():
+            self.delete()
+
+    @classmethod
+    def get_user_authors(cls, user_id: int) -> 'models.QuerySet':
+        """Authors of the user's books or added by the user, annotated with the number of the user's books by them.
+        """
+        return (
+            cls.objects
+            .filter(stats__user_id=user_id, stats__is_deleted=False, is_deleted=False)
+            .annotate(book_count=F('stats__book_count'))
+        )
+
+
+class Book(ChangeLoggedModel):
     """A book model.
+
+    Besides the user fields, a book stores its owner and the sort keys of every list ordering,
+    so sorted book pages of a user are read straight from an index. The keys are filled on save
+    and kept current by `viewer.signals` when bookcases or authors change.
     """
     bookcase_slot = models.OneToOneField('viewer.BookcaseSlot', verbose_name=_('Bookcase slot'), related_name='book',
                                          null=True, on_delete=models.SET_NULL)
@@ -78,12 +192,659 @@ class Book(models.Model):
                                on_delete=models.CASCADE)
     name = models.CharField(verbose_name=_('Book name'), max_length=254)
     picture = models.ImageField(verbose_name=_('Book picture'), blank=True, null=True)
+    # small copy of the picture for the bookcase grid, made by `update_thumbnail`.
+    thumbnail = models.ImageField(verbose_name=_('Book thumbnail'), blank=True, null=True, editable=False)
+
+    # denormalized fields for sorting.
+    owner = models.ForeignKey(User, verbose_name=_('Owner'), related_name='books', null=True, editable=False,
+                              db_index=False, on_delete=models.CASCADE)
+    sort_bookcase = models.CharField(max_length=254, blank=True, editable=False)
+    sort_shelf = models.PositiveIntegerField(default=0, editable=False)
+    sort_slot = models.PositiveIntegerField(default=0, editable=False)
+    sort_name = models.CharField(max_length=254, blank=True, editable=False)
+    sort_author = models.CharField(max_length=510, blank=True, editable=False)
+    # equal for duplicates of the book.
+    fingerprint = models.CharField(max_length=40, blank=True, editable=False)
+
+    DENORMALIZED_FIELDS = ('owner', 'sort_bookcase', 'sort_shelf', 'sort_slot', 'sort_name', 'sort_author',
+                           'fingerprint')
 
     objects = BookQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Book')
         verbose_name_plural = _('Books')
+        indexes = [
+            models.Index(fields=['owner', 'id']),
+            models.Index(fields=['owner', 'sort_bookcase', 'sort_shelf', 'sort_slot', 'id']),
+            models.Index(fields=['owner', 'sort_shelf', 'sort_bookcase', 'sort_slot', 'id']),
+            models.Index(fields=['owner', 'sort_slot', 'sort_bookcase', 'sort_shelf', 'id']),
+            models.Index(fields=['owner', 'sort_name', 'id']),
+            models.Index(fields=['owner', 'sort_author', 'id']),
+            # admin search across owners.
+            models.Index(fields=['sort_name', 'id']),
+            models.Index(fields=['owner', 'fingerprint', 'id']),
+        ]
 
     def __str__(self):
         return f'{self.name} - {self.author}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # keep the loaded placement to apply changes of the book to the library statistics.
+        instance.loaded_placement = instance.get_placement()
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.fill_sort_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.DENORMALIZED_FIELDS}
+        super().save(*args, **kwargs)
+        self.loaded_placement = self.get_placement()
+        if (update_fields is None or 'picture' in update_fields) and 'picture' not in self.get_deferred_fields():
+            self.update_thumbnail()
+
+    def update_thumbnail(self) -> None:
+        """Make the thumbnail of a new picture and drop the thumbnail of a removed one.
+
+        Runs after saving, as an uploaded picture gets its final name when it is stored.
+        """
+        thumbnail_name = get_thumbnail_name(self.picture.name) if self.picture else None
+        if (self.thumbnail.name or None) == thumbnail_name:
+            return
+        self.thumbnail = make_thumbnail(self.picture) if self.picture else None
+        Book.objects.filter(pk=self.pk).update(thumbnail=self.thumbnail.name or None)
+
+    def get_placement(self) -> tuple:
+        """Owner, bookcase slot and author ids of the book.
+        """
+        return self.__dict__.get('owner_id'), self.__dict__.get('bookcase_slot_id'), self.__dict__.get('author_id')
+
+    def fill_sort_keys(self) -> None:
+        slot = self.bookcase_slot
+        if slot:
+            self.owner_id = slot.bookcase.user_id
+            self.sort_bookcase = collation_key(slot.bookcase.name)
+            self.sort_shelf = slot.bookshelf_number
+            self.sort_slot = slot.number
+        else:
+            self.sort_bookcase = ''
+            self.sort_shelf = self.sort_slot = 0
+        self.sort_name = collation_key(self.name)
+        self.sort_author = self.author.sort_key
+        self.fingerprint = book_fingerprint(self.name, self.author_id)
+
+    @classmethod
+    def get_duplicates(cls, queryset: 'models.QuerySet') -> 'models.QuerySet':
+        """Owner, fingerprint, size and number of placed books of every group of duplicates in the books,
+        grouped over the fingerprint index.
+        """
+        return (
+            queryset
+            .order_by()
+            .values('owner_id', 'fingerprint')
+            .annotate(count=Count('id'), placed=Count('bookcase_slot'))
+            .filter(count__gt=1)
+            .order_by('owner_id', 'fingerprint')
+        )
+
+    @classmethod
+    def merge_duplicates(cls, groups: list[tuple[int, str]]) -> tuple[int, int]:
+        """Merge the unplaced books of every (owner id, fingerprint) group into one book and delete them.
+
+        Placed books are copies standing in the bookcases, so they are all kept and the unplaced ones are
+        merged into one of them, preferring a book with a picture. A kept book without a picture takes one
+        of the merged books. Groups with several placed books stay duplicates, to be resolved by the user.
+        Returns the numbers of deleted books and of groups left with several placed books.
+        """
+        groups = set(groups)
+        books = defaultdict(list)
+        candidates = cls.objects.filter(
+            owner_id__in={owner_id for owner_id, _fingerprint in groups},
+            fingerprint__in={fingerprint for _owner_id, fingerprint in groups}
+        ).order_by('id')
+        for book in candidates:
+            if (book.owner_id, book.fingerprint) in groups:
+                books[(book.owner_id, book.fingerprint)].append(book)
+
+        duplicate_ids = []
+        conflicts = 0
+        for group in books.values():
+            keeper, *others = sorted(group, key=lambda book: (book.bookcase_slot_id is None, not book.picture))
+            duplicates = [book for book in others if book.bookcase_slot_id is None]
+            if len(duplicates) < len(others):
+                conflicts += 1
+            if not keeper.picture:
+                keeper.picture = next((book.picture for book in duplicates if book.picture), keeper.picture)
+                if keeper.picture:
+                    keeper.save(update_fields=['picture'])
+            duplicate_ids.extend(book.pk for book in duplicates)
+        cls.objects.filter(pk__in=duplicate_ids).delete()
+        return len(duplicate_ids), conflicts
+
+
+class Library(models.Model):
+    """Per-user library state and summary counters.
+
+    `version` is incremented on every change of the user's books, bookcases or their authors,
+    so it can be used in cache keys of data computed over the library. Counters are changed
+    incrementally on writes by `viewer.signals` and can be rebuilt from scratch with `rebuild`.
+    """
+    user = models.OneToOneField(User, verbose_name=_('User'), related_name='library', primary_key=True,
+                                on_delete=models.CASCADE)
+    version = models.PositiveBigIntegerField(verbose_name=_('Version'), default=0)
+    book_count = models.IntegerField(verbose_name=_('Books'), default=0)
+    unplaced_book_count = models.IntegerField(verbose_name=_('Books without a slot'), default=0)
+    bookcase_count = models.IntegerField(verbose_name=_('Bookcases'), default=0)
+
+    COUNTER_FIELDS = ('book_count', 'unplaced_book_count', 'bookcase_count')
+
+    class Meta:
+        verbose_name = _('Library')
+        verbose_name_plural = _('Libraries')
+        indexes = [
+            models.Index(fields=['-book_count']),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: v{self.version}'
+
+    @classmethod
+    def get(cls, user_id: int) -> 'Library':
+        library = cls.objects.filter(user_id=user_id).first()
+        if library is None:
+            cls.rebuild([user_id])
+            library = cls.objects.get(user_id=user_id)
+        return library
+
+    @classmethod
+    def get_version(cls, user_id: int) -> int:
+        return cls.get(user_id).version
+
+    @classmethod
+    def bump_version(cls, *user_ids: int) -> None:
+        user_ids = {user_id for user_id in user_ids if user_id}
+        if user_ids:
+            cls.objects.filter(user_id__in=user_ids).update(version=F('version') + 1)
+
+    @classmethod
+    def change_counters(cls, user_id: int, **deltas: int) -> None:
+        """Add the deltas to the library counters, building a missing library from scratch.
+        """
+        changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if changes and not cls.objects.filter(user_id=user_id).update(**changes):
+            cls.rebuild([user_id])
+
+    @classmethod
+    def rebuild(cls, user_ids: list[int]) -> None:
+        """Recalculate the library counters of the users, keeping their versions.
+        """
+        counters = {user_id: dict.fromkeys(cls.COUNTER_FIELDS, 0) for user_id in user_ids}
+        books = (
+            Book.objects
+            .filter(owner_id__in=user_ids)
+            .order_by()
+            .values('owner_id')
+            .annotate(total=Count('id'), unplaced=Count('id', filter=Q(bookcase_slot__isnull=True)))
+        )
+        for row in books:
+            counters[row['owner_id']].update(book_count=row['total'], unplaced_book_count=row['unplaced'])
+        bookcases = (
+            Bookcase.objects
+            .filter(user_id__in=user_ids)
+            .order_by()
+            .values('user_id')
+            .annotate(total=Count('id'))
+        )
+        for row in bookcases:
+            counters[row['user_id']]['bookcase_count'] = row['total']
+
+        existing = set(cls.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        cls.objects.bulk_create(
+            [cls(user_id=user_id) for user_id in user_ids if user_id not in existing], ignore_conflicts=True
+        )
+        cls.objects.bulk_update(
+            [cls(user_id=user_id, **values) for user_id, values in counters.items()], cls.COUNTER_FIELDS
+        )
+
+
+class BookcaseStats(models.Model):
+    """Summary counters of the bookcase slots.
+    """
+    bookcase = models.OneToOneField('viewer.Bookcase', verbose_name=_('Bookcase'), related_name='stats',
+                                    primary_key=True, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, verbose_name=_('User'), related_name='bookcase_stats', on_delete=models.CASCADE)
+    slot_count = models.IntegerField(verbose_name=_('Slots'), default=0)
+    occupied_slot_count = models.IntegerField(verbose_name=_('Occupied slots'), default=0)
+
+    class Meta:
+        verbose_name = _('Bookcase statistics')
+        verbose_name_plural = _('Bookcase statistics')
+
+    def __str__(self):
+        return f'{self.bookcase_id}: {self.occupied_slot_count}/{self.slot_count}'
+
+    @property
+    def occupancy(self) -> int:
+        return round(100 * self.occupied_slot_count / self.slot_count) if self.slot_count else 0
+
+    @classmethod
+    def change_counters(cls, bookcase_id: int, **deltas: int) -> None:
+        """Add the deltas to the bookcase counters, building missing statistics from scratch.
+        """
+        changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if changes and not cls.objects.filter(bookcase_id=bookcase_id).update(**changes):
+            cls.rebuild(Bookcase.objects.filter(pk=bookcase_id))
+
+    @classmethod
+    def rebuild(cls, bookcases: 'models.QuerySet') -> None:
+        """Recalculate the statistics of the bookcases.
+        """
+        rows = bookcases.order_by().values('id', 'user_id').annotate(
+            total=Count('slots'),
+            occupied=Count('slots__book')
+        )
+        stats = [
+            cls(bookcase_id=row['id'], user_id=row['user_id'], slot_count=row['total'],
+                occupied_slot_count=row['occupied'])
+            for row in rows
+        ]
+        cls.objects.filter(bookcase__in=bookcases).delete()
+        cls.objects.bulk_create(stats)
+
+
+class AuthorStats(models.Model):
+    """Number of the user's books by the author.
+
+    Rows are kept when the count drops to zero, so they also list the authors the user has added,
+    see `BookAuthor.get_user_authors`.
+    """
+    user = models.ForeignKey(User, verbose_name=_('User'), related_name='author_stats', on_delete=models.CASCADE)
+    author = models.ForeignKey('viewer.BookAuthor', verbose_name=_('Book author'), related_name='stats',
+                               on_delete=models.CASCADE)
+    book_count = models.IntegerField(verbose_name=_('Books'), default=0)
+    # set when the user deletes a shared author, hiding it with the user's books until a background job deletes them.
+    is_deleted = models.BooleanField(verbose_name=_('Deleted'), default=False, editable=False)
+
+    class Meta:
+        verbose_name = _('Author statistics')
+        verbose_name_plural = _('Author statistics')
+        unique_together = (
+            ('user', 'author'),
+        )
+        indexes = [
+            models.Index(fields=['user', '-book_count']),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.author_id}: {self.book_count}'
+
+    @classmethod
+    def change_count(cls, user_id: int, author_id: int, delta: int) -> None:
+        updated = cls.objects.filter(user_id=user_id, author_id=author_id).update(book_count=F('book_count') + delta)
+        if not updated and delta > 0:
+            cls.objects.create(user_id=user_id, author_id=author_id, book_count=delta)
+            # the author is new to the user's change log.
+            ChangeLogEntry.record(BookAuthor, ChangeLogEntry.SAVE, [author_id], user_id=user_id)
+
+    @classmethod
+    def add(cls, user_id: int, author_id: int) -> None:
+        """Add the author to the user's authors.
+        """
+        with transaction.atomic():
+            _stats, created = cls.objects.get_or_create(user_id=user_id, author_id=author_id)
+            if created:
+                ChangeLogEntry.record(BookAuthor, ChangeLogEntry.SAVE, [author_id], user_id=user_id)
+                Library.bump_version(user_id)
+
+    @classmethod
+    def remove(cls, user_id: int, author_id: int) -> None:
+        """Remove the author from the user's authors, the user's books by it have to be moved or deleted.
+        """
+        with transaction.atomic():
+            stats = cls.objects.filter(user_id=user_id, author_id=author_id).first()
+            if stats is None:
+                return
+            cls.objects.filter(pk=stats.pk).delete()
+            # the removal of a hidden author was logged when it was hidden.
+            if not stats.is_deleted:
+                ChangeLogEntry.record(BookAuthor, ChangeLogEntry.DELETE, [author_id], user_id=user_id)
+                Library.bump_version(user_id)
+
+    @classmethod
+    def mark_deleted(cls, user_id: int, author_id: int) -> None:
+        """Hide the shared author and the user's books by it at once, for `viewer.deletion.delete_book_author`
+        to delete the books and remove the author from the user's authors.
+        """
+        with transaction.atomic():
+            if cls.objects.filter(user_id=user_id, author_id=author_id, is_deleted=False).update(is_deleted=True):
+                ChangeLogEntry.record(BookAuthor, ChangeLogEntry.DELETE, [author_id], user_id=user_id)
+                Library.bump_version(user_id)
+
+    @classmethod
+    def rebuild(cls, user_ids: list[int]) -> None:
+        """Recalculate the author statistics of the users, keeping the authors without books.
+        """
+        rows = (
+            Book.objects
+            .filter(owner_id__in=user_ids)
+            .order_by()
+            .values('owner_id', 'author_id')
+            .annotate(total=Count('id'))
+        )
+        counts = {(row['owner_id'], row['author_id']): row['total'] for row in rows}
+        changed = []
+        for stats in cls.objects.filter(user_id__in=user_ids):
+            book_count = counts.pop((stats.user_id, stats.author_id), 0)
+            if stats.book_count != book_count:
+                stats.book_count = book_count
+                changed.append(stats)
+        cls.objects.bulk_update(changed, ['book_count'], batch_size=500)
+        cls.objects.bulk_create([
+            cls(user_id=user_id, author_id=author_id, book_count=book_count)
+            for (user_id, author_id), book_count in counts.items()
+        ])
+
+
+class JobLockLost(Exception):
+    """The running job was requeued as stale or finished by another worker.
+    """
+
+
+class Job(models.Model):
+    """A background job stored in the database and executed by the `run_workers` command.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, _('Pending')),
+        (RUNNING, _('Running')),
+        (SUCCEEDED, _('Succeeded')),
+        (FAILED, _('Failed')),
+    )
+    ACTIVE_STATUSES = (PENDING, RUNNING)
+
+    user = models.ForeignKey(User, verbose_name=_('User'), related_name='jobs', blank=True, null=True,
+                             on_delete=models.CASCADE)
+    name = models.CharField(verbose_name=_('Job name'), max_length=254)
+    kwargs = models.JSONField(verbose_name=_('Job arguments'), default=dict, blank=True)
+    status = models.CharField(verbose_name=_('Status'), max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    progress = models.PositiveSmallIntegerField(verbose_name=_('Progress'), default=0)
+    message = models.CharField(verbose_name=_('Message'), max_length=254, blank=True)
+    error = models.TextField(verbose_name=_('Error'), blank=True)
+    attempts = models.PositiveIntegerField(verbose_name=_('Attempts'), default=0)
+    max_attempts = models.PositiveIntegerField(verbose_name=_('Max attempts'), default=3)
+    run_after = models.DateTimeField(verbose_name=_('Run after'), default=timezone.now)
+    locked_by = models.CharField(verbose_name=_('Locked by'), max_length=254, blank=True)
+    locked_at = models.DateTimeField(verbose_name=_('Locked at'), blank=True, null=True)
+    created_at = models.DateTimeField(verbose_name=_('Created at'), auto_now_add=True)
+    finished_at = models.DateTimeField(verbose_name=_('Finished at'), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _('Job')
+        verbose_name_plural = _('Jobs')
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f'{self.name}#{self.pk} ({self.status})'
+
+    def set_progress(self, progress: int, message: str = '') -> None:
+        """Store the job progress in percents without touching other fields.
+
+        Progress is the heartbeat of the worker: it renews the lock, so a job reporting progress is never
+        requeued as stale. Raises `JobLockLost` when the job is no longer locked by the worker.
+        """
+        self.progress = max(0, min(100, int(progress)))
+        self.message = message[:254]
+        self.locked_at = timezone.now()
+        updated = Job.objects.filter(pk=self.pk, status=Job.RUNNING, locked_by=self.locked_by).update(
+            progress=self.progress,
+            message=self.message,
+            locked_at=self.locked_at
+        )
+        if not updated:
+            raise JobLockLost(f'Job {self} is no longer locked by worker "{self.locked_by}".')
+
+    def as_dict(self) -> dict:
+        return {
+            'id': self.pk,
+            'name': self.name,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class ChangeLogEntry(models.Model):
+    """Append-only log of the library changes read by the sync clients.
+
+    Entries are written by `viewer.signals` in the transaction of the change, so the auto-incremented
+    id is a monotonic cursor: a client asks for the entries after the last id it has seen. Deleted
+    objects are logged as tombstones. Book authors are shared, so their changes are logged for every user
+    having the author, and an author is logged as saved for a user when it is added to the user's authors.
+    """
+    SAVE = 'save'
+    DELETE = 'delete'
+    ACTION_CHOICES = (
+        (SAVE, _('Save')),
+        (DELETE, _('Delete')),
+    )
+    MODEL_CHOICES = (
+        ('book', _('Book')),
+        ('bookcase', _('Bookcase')),
+        ('bookcaseslot', _('Bookcase slot')),
+        ('bookauthor', _('Book author')),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, verbose_name=_('User'), related_name='changes', blank=True, null=True,
+                             db_index=False, on_delete=models.CASCADE)
+    model = models.CharField(verbose_name=_('Model'), max_length=16, choices=MODEL_CHOICES)
+    object_id = models.PositiveIntegerField(verbose_name=_('Object id'))
+    action = models.CharField(verbose_name=_('Action'), max_length=8, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(verbose_name=_('Created at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Change log entry')
+        verbose_name_plural = _('Change log entries')
+        indexes = [
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['model', 'object_id', 'id']),
+        ]
+
+    def __str__(self):
+        return f'#{self.pk} {self.action} {self.model}:{self.object_id}'
+
+    @classmethod
+    def record(cls, model: type[models.Model], action: str, object_ids, user_id: int = None) -> None:
+        cls.objects.bulk_create([
+            cls(user_id=user_id, model=model._meta.model_name, object_id=object_id, action=action)
+            for object_id in object_ids
+        ])
+
+    @classmethod
+    def record_for_users(cls, model: type[models.Model], action: str, object_ids, user_ids) -> None:
+        cls.objects.bulk_create([
+            cls(user_id=user_id, model=model._meta.model_name, object_id=object_id, action=action)
+            for user_id in user_ids for object_id in object_ids
+        ])
+
+    @classmethod
+    def compact(cls, tombstones_before) -> tuple[int, int]:
+        """Remove entries superseded by a later entry of the same object and tombstones older than the date.
+
+        Superseded entries are never needed: a client after any cursor still gets the latest entry of the
+        object. Removed tombstones move the compaction horizon, clients behind it have to sync from scratch.
+        Returns the numbers of removed superseded entries and tombstones.
+        """
+        later = cls.objects.filter(model=OuterRef('model'), object_id=OuterRef('object_id'), id__gt=OuterRef('id'))
+        superseded, _deleted = cls.objects.filter(Exists(later.filter(user=OuterRef('user')))).delete()
+        tombstones = cls.objects.filter(action=cls.DELETE, created_at__lt=tombstones_before)
+        horizon = tombstones.aggregate(horizon=Max('id'))['horizon']
+        removed = 0
+        if horizon is not None:
+            removed, _deleted = tombstones.filter(id__lte=horizon).delete()
+            ChangeLogCompaction.objects.create(horizon=horizon, removed_count=superseded + removed)
+        return superseded, removed
+
+
+class ChangeLogCompaction(models.Model):
+    """A run of the change log compaction which removed tombstones up to the horizon id.
+    """
+    horizon = models.PositiveBigIntegerField(verbose_name=_('Horizon'))
+    removed_count = models.PositiveIntegerField(verbose_name=_('Removed entries'), default=0)
+    created_at = models.DateTimeField(verbose_name=_('Created at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Change log compaction')
+        verbose_name_plural = _('Change log compactions')
+
+    def __str__(self):
+        return f'{self.created_at}: {self.horizon}'
+
+    @classmethod
+    def get_horizon(cls) -> int:
+        """Cursor below which the change log is no longer complete.
+        """
+        return cls.objects.aggregate(horizon=Max('horizon'))['horizon'] or 0
+
+
+class ProfileCapture(models.Model):
+    """Profile of a single request captured by `viewer.middleware.ProfilerMiddleware`.
+
+    The profiler and SQL reports are stored as files in `PROFILER_DIR`, only the latest
+    `PROFILER_MAX_CAPTURES` captures are kept.
+    """
+    user = models.ForeignKey(User, verbose_name=_('User'), related_name='profile_captures', blank=True, null=True,
+                             on_delete=models.SET_NULL)
+    method = models.CharField(verbose_name=_('Method'), max_length=8)
+    path = models.CharField(verbose_name=_('Path'), max_length=2048)
+    view_name = models.CharField(verbose_name=_('View name'), max_length=254, blank=True)
+    status_code = models.PositiveSmallIntegerField(verbose_name=_('Status code'), blank=True, null=True)
+    duration = models.FloatField(verbose_name=_('Duration, ms'))
+    query_count = models.PositiveIntegerField(verbose_name=_('Queries'))
+    query_duration = models.FloatField(verbose_name=_('Query duration, ms'))
+    file_name = models.CharField(verbose_name=_('File name'), max_length=254)
+    created_at = models.DateTimeField(verbose_name=_('Created at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Profile capture')
+        verbose_name_plural = _('Profile captures')
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.duration:.0f} ms)'
+
+    def get_files(self) -> list[Path]:
+        """Paths of the binary cProfile stats and the text report of the capture.
+        """
+        directory = Path(settings.PROFILER_DIR)
+        return [directory / f'{self.file_name}.prof', directory / f'{self.file_name}.txt']
+
+    def read_report(self) -> str:
+        try:
+            return self.get_files()[1].read_text()
+        except OSError:
+            return ''
+
+    def delete_files(self) -> None:
+        for path in self.get_files():
+            path.unlink(missing_ok=True)
+
+    @classmethod
+    def prune(cls, keep: int) -> None:
+        """Delete all captures but the latest ones.
+        """
+        for capture in cls.objects.order_by('-id')[keep:]:
+            capture.delete()
+
+
+class CatalogAuthor(models.Model):
+    """An author of the offline bibliographic catalog imported by `import_catalog`.
+    """
+    key = models.CharField(verbose_name=_('Key'), max_length=32, unique=True)
+    name = models.CharField(verbose_name=_('Name'), max_length=254)
+
+    class Meta:
+        verbose_name = _('Catalog author')
+        verbose_name_plural = _('Catalog authors')
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def names(self) -> tuple[str, str]:
+        """First and last name, the catalog stores only the full name.
+
+        Single names, such as pen names, are last names without a first name.
+        """
+        firstname, _separator, lastname = self.name.strip().rpartition(' ')
+        return firstname.strip(), lastname
+
+
+class CatalogBook(models.Model):
+    """A book of the offline bibliographic catalog imported by `import_catalog`.
+
+    The author is referenced by the catalog key, as authors and books come from separate dumps
+    imported in any order.
+    """
+    key = models.CharField(verbose_name=_('Key'), max_length=32, unique=True)
+    title = models.CharField(verbose_name=_('Title'), max_length=254)
+    sort_title = models.CharField(verbose_name=_('Sort title'), max_length=254, editable=False)
+    author_key = models.CharField(verbose_name=_('Author key'), max_length=32, blank=True)
+
+    class Meta:
+        verbose_name = _('Catalog book')
+        verbose_name_plural = _('Catalog books')
+        indexes = [
+            models.Index(fields=['sort_title', 'id']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class CatalogIsbn(models.Model):
+    """An ISBN of the catalog book, ISBN-10 are stored converted to ISBN-13.
+    """
+    isbn = models.CharField(verbose_name=_('ISBN'), max_length=13)
+    book = models.ForeignKey('viewer.CatalogBook', verbose_name=_('Book'), related_name='isbns',
+                             on_delete=models.CASCADE)
+
+    class Meta:
+        verbose_name = _('Catalog ISBN')
+        verbose_name_plural = _('Catalog ISBNs')
+        unique_together = (
+            ('isbn', 'book'),
+        )
+
+    def __str__(self):
+        return self.isbn
+
+
+class CatalogImport(models.Model):
+    """Progress of the catalog dump import, the position is committed with every imported batch.
+    """
+    path = models.CharField(verbose_name=_('Path'), max_length=512, unique=True)
+    size = models.PositiveBigIntegerField(verbose_name=_('Size'))
+    position = models.PositiveBigIntegerField(verbose_name=_('Position'), default=0)
+    record_count = models.PositiveBigIntegerField(verbose_name=_('Records'), default=0)
+    created_at = models.DateTimeField(verbose_name=_('Created at'), auto_now_add=True)
+    updated_at = models.DateTimeField(verbose_name=_('Updated at'), auto_now=True)
+    finished_at = models.DateTimeField(verbose_name=_('Finished at'), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _('Catalog import')
+        verbose_name_plural = _('Catalog imports')
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,222 @@
+import abc
+import gzip
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+from viewer.storage import ENCODING_SUFFIXES, get_compressors
+from viewer.utils import accepted_encodings
+
+# dynamic pages are compressed on the request, so faster levels than for the static files are used.
+PAGE_COMPRESSION_LEVELS = {'br': 5, 'gzip': 6}
+
+
+class CachedPage(NamedTuple):
+    """Rendered page with its body compressed by every available content encoding.
+    """
+    created: float
+    content_type: str
+    bodies: dict[str, bytes]
+
+    @classmethod
+    def create(cls, content: bytes, content_type: str) -> 'CachedPage':
+        bodies = {
+            encoding: compressor(content, PAGE_COMPRESSION_LEVELS[encoding])
+            for encoding, compressor in get_compressors().items()
+        }
+        return cls(time.time(), content_type, bodies)
+
+    @property
+    def size(self) -> int:
+        return sum(map(len, self.bodies.values()))
+
+    def negotiate(self, accept_encoding: str) -> tuple[bytes, Optional[str]]:
+        """Body in the preferred encoding accepted by the client and the encoding, the plain body otherwise.
+        """
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODING_SUFFIXES:
+            if encoding in accepted and encoding in self.bodies:
+                return self.bodies[encoding], encoding
+        return gzip.decompress(self.bodies['gzip']), None
+
+
+class PageCache(abc.ABC):
+    """Base of the page caches evicting the least recently used pages above the size limit in bytes.
+
+    Hits and misses are counted per worker process.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: str) -> Optional['CachedPage']:
+        page = self.load(key)
+        # pages rendered by templates of a previous deployment expire eventually.
+        if page is not None and time.time() - page.created > settings.PAGE_CACHE_TIMEOUT:
+            page = None
+        if page is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return page
+
+    def set(self, key: str, page: 'CachedPage') -> None:
+        if page.size <= self.max_size:
+            self.store(key, page)
+
+    @abc.abstractmethod
+    def load(self, key: str) -> Optional['CachedPage']:
+        """Page stored under the key, marked as the most recently used, None when it is missing.
+        """
+
+    @abc.abstractmethod
+    def store(self, key: str, page: 'CachedPage') -> None:
+        """Store the page under the key, evicting the least recently used pages above the size limit.
+        """
+
+    @abc.abstractmethod
+    def get_usage(self) -> tuple[int, int]:
+        """Number of the cached pages and their size in bytes.
+        """
+
+    def get_stats(self) -> dict:
+        entries, size = self.get_usage()
+        requests = self.hits + self.misses
+        return {
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(100 * self.hits / requests) if requests else 0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size': size,
+            'max_size': self.max_size,
+        }
+
+
+class MemoryPageCache(PageCache):
+    """Page cache in the memory of the worker process.
+    """
+    def __init__(self, max_size: int):
+        super().__init__(max_size)
+        self.pages: OrderedDict[str, CachedPage] = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def load(self, key: str) -> Optional['CachedPage']:
+        with self.lock:
+            page = self.pages.get(key)
+            if page is not None:
+                self.pages.move_to_end(key)
+            return page
+
+    def store(self, key: str, page: 'CachedPage') -> None:
+        with self.lock:
+            previous = self.pages.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self.pages[key] = page
+            self.size += page.size
+            while self.size > self.max_size:
+                _key, evicted = self.pages.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def get_usage(self) -> tuple[int, int]:
+        return len(self.pages), self.size
+
+
+class DiskPageCache(PageCache):
+    """Page cache in files of a directory shared by the worker processes.
+
+    A page is a line of JSON with the content type and the body sizes followed by the bodies. The modification
+    time of a file is its last use, the least recently used files are deleted once a tenth of the size limit
+    has been written since the previous eviction.
+    """
+    suffix = '.page'
+
+    def __init__(self, max_size: int, directory: Path):
+        super().__init__(max_size)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.written = max_size
+        self.lock = threading.Lock()
+
+    def get_path(self, key: str) -> Path:
+        return self.directory / f'{key}{self.suffix}'
+
+    def load(self, key: str) -> Optional['CachedPage']:
+        path = self.get_path(key)
+        try:
+            with path.open('rb') as file:
+                header = json.loads(file.readline())
+                bodies = {encoding: file.read(size) for encoding, size in header['sizes'].items()}
+                page = CachedPage(header['created'], header['content_type'], bodies)
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return page
+
+    def store(self, key: str, page: 'CachedPage') -> None:
+        header = {
+            'created': page.created,
+            'content_type': page.content_type,
+            'sizes': {encoding: len(body) for encoding, body in page.bodies.items()},
+        }
+        path = self.get_path(key)
+        temporary = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with temporary.open('wb') as file:
+            file.write(json.dumps(header).encode() + b'\n')
+            for body in page.bodies.values():
+                file.write(body)
+        # readers see either no file or the whole page.
+        os.replace(temporary, path)
+        with self.lock:
+            self.written += page.size
+            if self.written < self.max_size // 10:
+                return
+            self.written = 0
+        self.evict()
+
+    def iter_files(self):
+        for path in self.directory.glob(f'*{self.suffix}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def evict(self) -> None:
+        files = sorted(self.iter_files())
+        size = sum(file_size for _mtime, file_size, _path in files)
+        for _mtime, file_size, path in files:
+            if size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= file_size
+            self.evictions += 1
+
+    def get_usage(self) -> tuple[int, int]:
+        files = list(self.iter_files())
+        return len(files), sum(file_size for _mtime, file_size, _path in files)
+
+
+@lru_cache(maxsize=None)
+def get_page_cache() -> Optional['PageCache']:
+    """Page cache of the worker process configured by `PAGE_CACHE_BACKEND`, None when it is disabled.
+    """
+    if settings.PAGE_CACHE_BACKEND == 'memory':
+        return MemoryPageCache(settings.PAGE_CACHE_MAX_SIZE)
+    if settings.PAGE_CACHE_BACKEND == 'disk':
+        return DiskPageCache(settings.PAGE_CACHE_MAX_SIZE, settings.PAGE_CACHE_DIR)
+    return None
@@ -0,0 +1,198 @@
+from collections import Counter, defaultdict
+
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from viewer.models import (
+    Bookcase, BookcaseSlot, BookAuthor, Book, Library, BookcaseStats, AuthorStats, ChangeLogEntry, ProfileCapture
+)
+from viewer.utils import collation_key
+
+
+@receiver(post_save, sender=Bookcase)
+def update_bookcase_sort_keys(sender, instance: 'Bookcase', created: bool, **kwargs):
+    if not created:
+        Book.objects.filter(bookcase_slot__bookcase=instance).update(
+            owner_id=instance.user_id,
+            sort_bookcase=collation_key(instance.name)
+        )
+
+
+@receiver(pre_delete, sender=Bookcase)
+def reset_bookcase_sort_keys(sender, instance: 'Bookcase', **kwargs):
+    # books are left without a slot after bookcase deletion.
+    Book.objects.filter(bookcase_slot__bookcase=instance).update(sort_bookcase='', sort_shelf=0, sort_slot=0)
+
+
+@receiver(post_save, sender=BookcaseSlot)
+def update_slot_sort_keys(sender, instance: 'BookcaseSlot', created: bool, **kwargs):
+    if not created:
+        Book.objects.filter(bookcase_slot=instance).update(
+            owner_id=instance.bookcase.user_id,
+            sort_bookcase=collation_key(instance.bookcase.name),
+            sort_shelf=instance.bookshelf_number,
+            sort_slot=instance.number
+        )
+
+
+@receiver(post_save, sender=BookAuthor)
+def update_author_sort_keys(sender, instance: 'BookAuthor', created: bool, **kwargs):
+    if not created:
+        Book.objects.filter(author=instance).update(sort_author=instance.sort_key)
+
+
+@receiver(post_save, sender=Book)
+def bump_book_library_version(sender, instance: 'Book', **kwargs):
+    previous_owner_id, _slot_id, _author_id = getattr(instance, 'loaded_placement', (None, None, None))
+    Library.bump_version(instance.owner_id, previous_owner_id)
+
+
+@receiver(post_delete, sender=Book)
+def bump_deleted_book_library_version(sender, instance: 'Book', **kwargs):
+    Library.bump_version(instance.owner_id)
+
+
+@receiver(post_save, sender=Bookcase)
+@receiver(post_delete, sender=Bookcase)
+def bump_bookcase_library_version(sender, instance: 'Bookcase', **kwargs):
+    Library.bump_version(instance.user_id)
+
+
+@receiver(post_save, sender=BookcaseSlot)
+def bump_slot_library_version(sender, instance: 'BookcaseSlot', **kwargs):
+    Library.bump_version(instance.bookcase.user_id)
+
+
+@receiver(post_save, sender=BookAuthor)
+@receiver(pre_delete, sender=BookAuthor)
+def bump_author_library_version(sender, instance: 'BookAuthor', **kwargs):
+    if not kwargs.get('created'):
+        Library.bump_version(*instance.get_user_ids())
+
+
+def apply_book_placements(*changes: tuple) -> None:
+    """Apply (placement, delta) changes of books to the library statistics.
+
+    Deltas are summed per counter row first, so a book moved inside one library updates every row once.
+    """
+    slot_ids = {placement[1] for placement, _delta in changes if placement[1]}
+    bookcase_ids = dict(BookcaseSlot.objects.filter(pk__in=slot_ids).values_list('id', 'bookcase_id'))
+    library_deltas = defaultdict(Counter)
+    author_deltas = Counter()
+    bookcase_deltas = Counter()
+    for (owner_id, slot_id, author_id), delta in changes:
+        if owner_id:
+            library_deltas[owner_id]['book_count'] += delta
+            if not slot_id:
+                library_deltas[owner_id]['unplaced_book_count'] += delta
+            author_deltas[(owner_id, author_id)] += delta
+        if slot_id in bookcase_ids:
+            bookcase_deltas[bookcase_ids[slot_id]] += delta
+
+    for owner_id, deltas in library_deltas.items():
+        Library.change_counters(owner_id, **deltas)
+    for (owner_id, author_id), delta in author_deltas.items():
+        if delta:
+            AuthorStats.change_count(owner_id, author_id, delta)
+    for bookcase_id, delta in bookcase_deltas.items():
+        BookcaseStats.change_counters(bookcase_id, occupied_slot_count=delta)
+
+
+@receiver(post_save, sender=Book)
+def update_book_stats(sender, instance: 'Book', created: bool, **kwargs):
+    placement = instance.get_placement()
+    if created:
+        apply_book_placements((placement, 1))
+    elif hasattr(instance, 'loaded_placement'):
+        if instance.loaded_placement != placement:
+            apply_book_placements((instance.loaded_placement, -1), (placement, 1))
+    else:
+        # the previous state of the book is unknown.
+        Library.rebuild([instance.owner_id])
+        AuthorStats.rebuild([instance.owner_id])
+        BookcaseStats.rebuild(Bookcase.objects.filter(user_id=instance.owner_id))
+
+
+@receiver(post_delete, sender=Book)
+def update_deleted_book_stats(sender, instance: 'Book', **kwargs):
+    apply_book_placements((instance.get_placement(), -1))
+
+
+@receiver(post_save, sender=Bookcase)
+def update_bookcase_stats(sender, instance: 'Bookcase', created: bool, **kwargs):
+    if created:
+        BookcaseStats.objects.create(bookcase=instance, user_id=instance.user_id)
+        Library.change_counters(instance.user_id, bookcase_count=1)
+
+
+@receiver(pre_delete, sender=Bookcase)
+def remember_bookcase_stats(sender, instance: 'Bookcase', **kwargs):
+    instance.occupied_slot_count = (
+        Book.objects.filter(bookcase_slot__bookcase=instance).count()
+    )
+
+
+@receiver(post_delete, sender=Bookcase)
+def update_deleted_bookcase_stats(sender, instance: 'Bookcase', **kwargs):
+    # books of the bookcase are left without a slot.
+    Library.change_counters(
+        instance.user_id,
+        bookcase_count=-1,
+        unplaced_book_count=getattr(instance, 'occupied_slot_count', 0)
+    )
+
+
+@receiver(post_save, sender=Book)
+def log_book_change(sender, instance: 'Book', **kwargs):
+    previous_owner_id, _slot_id, _author_id = getattr(instance, 'loaded_placement', (None, None, None))
+    if previous_owner_id and previous_owner_id != instance.owner_id:
+        # the book left the previous owner's library.
+        ChangeLogEntry.record(Book, ChangeLogEntry.DELETE, [instance.pk], user_id=previous_owner_id)
+    ChangeLogEntry.record(Book, ChangeLogEntry.SAVE, [instance.pk], user_id=instance.owner_id)
+
+
+@receiver(post_delete, sender=Book)
+def log_book_deletion(sender, instance: 'Book', **kwargs):
+    ChangeLogEntry.record(Book, ChangeLogEntry.DELETE, [instance.pk], user_id=instance.owner_id)
+
+
+@receiver(post_save, sender=Bookcase)
+def log_bookcase_change(sender, instance: 'Bookcase', **kwargs):
+    ChangeLogEntry.record(Bookcase, ChangeLogEntry.SAVE, [instance.pk], user_id=instance.user_id)
+
+
+@receiver(post_delete, sender=Bookcase)
+def log_bookcase_deletion(sender, instance: 'Bookcase', **kwargs):
+    ChangeLogEntry.record(Bookcase, ChangeLogEntry.DELETE, [instance.pk], user_id=instance.user_id)
+
+
+@receiver(post_save, sender=BookcaseSlot)
+def log_slot_change(sender, instance: 'BookcaseSlot', **kwargs):
+    ChangeLogEntry.record(BookcaseSlot, ChangeLogEntry.SAVE, [instance.pk], user_id=instance.bookcase.user_id)
+
+
+@receiver(pre_delete, sender=BookcaseSlot)
+def log_slot_deletion(sender, instance: 'BookcaseSlot', **kwargs):
+    user_id = Bookcase.objects.filter(pk=instance.bookcase_id).values_list('user_id', flat=True).first()
+    ChangeLogEntry.record(BookcaseSlot, ChangeLogEntry.DELETE, [instance.pk], user_id=user_id)
+    # the book of the slot is left without a slot and is not saved.
+    book_ids = Book.objects.filter(bookcase_slot=instance).values_list('id', flat=True)
+    ChangeLogEntry.record(Book, ChangeLogEntry.SAVE, book_ids, user_id=user_id)
+
+
+@receiver(post_save, sender=BookAuthor)
+def log_author_change(sender, instance: 'BookAuthor', created: bool, **kwargs):
+    # new authors are logged for the users they are added to by `AuthorStats`.
+    if not created:
+        ChangeLogEntry.record_for_users(BookAuthor, ChangeLogEntry.SAVE, [instance.pk], instance.get_user_ids())
+
+
+@receiver(pre_delete, sender=BookAuthor)
+def log_author_deletion(sender, instance: 'BookAuthor', **kwargs):
+    # the users are known only before the author statistics are deleted with the author.
+    ChangeLogEntry.record_for_users(BookAuthor, ChangeLogEntry.DELETE, [instance.pk], instance.get_user_ids())
+
+
+@receiver(post_delete, sender=ProfileCapture)
+def delete_profile_capture_files(sender, instance: 'ProfileCapture', **kwargs):
+    instance.delete_files()
@@ -0,0 +1,64 @@
+import gzip
+from typing import Callable
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# suffixes of the precompressed variants by their content encoding, the preferred encoding first.
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+COMPRESSED_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.html', '.xml')
+# responses of smaller files fit into a single packet anyway.
+COMPRESSION_MIN_SIZE = 256
+
+
+def compress_gzip(content: bytes, level: int = 9) -> bytes:
+    # the fixed modification time keeps the variants of unchanged files the same on every build.
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_brotli(content: bytes, level: int = 11) -> bytes:
+    return brotli.compress(content, quality=level)
+
+
+def get_compressors() -> dict[str, Callable[..., bytes]]:
+    """Compressors of the available variants by their content encoding.
+    """
+    compressors = {'gzip': compress_gzip}
+    if brotli is not None:
+        compressors['br'] = compress_brotli
+    return compressors
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Static files storage with content hashed names, writing gzip and brotli variants of the text files.
+
+    `collectstatic` writes the variants next to the original and the hashed files when they are smaller,
+    so they are compressed once per build instead of on every response. They are served by
+    `viewer.middleware.StaticFilesMiddleware`. Brotli variants need the optional `brotli` package.
+    """
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            self.compress(name)
+
+    def compress(self, name: str) -> None:
+        if not name.endswith(COMPRESSED_EXTENSIONS):
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < COMPRESSION_MIN_SIZE:
+            return
+        for encoding, compressor in get_compressors().items():
+            variant = name + ENCODING_SUFFIXES[encoding]
+            compressed = compressor(content)
+            if self.exists(variant):
+                self.delete(variant)
+            if len(compressed) < len(content):
+                self._save(variant, ContentFile(compressed))
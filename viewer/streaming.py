@@ -0,0 +1,295 @@
+import asyncio
+import csv
+import io
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.handlers.base import BaseHandler
+from django.db import close_old_connections
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import resolve, Resolver404
+
+from viewer.models import Job
+
+# ORM calls of the streaming handlers run in their own bounded pool, so held open streams
+# neither exhaust the threads nor wait for the thread serving the synchronous views.
+executor = ThreadPoolExecutor(max_workers=settings.STREAMING_DATABASE_THREADS, thread_name_prefix='viewer-streaming')
+
+
+def database_sync_to_async(func: Callable) -> Callable:
+    """Wrap a function using the ORM to be awaited from the streaming handlers.
+    """
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(wrapper, thread_sensitive=False, executor=executor)
+
+
+class Echo:
+    """Pseudo buffer returning the written value, to get single CSV rows from `csv.writer`.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+BOOK_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('author_firstname', 'author__firstname'),
+    ('author_lastname', 'author__lastname'),
+    ('bookcase', 'bookcase_slot__bookcase__name'),
+    ('bookshelf_number', 'bookcase_slot__bookshelf_number'),
+    ('slot_number', 'bookcase_slot__number'),
+)
+
+
+def iter_book_export(queryset: 'QuerySet', chunk_size: int = 500) -> Iterator[str]:
+    """CSV of the books, produced in chunks of rows.
+
+    Every chunk is a separate keyset query, so no cursor or transaction is held while the client reads.
+    """
+    lookups = [lookup for _column, lookup in BOOK_EXPORT_COLUMNS]
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, _lookup in BOOK_EXPORT_COLUMNS])
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by('id').values_list(*lookups)[:chunk_size])
+        if not rows:
+            break
+        yield ''.join(writer.writerow(row) for row in rows)
+        last_id = rows[-1][0]
+
+
+def get_active_jobs(user_ids: list[int]) -> dict[int, list[dict]]:
+    jobs = defaultdict(list)
+    for job in Job.objects.filter(user_id__in=user_ids, status__in=Job.ACTIVE_STATUSES).order_by('id'):
+        jobs[job.user_id].append(job.as_dict())
+    return jobs
+
+
+class JobEventHub:
+    """Polls the active jobs of all users with open event streams in a single query per interval.
+
+    Every stream gets a queue holding only the latest jobs of its user, so the database load
+    does not grow with the number of open streams and a slow client never delays the others.
+    """
+    def __init__(self):
+        self.subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self.task: Optional[asyncio.Future] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers[user_id].add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.poll())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        self.subscribers[user_id].discard(queue)
+        if not self.subscribers[user_id]:
+            del self.subscribers[user_id]
+
+    async def poll(self) -> None:
+        load_jobs = database_sync_to_async(get_active_jobs)
+        while self.subscribers:
+            jobs = await load_jobs(list(self.subscribers))
+            for user_id, queues in list(self.subscribers.items()):
+                for queue in queues:
+                    if queue.full():
+                        queue.get_nowait()
+                    queue.put_nowait(jobs.get(user_id, []))
+            await asyncio.sleep(settings.JOBS_POLL_INTERVAL)
+
+
+job_event_hub = JobEventHub()
+
+
+class StreamingHandler(BaseHandler):
+    """Django request handling of the streaming views with all configured middleware.
+
+    Sessions, authentication and the response headers of the middleware apply to the streams like to the
+    other views. `view` replaces the view of the URL for views streaming differently under ASGI. The
+    returned response only starts the stream, its content is sent by the ASGI handlers below.
+    """
+    def __init__(self, view: Optional[Callable] = None):
+        super().__init__()
+        self.view = view
+        self.load_middleware()
+
+    def resolve_request(self, request):
+        resolver_match = super().resolve_request(request)
+        if self.view is None:
+            return resolver_match
+        return self.view, resolver_match.args, resolver_match.kwargs
+
+
+@lru_cache(maxsize=None)
+def get_handler(view: Optional[Callable] = None) -> 'StreamingHandler':
+    return StreamingHandler(view)
+
+
+async def get_response(scope: dict, view: Optional[Callable] = None) -> tuple['ASGIRequest', 'HttpResponse']:
+    request = ASGIRequest(scope, io.BytesIO())
+    response = await database_sync_to_async(get_handler(view).get_response)(request)
+    return request, response
+
+
+def get_response_headers(response: 'HttpResponse') -> list[tuple[bytes, bytes]]:
+    headers = [(name.encode('ascii'), value.encode('latin1')) for name, value in response.items()]
+    headers.extend(
+        (b'Set-Cookie', cookie.output(header='').encode('ascii').strip()) for cookie in response.cookies.values()
+    )
+    return headers
+
+
+async def send_response_start(send: Callable, response: 'HttpResponse') -> None:
+    if response.streaming:
+        # keeps proxies from buffering the stream.
+        response.setdefault('Cache-Control', 'no-cache')
+        response.setdefault('X-Accel-Buffering', 'no')
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': get_response_headers(response),
+    })
+
+
+async def send_response(send: Callable, response: 'HttpResponse') -> None:
+    await send_response_start(send, response)
+    await send({'type': 'http.response.body', 'body': response.content})
+
+
+class DisconnectWatcher:
+    """Listener of the ASGI connection noticing when the client goes away.
+    """
+    def __init__(self, receive: Callable):
+        self.receive = receive
+        self.event = asyncio.Event()
+        self.task = asyncio.ensure_future(self.listen())
+
+    async def listen(self) -> None:
+        while (await self.receive())['type'] != 'http.disconnect':
+            pass
+        self.event.set()
+
+    def is_set(self) -> bool:
+        return self.event.is_set()
+
+    def close(self) -> None:
+        self.task.cancel()
+
+
+def start_job_events(request) -> 'HttpResponse':
+    """Start of the job events stream served under ASGI, the events are sent by `stream_job_events`.
+    """
+    if not request.user.is_authenticated:
+        return HttpResponse(status=204)
+    return StreamingHttpResponse((), content_type='text/event-stream')
+
+
+async def stream_book_export(scope: dict, receive: Callable, send: Callable) -> None:
+    """Book export of `viewer.views.BookExportView` with the chunks of its CSV read by the database threads.
+    """
+    _request, response = await get_response(scope)
+    try:
+        if not response.streaming:
+            await send_response(send, response)
+            return
+        disconnected = DisconnectWatcher(receive)
+        chunks = iter(response.streaming_content)
+        next_chunk = database_sync_to_async(next)
+        await send_response_start(send, response)
+        try:
+            while not disconnected.is_set():
+                chunk = await next_chunk(chunks, None)
+                if chunk is None:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.close()
+    finally:
+        await database_sync_to_async(response.close)()
+
+
+async def stream_job_events(scope: dict, receive: Callable, send: Callable) -> None:
+    """Server-sent events with the user's active jobs, sent on every change until the jobs finish.
+    """
+    request, response = await get_response(scope, start_job_events)
+    try:
+        if not response.streaming:
+            await send_response(send, response)
+            return
+        await send_job_events(request.user.pk, receive, send, response)
+    finally:
+        await database_sync_to_async(response.close)()
+
+
+async def send_job_events(user_id: int, receive: Callable, send: Callable, response: 'HttpResponse') -> None:
+    disconnected = DisconnectWatcher(receive)
+    updates = job_event_hub.subscribe(user_id)
+    await send_response_start(send, response)
+    sent_jobs: Optional[list] = None
+    try:
+        while True:
+            update = asyncio.ensure_future(updates.get())
+            await asyncio.wait({update, disconnected.task}, timeout=settings.STREAMING_HEARTBEAT_INTERVAL,
+                               return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.is_set():
+                update.cancel()
+                break
+            if not update.done():
+                update.cancel()
+                # keeps proxies from closing an idle connection.
+                await send({'type': 'http.response.body', 'body': b': heartbeat\n\n', 'more_body': True})
+                continue
+            jobs = update.result()
+            message = f'event: jobs\ndata: {json.dumps(jobs)}\n\n' if jobs != sent_jobs else ''
+            sent_jobs = jobs
+            if not jobs:
+                message += 'event: done\ndata: {}\n\n'
+            if message:
+                await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+            if not jobs:
+                break
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        job_event_hub.unsubscribe(user_id, updates)
+        disconnected.close()
+
+
+class StreamingRouter:
+    """ASGI application serving the streaming views natively and everything else with Django.
+
+    Django 3.1 iterates streaming responses synchronously inside the event loop, so the views
+    below are implemented as ASGI handlers. Their URL patterns have synchronous fallbacks in
+    `viewer.views` used under WSGI.
+    """
+    handlers = {
+        'viewer:book_export': stream_book_export,
+        'viewer:job_events': stream_job_events,
+    }
+
+    def __init__(self, application: Callable):
+        self.application = application
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            try:
+                view_name = resolve(scope['path']).view_name
+            except Resolver404:
+                view_name = None
+            if view_name in self.handlers:
+                await self.handlers[view_name](scope, receive, send)
+                return
+        await self.application(scope, receive, send)
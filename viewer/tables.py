@@ -1,14 +1,19 @@
 from collections import Collection
+from itertools import groupby
+from typing import Any, Callable, Union
 
 from dev_tools.template.components import BaseButton
 from dev_tools.template.mixins import HttpRequestType
+from django.core.files.storage import default_storage
 from django.db.models import Count
 from django.urls import reverse
+from django.utils.html import conditional_escape, escape
+from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
-from template_tables.components import (BaseTemplateTable, TableRowType, TR, TH as BTH, TD, TemplateTablePagination,
-                                        AbstractTableElement, BaseHtmlElementWithSlots)
+from template_tables.components import (BaseTemplateTable, TableRowType, TR, TH as BTH, TD, TBody,
+                                        TemplateTablePagination, AbstractTableElement, BaseHtmlElementWithSlots)
 
-from viewer.models import Bookcase, Book, BookAuthor, BookcaseSlot
+from viewer.models import Bookcase, BookcaseSlot
 
 
 class BookPicture(AbstractTableElement, BaseHtmlElementWithSlots):
@@ -47,58 +52,179 @@ class TablePagination(TemplateTablePagination):
     template = 'blocks/_uikit_table_pagination.html'
 
 
+# pk used to reverse urls once per table render and turn them into format templates.
+URL_PK_PLACEHOLDER = 2147483647
+
+CellRendererType = Callable[[Any], str]
+
+
+class Column:
+    """Declarative table column.
+
+    Describes both the header cell and the body cells of a column, so the same spec drives
+    the component based rendering (`get_cell`) and the compiled string rendering (`compile`).
+    """
+    def __init__(self, header: str = '', accessor: Union[str, Callable, None] = None, ordering: str = None,
+                 css_classes: list = None):
+        self.header = header
+        self.accessor = accessor
+        self.ordering = ordering
+        self.css_classes = css_classes
+
+    def get_header_cell(self) -> 'TH':
+        return TH(self.header, css_classes=self.css_classes, ordering=self.ordering)
+
+    def get_getter(self, table: 'BaseTable') -> Callable[[Any], Any]:
+        if callable(self.accessor):
+            return lambda data_item: self.accessor(table, data_item)
+        attributes = self.accessor.split('.')
+
+        def getter(data_item):
+            for attribute in attributes:
+                if data_item is None:
+                    break
+                data_item = getattr(data_item, attribute)
+            return data_item
+        return getter
+
+    def get_cell(self, table: 'BaseTable', data_item: Any) -> 'TD':
+        value = self.get_getter(table)(data_item)
+        return TD(conditional_escape(str(value)) if value else None)
+
+    def compile(self, table: 'BaseTable') -> CellRendererType:
+        getter = self.get_getter(table)
+
+        def render(data_item):
+            value = getter(data_item)
+            return conditional_escape(str(value)) if value else '-'
+        return render
+
+
+class PictureColumn(Column):
+    """Column with a book picture thumbnail.
+    """
+    def get_cell(self, table: 'BaseTable', data_item: Any) -> 'TD':
+        picture = self.get_getter(table)(data_item)
+        return TD(BookPicture(html_params={'src': picture.url}).render() if picture else None)
+
+    def compile(self, table: 'BaseTable') -> CellRendererType:
+        getter = self.get_getter(table)
+        template = BookPicture(html_params={'src': '%s'}).render()
+
+        def render(data_item):
+            picture = getter(data_item)
+            return template % escape(picture.url) if picture else '-'
+        return render
+
+
+class LinksColumn(Column):
+    """Column with object action links, such as edit and delete buttons.
+    """
+    def __init__(self, links: tuple, header: str = '', css_classes: list = None):
+        super().__init__(header, accessor='pk', css_classes=css_classes)
+        self.links = links
+
+    def get_cell(self, table: 'BaseTable', data_item: Any) -> 'TD':
+        return TD(''.join(
+            TableLink(
+                html_params={
+                    'uk-icon': icon,
+                    'href': reverse(url_pattern, kwargs=dict(pk=data_item.pk))
+                }
+            ).render() for icon, url_pattern in self.links
+        ))
+
+    def compile(self, table: 'BaseTable') -> CellRendererType:
+        template = ''.join(
+            TableLink(
+                html_params={
+                    'uk-icon': icon,
+                    'href': escape(reverse(url_pattern, kwargs=dict(pk=URL_PK_PLACEHOLDER))).replace('%', '%%')
+                }
+            ).render() for icon, url_pattern in self.links
+        ).replace(str(URL_PK_PLACEHOLDER), '%(pk)d')
+        return lambda data_item: template % {'pk': data_item.pk}
+
+
+class CompiledBody:
+    """Table body made of already rendered rows.
+    """
+    def __init__(self, rows: list[str]):
+        self.data = rows
+
+    def render(self) -> str:
+        return mark_safe(f'<tbody>{"".join(self.data)}</tbody>')
+
+
 class BaseTable(BaseTemplateTable):
     """Custom table as a parent for all project tables.
+
+    Tables describe their content with `columns`. By default, body rows are rendered by compiled
+    per-row string building instead of creating `TR`/`TD` objects for every cell. Set `compiled`
+    to `False` to render them through the table components.
     """
     css_classes = ['uk-table uk-table-hover uk-table-divider uk-table-responsive']
     empty_table_text = _('No items found')
+    columns: tuple[Column, ...] = ()
+    compiled: bool = True
 
+    def __init__(self, request: 'HttpRequestType', object_list: Collection, compiled: bool = None):
+        if compiled is not None:
+            self.compiled = compiled
+        super().__init__(request, object_list)
 
-class BookTable(BaseTable):
-    """Table view for to display books info.
-    """
     def get_header_rows(self) -> list['TableRowType']:
         return [
-            TR([
-                TH(_('Bookcase name'), ordering='bookcase_slot__bookcase__name'),
-                TH(_('Bookshelf'), ordering='bookcase_slot__bookshelf_number'),
-                TH(_('Book slot'), ordering='bookcase_slot__number'),
-                TH(_('Book name'), ordering='name'),
-                TH(_('Author'), ordering='author__firstname'),
-                TH(_('Picture')),
-                TH('', css_classes=['bv-action-cell'])
-            ])
+            TR([column.get_header_cell() for column in self.columns])
+        ]
+
+    def get_body_row(self, index: int, data_item: Any) -> 'TableRowType':
+        return TR([column.get_cell(self, data_item) for column in self.columns])
+
+    def get_body(self, body_rows: list) -> Union['TBody', 'CompiledBody']:
+        if self.compiled:
+            return CompiledBody(body_rows)
+        return super().get_body(body_rows)
+
+    def get_body_rows(self) -> list:
+        if not self.compiled:
+            return super().get_body_rows()
+        if not self.object_list:
+            return [self.get_row_for_empty_table().render()]
+        row_template = '<tr>%s</tr>' % ''.join('<td>%s</td>' for _column in self.columns)
+        cell_renderers = [column.compile(self) for column in self.columns]
+        return [
+            row_template % tuple([render(data_item) for render in cell_renderers])
+            for data_item in self.object_list
         ]
 
-    def get_body_row(self, index: int, data_item: 'Book') -> 'TableRowType':
-        edit_btn = TableLink(
-            html_params={
-                'uk-icon': 'pencil',
-                'href': reverse('viewer:book_update', kwargs=dict(pk=data_item.pk))
-            }
-        ).render()
-        delete_btn = TableLink(
-            html_params={
-                'uk-icon': 'trash',
-                'href': reverse('viewer:book_delete', kwargs=dict(pk=data_item.pk))
-            }
-        ).render()
-        book_picture = BookPicture(html_params={'src': data_item.picture.url}).render() if data_item.picture else None
-        return TR([
-            TD(data_item.bookcase_slot.bookcase.name),
-            TD(data_item.bookcase_slot.bookshelf_number),
-            TD(data_item.bookcase_slot.number),
-            TD(data_item.name),
-            TD(data_item.author),
-            TD(book_picture),
-            TD(edit_btn + delete_btn)
-        ])
+
+class BookTable(BaseTable):
+    """Table view for to display books info.
+    """
+    columns = (
+        Column(_('Bookcase name'), 'bookcase_slot.bookcase.name', ordering='bookcase'),
+        Column(_('Bookshelf'), 'bookcase_slot.bookshelf_number', ordering='shelf'),
+        Column(_('Book slot'), 'bookcase_slot.number', ordering='slot'),
+        Column(_('Book name'), 'name', ordering='name'),
+        Column(_('Author'), 'author', ordering='author'),
+        PictureColumn(_('Picture'), 'picture'),
+        LinksColumn((('pencil', 'viewer:book_update'), ('trash', 'viewer:book_delete')),
+                    css_classes=['bv-action-cell']),
+    )
 
 
 class BookcaseTable(BaseTable):
     """Table view for to display bookcase info.
     """
-    def __init__(self, request: 'HttpRequestType', object_list: Collection):
+    columns = (
+        Column(_('Bookcase name'), 'name', ordering='name'),
+        Column(_('Bookcase slots'), lambda table, data_item: table.total_slots.get(data_item.id)),
+        LinksColumn((('grid', 'viewer:bookcase_detail'), ('pencil', 'viewer:bookcase_update'),
+                     ('trash', 'viewer:bookcase_delete')), css_classes=['bv-action-cell']),
+    )
+
+    def __init__(self, request: 'HttpRequestType', object_list: Collection, compiled: bool = None):
         # aggregation with grouping for slots calculation.
         bookcase_slots = (
             BookcaseSlot
@@ -108,64 +234,67 @@ class BookcaseTable(BaseTable):
             .annotate(total=Count('id'))
         )
         self.total_slots = {obj['bookcase_id']: obj['total'] for obj in bookcase_slots}
-        super().__init__(request, object_list)
+        super().__init__(request, object_list, compiled)
 
-    def get_header_rows(self) -> list['TableRowType']:
-        return [
-            TR([
-                TH(_('Bookcase name'), ordering='name'),
-                TH(_('Bookcase slots')),
-                TH('', css_classes=['bv-action-cell'])
-            ])
-        ]
 
-    def get_body_row(self, index: int, data_item: 'Bookcase') -> 'TableRowType':
-        edit_btn = TableLink(
-            html_params={
-                'uk-icon': 'pencil',
-                'href': reverse('viewer:bookcase_update', kwargs=dict(pk=data_item.pk))
-            }
-        ).render()
-        delete_btn = TableLink(
-            html_params={
-                'uk-icon': 'trash',
-                'href': reverse('viewer:bookcase_delete', kwargs=dict(pk=data_item.pk))
-            }
-        ).render()
-        return TR([
-            TD(data_item.name),
-            TD(self.total_slots.get(data_item.id)),
-            TD(edit_btn + delete_btn)
-        ])
+class BookcaseGrid:
+    """Shelves by slots grid of the bookcase with the books of the occupied slots.
+
+    The grid is built from one query of the slots left joined to their books and rendered by
+    string building like the compiled tables, so large bookcases render at once. Books are pictured
+    by their thumbnails, the full size pictures are only loaded by the book pages.
+    """
+    shelf_template = '<div class="bv-shelf"><span class="bv-shelf-number">%d</span>%s</div>'
+    book_template = (
+        '<a class="bv-slot bv-slot-occupied" href="%(url)s" title="%(title)s">%(picture)s'
+        '<span class="bv-slot-name">%(name)s</span></a>'
+    )
+    picture_template = '<img src="%s" width="40" height="40" loading="lazy" alt="">'
+    free_template = (
+        '<a class="bv-slot bv-slot-free" href="%(url)s" title="%(title)s">'
+        '<span class="bv-slot-number">%(number)d</span></a>'
+    )
+
+    def __init__(self, bookcase: 'Bookcase'):
+        self.bookcase = bookcase
+        self.slots = list(
+            BookcaseSlot.objects
+            .filter(bookcase=bookcase)
+            .order_by('bookshelf_number', 'number')
+            .values_list('id', 'bookshelf_number', 'number', 'book__id', 'book__name', 'book__thumbnail')
+        )
+
+    def render(self) -> str:
+        book_url = escape(reverse('viewer:book_update', kwargs=dict(pk=URL_PK_PLACEHOLDER))).replace(
+            str(URL_PK_PLACEHOLDER), '%d'
+        )
+        add_url = escape(f'{reverse("viewer:book_add")}?bookcase_slot=') + '%d'
+        free_title = escape(str(_('Bookshelf %(shelf)d, slot %(slot)d')))
+        shelves = []
+        for shelf_number, slots in groupby(self.slots, key=lambda slot: slot[1]):
+            cells = []
+            for slot_id, _shelf_number, number, book_id, name, thumbnail in slots:
+                title = free_title % {'shelf': shelf_number, 'slot': number}
+                if book_id:
+                    cells.append(self.book_template % {
+                        'url': book_url % book_id,
+                        'title': f'{title}: {escape(name)}',
+                        'picture': self.picture_template % escape(default_storage.url(thumbnail)) if thumbnail else '',
+                        'name': escape(name),
+                    })
+                else:
+                    cells.append(self.free_template % {'url': add_url % slot_id, 'title': title, 'number': number})
+            shelves.append(self.shelf_template % (shelf_number, ''.join(cells)))
+        return mark_safe(f'<div class="bv-bookcase-grid">{"".join(shelves)}</div>')
 
 
 class BookAuthorTable(BaseTable):
     """Table view for to display books authors info.
     """
-    def get_header_rows(self) -> list['TableRowType']:
-        return [
-            TR([
-                TH(_('First name'), ordering='firstname'),
-                TH(_('Last name'), ordering='lastname'),
-                TH('', css_classes=['bv-action-cell'])
-            ])
-        ]
-
-    def get_body_row(self, index: int, data_item: 'BookAuthor') -> 'TableRowType':
-        edit_btn = TableLink(
-            html_params={
-                'uk-icon': 'pencil',
-                'href': reverse('viewer:book_author_update', kwargs=dict(pk=data_item.pk))
-            }
-        ).render()
-        delete_btn = TableLink(
-            html_params={
-                'uk-icon': 'trash',
-                'href': reverse('viewer:book_author_delete', kwargs=dict(pk=data_item.pk))
-            }
-        ).render()
-        return TR([
-            TD(data_item.firstname),
-            TD(data_item.lastname),
-            TD(edit_btn + delete_btn)
-        ])
+    columns = (
+        Column(_('First name'), 'firstname', ordering='firstname'),
+        Column(_('Last name'), 'lastname', ordering='lastname'),
+        Column(_('Books'), lambda table, data_item: str(data_item.book_count), ordering='book_count'),
+        LinksColumn((('pencil', 'viewer:book_author_update'), ('trash', 'viewer:book_author_delete')),
+                    css_classes=['bv-action-cell']),
+    )
@@ -0,0 +1,33 @@
+from django.db import transaction
+
+from viewer import deletion
+from viewer.jobs import register_job
+from viewer.models import Book, Job
+
+
+@register_job('delete_bookcase')
+def delete_bookcase(job: 'Job', pk: int) -> None:
+    job.set_progress(0, 'Deleting bookcase')
+    for done, total in deletion.delete_bookcase(pk):
+        job.set_progress(100 * done // total, 'Deleting bookcase')
+
+
+@register_job('delete_book_author')
+def delete_book_author(job: 'Job', pk: int, user_id: int = None) -> None:
+    job.set_progress(0, 'Deleting book author')
+    for done, total in deletion.delete_book_author(pk, user_id=user_id):
+        job.set_progress(100 * done // total, 'Deleting book author')
+
+
+@register_job('merge_book_duplicates')
+def merge_book_duplicates(job: 'Job', user_id: int, batch_size: int = 100) -> None:
+    duplicates = Book.get_duplicates(Book.objects.visible().filter(owner_id=user_id))
+    duplicates = list(duplicates.values_list('owner_id', 'fingerprint'))
+    conflict_count = 0
+    for start in range(0, len(duplicates), batch_size):
+        job.set_progress(100 * start // len(duplicates), 'Merging duplicate books')
+        with transaction.atomic():
+            _deleted, conflicts = Book.merge_duplicates(duplicates[start:start + batch_size])
+        conflict_count += conflicts
+    if conflict_count:
+        job.set_progress(100, f'{conflict_count} groups have books in several slots and are left to merge by hand')
@@ -0,0 +1,46 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from viewer.models import Bookcase, Job
+from viewer.tests.utils import ViewerTestCase, create_user, create_bookcase, create_author, create_book, get_slot
+
+
+class LargeTableAdminTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(create_user('admin', is_staff=True, is_superuser=True))
+        self.bookcase = create_bookcase(self.user, name='Hall', shelf_count=1, shelf_capacity=2)
+        self.book = create_book(self.user, create_author(self.user, 'Leo', 'Tolstoy'), 'War and Peace',
+                                slot=get_slot(self.bookcase))
+        create_book(self.user, create_author(self.user, 'Anton', 'Chekhov'), 'The Seagull')
+
+    def get_results(self, model_name: str, params: dict = None) -> list:
+        response = self.client.get(reverse(f'admin:viewer_{model_name}_changelist'), params or {})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['cl'].result_list)
+
+    def test_search(self):
+        self.assertEqual(self.get_results('book', {'q': 'war'}), [self.book])
+        self.assertEqual(self.get_results('book', {'q': str(self.book.pk)}), [self.book])
+        self.assertEqual(self.get_results('bookcase', {'q': 'Ha'}), [self.bookcase])
+        self.assertEqual([author.lastname for author in self.get_results('bookauthor', {'q': 'Tol'})], ['Tolstoy'])
+
+    def test_search_by_primary_key_only(self):
+        job = Job.objects.create(user=self.user, name='import_catalog')
+        slot = get_slot(self.bookcase)
+        # models without search prefixes match the primary key only.
+        self.assertEqual(self.get_results('bookcaseslot', {'q': 'war'}), [])
+        self.assertEqual(self.get_results('bookcaseslot', {'q': str(slot.pk)}), [slot])
+        self.assertEqual(self.get_results('job', {'q': 'import'}), [])
+        self.assertEqual(self.get_results('job', {'q': str(job.pk)}), [job])
+
+    def test_estimated_count(self):
+        Bookcase.objects.create(user=self.user, name='Study').delete()
+        attic = Bookcase.objects.create(user=self.user, name='Attic')
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1):
+            response = self.client.get(reverse('admin:viewer_bookcase_changelist'))
+            # the largest primary key counts the deleted bookcase too.
+            self.assertEqual(response.context['cl'].result_count, attic.pk)
+            self.assertEqual(Bookcase.objects.count(), 2)
+            response = self.client.get(reverse('admin:viewer_bookcase_changelist'), {'q': 'Hall'})
+            self.assertEqual(response.context['cl'].result_count, 1)
@@ -0,0 +1,93 @@
+from django.urls import reverse
+
+from viewer.models import Book
+from viewer.tests.utils import ViewerTestCase, create_user, create_bookcase, create_author, create_book, get_slot
+
+
+class ApiListTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        bookcases = [create_bookcase(self.user, name=name, shelf_count=2, shelf_capacity=2)
+                     for name in ('Hall', 'study', 'Attic')]
+        for index, bookcase in enumerate(bookcases * 2):
+            create_book(self.user, self.author, f'Book {index}', slot=get_slot(bookcase, index % 2 + 1, 1))
+        create_book(self.user, self.author, 'Unplaced')
+        create_book(self.user, self.author, 'Unplaced')
+
+        other_user = create_user('other')
+        create_book(other_user, create_author(other_user, 'Anton', 'Chekhov'), 'The Seagull',
+                    slot=get_slot(create_bookcase(other_user, name='Hall')))
+
+    def get_pages(self, url: str, params: dict) -> list[dict]:
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            if not pages[-1]['next']:
+                return pages
+            response = self.client.get(pages[-1]['next'])
+
+    def test_cursor_pages(self):
+        pages = self.get_pages(reverse('viewer:api_v1_book_list'), {'ordering': '-bookcase', 'limit': 3})
+        ids = [item['id'] for page in pages for item in page['results']]
+        expected = list(
+            Book.objects.filter(owner=self.user)
+            .order_by('-sort_bookcase', '-sort_shelf', '-sort_slot', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 2])
+
+    def test_cursor_pages_with_equal_sort_keys(self):
+        pages = self.get_pages(reverse('viewer:api_v1_book_list'), {'ordering': 'name', 'limit': 1,
+                                                                    'name': 'Unplaced'})
+        ids = [item['id'] for page in pages for item in page['results']]
+        self.assertEqual(ids, list(Book.objects.filter(name='Unplaced').order_by('id').values_list('id', flat=True)))
+
+    def test_sparse_fields(self):
+        response = self.client.get(reverse('viewer:api_v1_book_list'),
+                                   {'fields': 'name,bookcase_name', 'ordering': 'bookcase', 'limit': 3})
+        self.assertEqual(response.json()['results'], [
+            {'name': 'Unplaced', 'bookcase_name': None},
+            {'name': 'Unplaced', 'bookcase_name': None},
+            {'name': 'Book 2', 'bookcase_name': 'Attic'},
+        ])
+
+    def test_other_lists(self):
+        response = self.client.get(reverse('viewer:api_v1_bookcase_list'),
+                                   {'ordering': 'name', 'fields': 'name,slot_count,occupied_slot_count'})
+        self.assertEqual(response.json()['results'], [
+            {'name': 'Attic', 'slot_count': 4, 'occupied_slot_count': 2},
+            {'name': 'Hall', 'slot_count': 4, 'occupied_slot_count': 2},
+            {'name': 'study', 'slot_count': 4, 'occupied_slot_count': 2},
+        ])
+        response = self.client.get(reverse('viewer:api_v1_book_author_list'))
+        self.assertEqual(response.json()['results'],
+                         [{'id': self.author.pk, 'firstname': 'Leo', 'lastname': 'Tolstoy', 'book_count': 8}])
+
+    def test_errors(self):
+        url = reverse('viewer:api_v1_book_list')
+        self.assertIn('fields', self.client.get(url, {'fields': 'id,owner'}).json()['errors'])
+        self.assertEqual(self.client.get(url, {'cursor': 'broken'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 'all'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'ordering': 'sort_name'}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_not_modified(self):
+        url = reverse('viewer:api_v1_book_author_list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual((response['ETag'], response['Cache-Control']), (etag, 'private, no-cache'))
+
+        # renaming the author changes the list without touching the books.
+        self.author.firstname = 'Lev'
+        self.author.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['firstname'], 'Lev')
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,89 @@
+from django.urls import reverse
+
+from viewer.jobs import claim_next, run_job
+from viewer.models import Book, BookAuthor, AuthorStats, ChangeLogEntry, Job
+from viewer.tests.utils import ViewerTestCase, create_user, create_author, create_book, get_stats, rebuild_stats
+
+
+class SharedAuthorTests(ViewerTestCase):
+    """Authors are shared by the users, changes of one user leave the other users' books alone.
+    """
+    def setUp(self):
+        super().setUp()
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        self.books = [create_book(self.user, self.author, name) for name in ('War and Peace', 'Anna Karenina')]
+        self.other_user = create_user('other')
+        self.other_book = create_book(self.other_user, create_author(self.other_user, 'Leo', 'Tolstoy'), 'Resurrection')
+
+    def get_book_ids(self, user) -> set[int]:
+        return set(Book.objects.visible().filter(owner=user).values_list('id', flat=True))
+
+    def assert_stats_rebuilt_equal(self, user):
+        stats = get_stats(user)
+        rebuild_stats(user)
+        self.assertEqual(get_stats(user), stats)
+
+    def test_edit_shared_author(self):
+        response = self.client.post(reverse('viewer:book_author_update', args=[self.author.pk]),
+                                    {'firstname': 'Lev', 'lastname': 'Tolstoy'})
+        copy = BookAuthor.objects.get(firstname='Lev')
+        self.assertRedirects(response, reverse('viewer:book_author_update', args=[copy.pk]))
+        # the user's books move to a copy, the author keeps its name for the other user.
+        self.assertEqual(set(Book.objects.filter(author=copy).values_list('id', flat=True)),
+                         {book.pk for book in self.books})
+        self.assertEqual(Book.objects.get(pk=self.books[0].pk).sort_author, 'tolstoy lev')
+        self.author.refresh_from_db()
+        self.assertEqual(str(self.author), 'Leo Tolstoy')
+        self.assertEqual(list(BookAuthor.get_user_authors(self.user.pk)), [copy])
+        self.assertEqual(list(BookAuthor.get_user_authors(self.other_user.pk)), [self.author])
+        self.assertEqual(Book.objects.get(pk=self.other_book.pk).author, self.author)
+        self.assert_stats_rebuilt_equal(self.user)
+        self.assert_stats_rebuilt_equal(self.other_user)
+
+    def test_edit_unshared_author(self):
+        author = create_author(self.user, 'Anton', 'Chekhov')
+        self.client.post(reverse('viewer:book_author_update', args=[author.pk]),
+                         {'firstname': 'Anton Pavlovich', 'lastname': 'Chekhov'})
+        author.refresh_from_db()
+        self.assertEqual(author.firstname, 'Anton Pavlovich')
+
+    def test_delete_shared_author(self):
+        cursor = ChangeLogEntry.objects.latest('id').pk
+        response = self.client.post(reverse('viewer:book_author_delete', args=[self.author.pk]))
+        self.assertRedirects(response, reverse('viewer:book_author_list'))
+        # the user's books are hidden at once, before the job deletes them.
+        self.assertEqual(self.get_book_ids(self.user), set())
+        self.assertEqual(self.get_book_ids(self.other_user), {self.other_book.pk})
+        self.assertEqual(list(BookAuthor.get_user_authors(self.user.pk)), [])
+        self.assertNotContains(self.client.get(reverse('viewer:book_list')), 'War and Peace')
+        self.assertEqual(list(ChangeLogEntry.objects.filter(id__gt=cursor).values_list('user_id', 'action')),
+                         [(self.user.pk, ChangeLogEntry.DELETE)])
+        # the author cannot be added again until its books are deleted.
+        response = self.client.post(reverse('viewer:book_author_add'), {'firstname': 'Leo', 'lastname': 'Tolstoy'})
+        self.assertContains(response, 'The author is being deleted')
+
+        job = claim_next('worker')
+        self.assertEqual(job.kwargs, {'pk': self.author.pk, 'user_id': self.user.pk})
+        run_job(job)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.SUCCEEDED)
+        self.assertFalse(Book.objects.filter(owner=self.user).exists())
+        self.assertFalse(AuthorStats.objects.filter(user=self.user).exists())
+        self.assertEqual(self.get_book_ids(self.other_user), {self.other_book.pk})
+        self.assertFalse(BookAuthor.objects.get(pk=self.author.pk).is_deleted)
+        # the books are logged as deleted, the author was logged when it was hidden.
+        entries = ChangeLogEntry.objects.filter(id__gt=cursor)
+        self.assertEqual(list(entries.filter(model='bookauthor').values_list('user_id', 'action')),
+                         [(self.user.pk, ChangeLogEntry.DELETE)])
+        self.assertEqual(set(entries.filter(model='book').values_list('object_id', flat=True)),
+                         {book.pk for book in self.books})
+        self.assert_stats_rebuilt_equal(self.user)
+
+    def test_delete_unshared_author(self):
+        author = create_author(self.user, 'Anton', 'Chekhov')
+        book = create_book(self.user, author, 'The Seagull')
+        self.client.post(reverse('viewer:book_author_delete', args=[author.pk]))
+        self.assertNotIn(book.pk, self.get_book_ids(self.user))
+        run_job(claim_next('worker'))
+        self.assertFalse(BookAuthor.objects.filter(pk=author.pk).exists())
+        self.assertEqual(self.get_book_ids(self.user), {book.pk for book in self.books})
+        self.assert_stats_rebuilt_equal(self.user)
@@ -0,0 +1,87 @@
+import io
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from viewer.models import Book
+from viewer.tables import BookcaseGrid
+from viewer.tests.utils import ViewerTestCase, create_user, create_bookcase, create_author, create_book, get_slot
+
+
+def make_picture(name: str = 'cover.png', size: tuple[int, int] = (400, 200)) -> 'SimpleUploadedFile':
+    content = io.BytesIO()
+    Image.new('RGB', size, 'red').save(content, format='PNG')
+    return SimpleUploadedFile(name, content.getvalue(), content_type='image/png')
+
+
+class BookcaseGridTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        self.bookcase = create_bookcase(self.user, name='Hall', shelf_count=2, shelf_capacity=3)
+
+    def test_thumbnails(self):
+        book = create_book(self.user, self.author, picture=make_picture())
+        self.assertEqual(book.thumbnail.name, f'thumbnails/{book.picture.name}')
+        with Image.open(default_storage.open(book.thumbnail.name)) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ('PNG', (80, 40)))
+
+        old_thumbnail = book.thumbnail.name
+        book.picture = make_picture('other.png')
+        book.save()
+        self.assertEqual(Book.objects.get(pk=book.pk).thumbnail.name, f'thumbnails/{book.picture.name}')
+        self.assertNotEqual(book.thumbnail.name, old_thumbnail)
+
+        book.picture = None
+        book.save()
+        self.assertIsNone(Book.objects.get(pk=book.pk).thumbnail.name)
+
+    def test_unreadable_picture(self):
+        book = create_book(self.user, self.author, picture=SimpleUploadedFile('cover.png', b'not an image'))
+        self.assertFalse(Book.objects.get(pk=book.pk).thumbnail)
+
+    def test_build_thumbnails(self):
+        book = create_book(self.user, self.author, picture=make_picture())
+        Book.objects.filter(pk=book.pk).update(thumbnail=None)
+        stdout = io.StringIO()
+        call_command('build_thumbnails', stdout=stdout)
+        self.assertIn('Processed 1 books.', stdout.getvalue())
+        self.assertEqual(Book.objects.get(pk=book.pk).thumbnail.name, f'thumbnails/{book.picture.name}')
+
+    def test_grid(self):
+        book = create_book(self.user, self.author, 'Case <A>', slot=get_slot(self.bookcase, 1, 2),
+                           picture=make_picture())
+        free_slot = get_slot(self.bookcase, 2, 3)
+        with self.assertNumQueries(1):
+            grid = BookcaseGrid(self.bookcase)
+        html = grid.render()
+        self.assertEqual(html.count('class="bv-shelf"'), 2)
+        self.assertEqual(html.count('bv-slot-free'), 5)
+        self.assertIn(f'href="{reverse("viewer:book_update", args=[book.pk])}" '
+                      f'title="Bookshelf 1, slot 2: Case &lt;A&gt;">', html)
+        self.assertIn(f'<img src="{default_storage.url(book.thumbnail.name)}"', html)
+        self.assertIn('<span class="bv-slot-name">Case &lt;A&gt;</span>', html)
+        self.assertIn(f'href="{reverse("viewer:book_add")}?bookcase_slot={free_slot.pk}"', html)
+        self.assertNotIn('<A>', html)
+
+    def test_detail_view(self):
+        create_book(self.user, self.author, 'War and Peace', slot=get_slot(self.bookcase, 1, 1))
+        response = self.client.get(reverse('viewer:bookcase_detail', args=[self.bookcase.pk]))
+        self.assertContains(response, 'bv-bookcase-grid')
+        self.assertContains(response, 'War and Peace')
+        self.assertEqual(response.context['stats'].occupied_slot_count, 1)
+
+        other_bookcase = create_bookcase(create_user('other'), name='Study')
+        self.assertEqual(self.client.get(reverse('viewer:bookcase_detail', args=[other_bookcase.pk])).status_code, 404)
+        self.bookcase.mark_deleted()
+        self.assertEqual(self.client.get(reverse('viewer:bookcase_detail', args=[self.bookcase.pk])).status_code, 404)
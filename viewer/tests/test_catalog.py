@@ -0,0 +1,58 @@
+from django.urls import reverse
+
+from viewer.catalog import import_records, lookup, normalize_isbn
+from viewer.models import BookAuthor, CatalogAuthor
+from viewer.tests.utils import ViewerTestCase, create_author
+
+RECORDS = [
+    {'type': {'key': '/type/author'}, 'key': '/authors/OL1A', 'name': 'Leo Tolstoy'},
+    {'type': {'key': '/type/author'}, 'key': '/authors/OL2A', 'name': 'Voltaire'},
+    {'type': {'key': '/type/edition'}, 'key': '/books/OL1M', 'title': 'War and Peace',
+     'authors': [{'key': '/authors/OL1A'}], 'isbn_10': ['0-14-044793-X']},
+    {'type': {'key': '/type/work'}, 'key': '/works/OL2W', 'title': 'Candide',
+     'authors': [{'author': {'key': '/authors/OL2A'}}]},
+]
+
+
+class CatalogTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        import_records(RECORDS)
+
+    def test_names(self):
+        self.assertEqual(CatalogAuthor(name='Leo Tolstoy').names, ('Leo', 'Tolstoy'))
+        self.assertEqual(CatalogAuthor(name='Jean Paul Sartre ').names, ('Jean Paul', 'Sartre'))
+        # authors known by a single name have no first name.
+        self.assertEqual(CatalogAuthor(name='Voltaire').names, ('', 'Voltaire'))
+
+    def test_lookup(self):
+        voltaire = create_author(self.user, '', 'Voltaire')
+        self.assertEqual(lookup(normalize_isbn('978-0-14-044793-4'), self.user.pk)[0]['title'], 'War and Peace')
+        result, = lookup('cand', self.user.pk)
+        self.assertEqual((result['author_firstname'], result['author_lastname'], result['author_id']),
+                         ('', 'Voltaire', voltaire.pk))
+        # Tolstoy is not among the user's authors.
+        self.assertIsNone(lookup('war', self.user.pk)[0]['author_id'])
+
+    def test_author_prefill(self):
+        url = reverse('viewer:book_author_add')
+        response = self.client.get(url, {'catalog': 'OL2A'})
+        self.assertEqual(response.context['form'].initial, {'firstname': '', 'lastname': 'Voltaire'})
+        self.assertEqual(response.context['catalog_target'], 'author')
+
+        response = self.client.post(url, {'firstname': '', 'lastname': 'Voltaire'})
+        self.assertRedirects(response, reverse('viewer:book_author_list'))
+        author = BookAuthor.objects.get(lastname='Voltaire')
+        self.assertEqual((author.firstname, str(author)), ('', 'Voltaire'))
+        self.assertIn(author, BookAuthor.get_user_authors(self.user.pk))
+
+    def test_book_prefill(self):
+        url = reverse('viewer:book_add')
+        response = self.client.get(url, {'catalog': 'OL2W'})
+        self.assertEqual(response.context['form'].initial, {'name': 'Candide', 'author': None})
+        self.assertEqual(response.context['catalog_target'], 'book')
+
+        voltaire = create_author(self.user, '', 'Voltaire')
+        response = self.client.get(url, {'catalog': 'OL2W'})
+        self.assertEqual(response.context['form'].initial, {'name': 'Candide', 'author': voltaire})
+        self.assertEqual(self.client.get(url, {'catalog': 'missing'}).context['form'].initial, {})
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from viewer.models import ChangeLogEntry, ChangeLogCompaction
+from viewer.tests.utils import ViewerTestCase, create_user, create_bookcase, create_author, create_book, get_slot
+
+
+@override_settings(CHANGELOG_SETTLE_DELAY=0)
+class ChangeFeedTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('viewer:api_v1_changes')
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        self.bookcase = create_bookcase(self.user, name='Hall', shelf_count=1, shelf_capacity=2)
+        self.book = create_book(self.user, self.author, 'War and Peace', slot=get_slot(self.bookcase))
+
+    def get_changes(self, since: int = 0, **params) -> dict:
+        response = self.client.get(self.url, {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get_actions(self, changes: dict) -> dict[tuple, str]:
+        return {(change['model'], change['id']): change['action'] for change in changes['changes']}
+
+    def test_initial_sync(self):
+        changes = self.get_changes()
+        slot_ids = list(self.bookcase.slots.order_by('id').values_list('id', flat=True))
+        self.assertEqual(self.get_actions(changes), {
+            ('bookauthor', self.author.pk): 'save',
+            ('bookcase', self.bookcase.pk): 'save',
+            ('bookcaseslot', slot_ids[0]): 'save',
+            ('bookcaseslot', slot_ids[1]): 'save',
+            ('book', self.book.pk): 'save',
+        })
+        book = next(change for change in changes['changes'] if change['model'] == 'book')
+        self.assertEqual(book['data']['name'], 'War and Peace')
+        self.assertEqual(changes['cursor'], ChangeLogEntry.objects.filter(user=self.user).latest('id').pk)
+        self.assertIsNone(changes['next'])
+
+    def test_changes_since_cursor(self):
+        cursor = self.get_changes()['cursor']
+        self.assertEqual(self.get_changes(cursor)['changes'], [])
+
+        self.book.name = 'Anna Karenina'
+        self.book.save()
+        self.book.name = 'Resurrection'
+        self.book.save()
+        other_book = create_book(self.user, self.author, 'Hadji Murat')
+        other_book_id = other_book.pk
+        other_book.delete()
+        changes = self.get_changes(cursor)
+        # only the latest change of every object with its current data.
+        self.assertEqual(self.get_actions(changes), {('book', self.book.pk): 'save', ('book', other_book_id): 'delete'})
+        self.assertEqual(changes['changes'][0]['data']['name'], 'Resurrection')
+
+    def test_pages(self):
+        changes = self.get_changes(limit=2)
+        seen = list(changes['changes'])
+        while changes['next']:
+            changes = self.client.get(changes['next']).json()
+            seen.extend(changes['changes'])
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(changes['cursor'], ChangeLogEntry.objects.filter(user=self.user).latest('id').pk)
+
+    def test_shared_author_changes(self):
+        other_user = create_user('other')
+        author = create_author(other_user, 'Leo', 'Tolstoy')
+        create_author(other_user, 'Anton', 'Chekhov')
+        cursor = self.get_changes()['cursor']
+        author.lastname = 'Tolstoi'
+        author.save()
+        changes = self.get_changes(cursor)
+        self.assertEqual(self.get_actions(changes), {('bookauthor', self.author.pk): 'save'})
+        self.assertEqual(changes['changes'][0]['data']['lastname'], 'Tolstoi')
+        # the other user's authors and books stay out of the feed.
+        self.client.force_login(other_user)
+        self.assertEqual(len(self.get_changes()['changes']), 2)
+
+    def test_settle_delay(self):
+        cursor = self.get_changes()['cursor']
+        with override_settings(CHANGELOG_SETTLE_DELAY=60):
+            self.book.name = 'Anna Karenina'
+            self.book.save()
+            # the entry may still be followed by entries of older transactions committed later.
+            changes = self.get_changes(cursor)
+            self.assertEqual((changes['changes'], changes['cursor']), ([], cursor))
+
+            ChangeLogEntry.objects.filter(id__gt=cursor).update(created_at=timezone.now() - timedelta(minutes=2))
+            self.assertEqual(self.get_actions(self.get_changes(cursor)), {('book', self.book.pk): 'save'})
+
+    def test_compacted_cursor(self):
+        cursor = self.get_changes()['cursor']
+        book_id = self.book.pk
+        self.book.delete()
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=60))
+        superseded, tombstones = ChangeLogEntry.compact(timezone.now() - timedelta(days=30))
+        self.assertEqual((superseded, tombstones), (1, 1))
+        self.assertGreater(ChangeLogCompaction.get_horizon(), cursor)
+
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertEqual(response.status_code, 410)
+        # a full sync after the compaction misses the deleted book only.
+        changes = self.get_changes()
+        self.assertNotIn(('book', book_id), self.get_actions(changes))
+        self.assertIn(('bookcase', self.bookcase.pk), self.get_actions(changes))
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
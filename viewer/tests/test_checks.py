@@ -0,0 +1,33 @@
+import io
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.test import SimpleTestCase, override_settings
+
+
+@override_settings(DEBUG=False)
+class StaticReferencesCheckTests(SimpleTestCase):
+    """The manifest is checked by the deployment checks only, so `migrate` runs before `collectstatic`.
+    """
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        settings_override = override_settings(STATIC_ROOT=static_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def check(self, **options) -> str:
+        stdout = io.StringIO()
+        call_command('check', stdout=stdout, stderr=io.StringIO(), **options)
+        return stdout.getvalue()
+
+    def test_without_manifest(self):
+        self.assertIn('no issues', self.check())
+        with self.assertRaisesMessage(SystemCheckError, 'viewer.E001'):
+            self.check(deploy=True, fail_level='ERROR')
+
+    def test_with_manifest(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.assertIn('no issues', self.check())
+        self.assertNotIn('viewer.E00', self.check(deploy=True, fail_level='ERROR'))
@@ -0,0 +1,71 @@
+from django.test import override_settings
+
+from viewer import deletion
+from viewer.management.commands.benchmark_deletion import seed_books
+from viewer.models import Bookcase, BookcaseSlot, BookAuthor, Book, AuthorStats, BookcaseStats, ChangeLogEntry
+from viewer.tests.utils import ViewerTestCase, create_author, create_book, get_stats, rebuild_stats
+
+BOOK_COUNT = 2500
+CHUNK_SIZE = 300
+
+
+@override_settings(DELETION_CHUNK_SIZE=CHUNK_SIZE)
+class ChunkedDeletionTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bookcase, self.author = seed_books(self.user, BOOK_COUNT)
+        self.slot_count = BookcaseSlot.objects.filter(bookcase=self.bookcase).count()
+        self.other_book = create_book(self.user, create_author(self.user, 'Anton', 'Chekhov'), 'The Seagull')
+        self.cursor = ChangeLogEntry.objects.latest('id').pk
+
+    def assert_chunks(self, progress, expected: int):
+        previous = 0
+        for done, total in progress:
+            self.assertEqual(total, expected)
+            self.assertTrue(0 < done - previous <= CHUNK_SIZE, done - previous)
+            previous = done
+        self.assertEqual(previous, expected)
+
+    def get_tombstone_count(self, model: str) -> int:
+        return ChangeLogEntry.objects.filter(id__gt=self.cursor, model=model, action=ChangeLogEntry.DELETE).count()
+
+    def assert_stats_rebuilt_equal(self):
+        stats = get_stats(self.user)
+        rebuild_stats(self.user)
+        self.assertEqual(get_stats(self.user), stats)
+
+    def test_delete_bookcase(self):
+        self.bookcase.mark_deleted()
+        # the books are hidden at once and shown without a slot once the bookcase is deleted.
+        self.assertEqual(list(Book.objects.visible().filter(owner=self.user)), [self.other_book])
+        version = get_stats(self.user)['library']
+        self.assert_chunks(deletion.delete_bookcase(self.bookcase.pk), self.slot_count)
+
+        self.assertFalse(Bookcase.objects.filter(pk=self.bookcase.pk).exists())
+        self.assertFalse(BookcaseSlot.objects.filter(bookcase_id=self.bookcase.pk).exists())
+        self.assertFalse(BookcaseStats.objects.filter(bookcase_id=self.bookcase.pk).exists())
+        self.assertEqual(Book.objects.visible().filter(owner=self.user, bookcase_slot__isnull=True).count(),
+                         BOOK_COUNT + 1)
+        self.assertEqual(self.get_tombstone_count('bookcaseslot'), self.slot_count)
+        self.assertEqual(self.get_tombstone_count('bookcase'), 1)
+        self.assertEqual(get_stats(self.user)['library'],
+                         {**version, 'bookcase_count': 0, 'unplaced_book_count': BOOK_COUNT + 1})
+        self.assert_stats_rebuilt_equal()
+
+    def test_delete_unhidden_bookcase(self):
+        self.assert_chunks(deletion.delete_bookcase(self.bookcase.pk), self.slot_count)
+        self.assertEqual(self.get_tombstone_count('bookcase'), 1)
+        self.assert_stats_rebuilt_equal()
+
+    def test_delete_book_author(self):
+        self.author.mark_deleted()
+        self.assertEqual(list(Book.objects.visible().filter(owner=self.user)), [self.other_book])
+        self.assert_chunks(deletion.delete_book_author(self.author.pk), BOOK_COUNT)
+
+        self.assertFalse(BookAuthor.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(AuthorStats.objects.filter(author_id=self.author.pk).exists())
+        self.assertEqual(list(Book.objects.filter(owner=self.user)), [self.other_book])
+        self.assertEqual(self.get_tombstone_count('book'), BOOK_COUNT)
+        self.assertEqual(self.get_tombstone_count('bookauthor'), 1)
+        self.assertEqual(get_stats(self.user)['bookcases'], {(self.bookcase.pk, self.slot_count, 0)})
+        self.assert_stats_rebuilt_equal()
@@ -0,0 +1,77 @@
+import io
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from viewer.jobs import claim_next, run_job
+from viewer.models import Book, Job
+from viewer.tests.utils import (
+    ViewerTestCase, create_user, create_bookcase, create_author, create_book, get_slot, get_stats, rebuild_stats
+)
+
+
+class BookDuplicateTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        self.bookcase = create_bookcase(self.user, name='Hall', shelf_count=1, shelf_capacity=4)
+        # a placed copy with unplaced duplicates differing in case, accents and spacing.
+        self.placed = create_book(self.user, self.author, 'War and Peace', slot=get_slot(self.bookcase, 1, 1))
+        self.unplaced = [create_book(self.user, self.author, name) for name in ('war and  peace', 'WAR AND PEACE')]
+        # two placed copies are kept for the user to resolve.
+        self.copies = [create_book(self.user, self.author, 'Anna Karenina', slot=get_slot(self.bookcase, 1, number))
+                       for number in (2, 3)]
+        self.unplaced_copy = create_book(self.user, self.author, 'Anna Karénina')
+        # unplaced duplicates only, merged into the first one.
+        self.resurrection = [create_book(self.user, self.author, 'Resurrection') for _index in range(2)]
+        create_book(self.user, create_author(self.user, 'Anton', 'Tolstoy'), 'War and Peace')
+
+        other_user = create_user('other')
+        self.other_books = [create_book(other_user, self.author, 'War and Peace') for _index in range(2)]
+
+    def assert_merged(self):
+        self.assertFalse(Book.objects.filter(pk__in=[book.pk for book in self.unplaced]).exists())
+        self.assertTrue(Book.objects.filter(pk=self.placed.pk).exists())
+        self.assertEqual(set(Book.objects.filter(name__startswith='Anna').values_list('id', flat=True)),
+                         {book.pk for book in self.copies})
+        self.assertEqual(list(Book.objects.filter(name='Resurrection').values_list('id', flat=True)),
+                         [self.resurrection[0].pk])
+        self.assertEqual(Book.objects.filter(owner=self.user).count(), 5)
+        # another user's duplicates are not touched.
+        self.assertEqual(Book.objects.filter(pk__in=[book.pk for book in self.other_books]).count(), 2)
+        stats = get_stats(self.user)
+        rebuild_stats(self.user)
+        self.assertEqual(get_stats(self.user), stats)
+
+    def test_get_duplicates(self):
+        duplicates = list(Book.get_duplicates(Book.objects.filter(owner=self.user)))
+        self.assertEqual(sorted((row['count'], row['placed']) for row in duplicates), [(2, 0), (3, 1), (3, 2)])
+
+    def test_merge_duplicates(self):
+        groups = list(Book.get_duplicates(Book.objects.filter(owner=self.user)).values_list('owner_id', 'fingerprint'))
+        self.assertEqual(Book.merge_duplicates(groups), (4, 1))
+        self.assert_merged()
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command('merge_duplicates', user_ids=[self.user.pk], dry_run=True, stdout=stdout)
+        self.assertIn('Found 4 duplicate books in 3 groups.', stdout.getvalue())
+        self.assertIn('1 groups have books in several bookcase slots', stdout.getvalue())
+        self.assertEqual(Book.objects.filter(owner=self.user).count(), 9)
+
+        stdout = io.StringIO()
+        call_command('merge_duplicates', user_ids=[self.user.pk], batch_size=1, stdout=stdout)
+        self.assertIn('Removed 4 duplicate books in 3 groups.', stdout.getvalue())
+        self.assert_merged()
+
+    def test_merge_job(self):
+        response = self.client.get(reverse('viewer:book_duplicates'))
+        self.assertEqual(response.context['group_count'], 3)
+        self.assertRedirects(self.client.post(reverse('viewer:book_duplicates')), reverse('viewer:book_duplicates'))
+        job = claim_next('worker')
+        self.assertEqual((job.name, job.kwargs), ('merge_book_duplicates', {'user_id': self.user.pk}))
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertIn('1 groups have books in several slots', job.message)
+        self.assert_merged()
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.urls import reverse
+
+from viewer.facets import count_book_facets, get_book_facets
+from viewer.filters import BookFilter
+from viewer.models import Book
+from viewer.tests.utils import ViewerTestCase, create_bookcase, create_author, create_book, get_slot
+
+
+class BookFacetTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.tolstoy = create_author(self.user, 'Leo', 'Tolstoy')
+        self.chekhov = create_author(self.user, 'Anton', 'Chekhov')
+        self.bookcase = create_bookcase(self.user, name='Hall')
+        self.other_bookcase = create_bookcase(self.user, name='Study')
+        create_book(self.user, self.tolstoy, 'War and Peace', slot=get_slot(self.bookcase, 1, 1))
+        create_book(self.user, self.tolstoy, 'Anna Karenina', slot=get_slot(self.bookcase, 2, 1))
+        create_book(self.user, self.chekhov, 'The Seagull', slot=get_slot(self.other_bookcase, 1, 2))
+        create_book(self.user, self.chekhov, 'Three Sisters')
+
+    def get_facets(self, params: dict = None) -> dict[str, list[tuple]]:
+        request = RequestFactory().get('/', params or {})
+        request.user = self.user
+        filterset = BookFilter(request.GET, queryset=Book.objects.filter(owner=self.user))
+        facets = get_book_facets(request, filterset)
+        return {
+            str(facet['title']): [(value['label'], value['count'], value['active']) for value in facet['values']]
+            for facet in facets
+        }
+
+    def test_count_book_facets(self):
+        with self.assertNumQueries(1):
+            counts = count_book_facets(Book.objects.filter(owner=self.user))
+        self.assertEqual(counts, {
+            'bookcase': [(self.bookcase.pk, 'Hall', 2), (self.other_bookcase.pk, 'Study', 1)],
+            'author': [(self.chekhov.pk, 'Anton Chekhov', 2), (self.tolstoy.pk, 'Leo Tolstoy', 2)],
+            'shelf': [(1, '1', 2), (2, '2', 1)],
+        })
+
+    def test_filtered_facets(self):
+        facets = self.get_facets({'author': self.tolstoy.pk})
+        self.assertEqual(facets['Bookcases'], [('Hall', 2, False)])
+        self.assertEqual(facets['Authors'], [('Leo Tolstoy', 2, True)])
+        self.assertEqual(facets['Bookshelves'], [('1', 1, False), ('2', 1, False)])
+
+    def test_cache_invalidated_by_library_changes(self):
+        self.get_facets({'ordering': 'name'})
+        # the counts are cached, only the library version is read.
+        with self.assertNumQueries(1):
+            facets = self.get_facets({'ordering': '-name', 'page': '2'})
+        self.assertEqual(facets['Authors'], [('Anton Chekhov', 2, False), ('Leo Tolstoy', 2, False)])
+
+        create_book(self.user, self.tolstoy, 'Resurrection')
+        facets = self.get_facets()
+        self.assertEqual(facets['Authors'], [('Leo Tolstoy', 3, False), ('Anton Chekhov', 2, False)])
+
+        self.bookcase.name = 'Attic'
+        self.bookcase.save()
+        self.assertEqual(self.get_facets()['Bookcases'], [('Attic', 2, False), ('Study', 1, False)])
+
+    def test_book_list_facets(self):
+        response = self.client.get(reverse('viewer:book_list'), {'bookcase': self.other_bookcase.pk})
+        self.assertContains(response, 'Study')
+        facets = {str(facet['title']): facet['values'] for facet in response.context['facets']}
+        self.assertEqual([value['label'] for value in facets['Authors']], ['Anton Chekhov'])
+        self.assertEqual(facets['Bookcases'][0]['url'], f'?bookcase={self.other_bookcase.pk}')
@@ -0,0 +1,64 @@
+from django.contrib.messages import constants
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from viewer.tests.utils import ViewerTestCase, create_author, create_book
+
+
+class ListFragmentTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        create_book(self.user, self.author, 'War and Peace')
+        self.url = reverse('viewer:book_list')
+        # the first list of a session resets the page, which changes the query of the ETag.
+        self.client.get(self.url)
+
+    def test_fragment(self):
+        page = self.client.get(self.url, {'ordering': 'name'})
+        fragment = self.client.get(self.url, {'ordering': 'name'}, HTTP_X_FRAGMENT='1')
+        self.assertTemplateUsed(fragment, 'blocks/_list.html')
+        self.assertTemplateNotUsed(fragment, 'dashboard_list.html')
+        self.assertContains(fragment, 'War and Peace')
+        self.assertLess(len(fragment.content), len(page.content))
+        # the page and the fragment share the URL, so caches keep them apart by the header.
+        self.assertIn('X-Fragment', fragment['Vary'])
+        self.assertIn('X-Fragment', page['Vary'])
+        self.assertNotEqual(fragment['ETag'], page['ETag'])
+
+    def test_not_modified(self):
+        for headers in ({}, {'HTTP_X_FRAGMENT': '1'}):
+            response = self.client.get(self.url, **headers)
+            etag = response['ETag']
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, **headers)
+            self.assertEqual(response.status_code, 304)
+            # only the library version is read, the books are not queried.
+            viewer_queries = [query['sql'] for query in queries if '"viewer_' in query['sql']]
+            self.assertEqual(len(viewer_queries), 1)
+            self.assertIn('FROM "viewer_library"', viewer_queries[0])
+            self.assertEqual((response['ETag'], response['Cache-Control']), (etag, 'private, no-cache'))
+            self.assertIn('X-Fragment', response['Vary'])
+
+            create_book(self.user, self.author, 'Anna Karenina')
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, **headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, 'Anna Karenina')
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_of_query(self):
+        etag = self.client.get(self.url, {'ordering': 'name'})['ETag']
+        self.assertNotEqual(self.client.get(self.url, {'ordering': '-name'})['ETag'], etag)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url, {'ordering': 'name'})['ETag'], etag)
+
+    def test_pending_messages(self):
+        etag = self.client.get(self.url)['ETag']
+        # a redirect after a form post leaves a message for the next page.
+        response = self.client.post(reverse('viewer:book_author_add'), {'firstname': 'Anton', 'lastname': 'Chekhov'})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertEqual([message.level for message in response.context['messages']], [constants.SUCCESS])
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from viewer import jobs
+from viewer.jobs import enqueue, claim_next, run_job, requeue_stale
+from viewer.models import Job, JobLockLost
+
+
+def succeed(job):
+    job.set_progress(50, 'Halfway')
+
+
+def fail(job):
+    raise ValueError('Broken job')
+
+
+def lose_lock(job):
+    # another worker took the job over after it was requeued as stale.
+    Job.objects.filter(pk=job.pk).update(locked_by='other-worker')
+    job.set_progress(50, 'Halfway')
+
+
+def finish_after_requeue(job):
+    Job.objects.filter(pk=job.pk).update(status=Job.PENDING, locked_by='', locked_at=None)
+
+
+@override_settings(JOBS_RETRY_DELAY=10)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        handlers = {
+            'succeed': succeed,
+            'fail': fail,
+            'lose_lock': lose_lock,
+            'finish_after_requeue': finish_after_requeue,
+        }
+        registry = mock.patch.dict(jobs._registry, handlers)
+        registry.start()
+        self.addCleanup(registry.stop)
+
+    def test_enqueue_unknown_job(self):
+        with self.assertRaises(LookupError):
+            enqueue('unknown')
+        self.assertFalse(Job.objects.exists())
+
+    def test_claim_next(self):
+        later = enqueue('succeed')
+        Job.objects.filter(pk=later.pk).update(run_after=timezone.now() - timedelta(seconds=10))
+        first = enqueue('succeed')
+        Job.objects.filter(pk=first.pk).update(run_after=timezone.now() - timedelta(seconds=20))
+        enqueue('succeed')
+        Job.objects.filter(name='succeed').exclude(pk__in=[first.pk, later.pk]).update(
+            run_after=timezone.now() + timedelta(hours=1)
+        )
+
+        job = claim_next('worker-1')
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Job.RUNNING, 'worker-1', 1))
+        self.assertEqual(claim_next('worker-2').pk, later.pk)
+        # the last job is not due yet.
+        self.assertIsNone(claim_next('worker-3'))
+
+    def test_run_succeeded(self):
+        enqueue('succeed')
+        job = claim_next('worker-1')
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.locked_by), (Job.SUCCEEDED, 100, ''))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_and_fail(self):
+        enqueue('fail', max_attempts=2)
+        job = claim_next('worker-1')
+        before = timezone.now()
+        with self.assertLogs('viewer.jobs', 'ERROR'):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.PENDING, 1, ''))
+        self.assertIn('Broken job', job.error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=10))
+        self.assertIsNone(claim_next('worker-1'))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        job = claim_next('worker-1')
+        self.assertEqual(job.attempts, 2)
+        with self.assertLogs('viewer.jobs', 'ERROR'):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_progress_after_lock_lost(self):
+        enqueue('lose_lock')
+        job = claim_next('worker-1')
+        with self.assertLogs('viewer.jobs', 'WARNING'):
+            run_job(job)
+        job.refresh_from_db()
+        # the job is left to the worker holding the lock.
+        self.assertEqual((job.status, job.locked_by, job.progress), (Job.RUNNING, 'other-worker', 0))
+
+    def test_set_progress_requires_lock(self):
+        enqueue('succeed')
+        job = claim_next('worker-1')
+        job.set_progress(30)
+        self.assertEqual(Job.objects.get(pk=job.pk).progress, 30)
+        Job.objects.filter(pk=job.pk).update(locked_by='other-worker')
+        with self.assertRaises(JobLockLost):
+            job.set_progress(60)
+        self.assertEqual(Job.objects.get(pk=job.pk).progress, 30)
+
+    def test_outcome_discarded_after_requeue(self):
+        enqueue('finish_after_requeue')
+        job = claim_next('worker-1')
+        with self.assertLogs('viewer.jobs', 'WARNING'):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.finished_at), (Job.PENDING, None))
+
+    def test_requeue_stale(self):
+        stale = enqueue('succeed')
+        exhausted = enqueue('succeed', max_attempts=1)
+        active = enqueue('succeed')
+        for _index in range(3):
+            claim_next('worker-1')
+        long_ago = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(pk__in=[stale.pk, exhausted.pk, active.pk]).update(locked_at=long_ago)
+        active = Job.objects.get(pk=active.pk)
+        # progress renews the lock.
+        active.set_progress(10)
+
+        self.assertEqual(requeue_stale(timeout=60), 1)
+        statuses = dict(Job.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {stale.pk: Job.PENDING, exhausted.pk: Job.FAILED, active.pk: Job.RUNNING})
@@ -0,0 +1,44 @@
+import io
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import LiveServerTestCase, override_settings
+from django.urls import reverse
+
+from viewer.management.commands.loadtest import Client
+from viewer.models import Book, BookAuthor
+from viewer.tests.utils import create_author
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class LoadTestCommandTests(LiveServerTestCase):
+    def test_loadtest(self):
+        # an author of another user only, not offered by the book form of the load test users.
+        create_author(User.objects.create_user('other'), 'Anton', 'Chekhov')
+        stdout = io.StringIO()
+        # enough books for the 5 list pages requested by the traffic.
+        call_command('loadtest', users=1, books=60, concurrency=1, duration=3, seed=1, url=self.live_server_url,
+                     stdout=stdout, stderr=io.StringIO())
+        report = dict(re.findall(r'^((?:GET|POST) \S+)\s+\d+\s+(\d+)', stdout.getvalue(), re.MULTILINE))
+        self.assertIn('POST viewer:book_add', report)
+        self.assertTrue(all(errors == '0' for errors in report.values()), stdout.getvalue())
+
+        user = User.objects.get(username='load-test-0')
+        created = Book.objects.filter(owner=user, name__startswith='Load test')
+        self.assertTrue(created.exists())
+        user_authors = BookAuthor.get_user_authors(user.pk)
+        self.assertFalse(created.exclude(author__in=user_authors).exists())
+
+    def test_form_errors_are_failures(self):
+        User.objects.create_user('reader', password='password')
+        results = defaultdict(list)
+        client = Client(self.live_server_url, results, threading.Lock())
+        self.assertEqual(client.post_form(reverse('sign_in'), {'username': 'reader', 'password': 'password'}), 302)
+        # the form is rendered again with the errors.
+        self.assertEqual(client.post_form(reverse('viewer:book_add'), {'name': ''}), 200)
+        self.assertEqual([succeeded for _duration, succeeded in results['POST sign_in']], [True])
+        self.assertEqual([succeeded for _duration, succeeded in results['POST viewer:book_add']], [False])
+        self.assertEqual([succeeded for _duration, succeeded in results['GET viewer:book_add']], [True])
@@ -0,0 +1,63 @@
+from django.urls import reverse
+
+from viewer.filters import BookFilter
+from viewer.models import Book
+from viewer.tests.utils import ViewerTestCase, create_bookcase, create_author, create_book, get_slot
+
+
+class BookSortKeyTests(ViewerTestCase):
+    """Book orderings sort by the stored sort keys, which follow the changes of the bookcases and authors.
+    """
+    def setUp(self):
+        super().setUp()
+        self.zola = create_author(self.user, 'Émile', 'Zola')
+        self.austen = create_author(self.user, 'Jane', 'austen')
+        self.bookcase = create_bookcase(self.user, name='Zeta')
+        self.other_bookcase = create_bookcase(self.user, name='Álpha')
+        self.nana = create_book(self.user, self.zola, 'Nana', slot=get_slot(self.bookcase, 1, 2))
+        self.emma = create_book(self.user, self.austen, 'emma', slot=get_slot(self.other_bookcase, 2, 1))
+        self.persuasion = create_book(self.user, self.austen, 'Persuasion', slot=get_slot(self.bookcase, 2, 1))
+        self.germinal = create_book(self.user, self.zola, 'Germinal')
+
+    def get_names(self, ordering: str) -> list[str]:
+        filterset = BookFilter({'ordering': ordering}, queryset=Book.objects.filter(owner=self.user))
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        return [book.name for book in filterset.qs]
+
+    def test_ordering_fields(self):
+        filterset = BookFilter({'ordering': '-bookcase'}, queryset=Book.objects.all())
+        self.assertEqual(filterset.qs.query.order_by, ('-sort_bookcase', '-sort_shelf', '-sort_slot', '-id'))
+        filterset = BookFilter({'ordering': 'author'}, queryset=Book.objects.all())
+        self.assertEqual(filterset.qs.query.order_by, ('sort_author', 'id'))
+
+    def test_orderings(self):
+        # unplaced books have empty placement keys and come first.
+        self.assertEqual(self.get_names('bookcase'), ['Germinal', 'emma', 'Nana', 'Persuasion'])
+        self.assertEqual(self.get_names('-bookcase'), ['Persuasion', 'Nana', 'emma', 'Germinal'])
+        self.assertEqual(self.get_names('shelf'), ['Germinal', 'Nana', 'emma', 'Persuasion'])
+        self.assertEqual(self.get_names('slot'), ['Germinal', 'emma', 'Persuasion', 'Nana'])
+        # case and accent insensitive.
+        self.assertEqual(self.get_names('name'), ['emma', 'Germinal', 'Nana', 'Persuasion'])
+        self.assertEqual(self.get_names('author'), ['emma', 'Persuasion', 'Nana', 'Germinal'])
+        self.assertEqual(self.get_names('-author'), ['Germinal', 'Nana', 'Persuasion', 'emma'])
+
+    def test_unknown_ordering(self):
+        filterset = BookFilter({'ordering': 'sort_name'}, queryset=Book.objects.all())
+        self.assertFalse(filterset.is_valid())
+
+    def test_sort_keys_follow_changes(self):
+        self.bookcase.name = 'Aardvark'
+        self.bookcase.save()
+        self.austen.firstname, self.austen.lastname = 'Jane', 'Zuckerman'
+        self.austen.save()
+        self.germinal.bookcase_slot = get_slot(self.other_bookcase, 1, 1)
+        self.germinal.save()
+
+        self.assertEqual(self.get_names('bookcase'), ['Nana', 'Persuasion', 'Germinal', 'emma'])
+        self.assertEqual(self.get_names('author'), ['Nana', 'Germinal', 'emma', 'Persuasion'])
+        self.assertEqual(Book.objects.get(pk=self.germinal.pk).owner_id, self.user.pk)
+
+    def test_book_list_ordering(self):
+        response = self.client.get(reverse('viewer:book_list'), {'ordering': '-name'})
+        self.assertEqual([book.name for book in response.context['table'].object_list],
+                         ['Persuasion', 'Nana', 'Germinal', 'emma'])
@@ -0,0 +1,150 @@
+import gzip
+import os
+import tempfile
+import time
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from viewer.page_cache import CachedPage, PageCache, MemoryPageCache, DiskPageCache, get_page_cache
+from viewer.storage import get_compressors
+from viewer.tests.utils import ViewerTestCase, create_author, create_book
+
+
+def make_page(size: int = 2000) -> 'CachedPage':
+    # random bytes do not compress, so the size of a page is known in advance.
+    return CachedPage.create(os.urandom(size), 'text/html; charset=utf-8')
+
+
+class CachedPageTests(SimpleTestCase):
+    def test_negotiate(self):
+        content = b'<p>War and Peace</p>' * 100
+        page = CachedPage.create(content, 'text/html; charset=utf-8')
+        self.assertEqual(set(page.bodies), set(get_compressors()))
+        self.assertLess(page.size, len(content))
+        preferred = 'br' if 'br' in page.bodies else 'gzip'
+        for accept_encoding, encoding in (('gzip, deflate, br', preferred), ('gzip', 'gzip'), ('br;q=0, gzip', 'gzip'),
+                                          ('deflate', None), ('', None)):
+            with self.subTest(accept_encoding=accept_encoding):
+                body, negotiated = page.negotiate(accept_encoding)
+                self.assertEqual(negotiated, encoding)
+                if encoding is None:
+                    self.assertEqual(body, content)
+                else:
+                    self.assertEqual(body, page.bodies[encoding])
+        self.assertEqual(gzip.decompress(page.bodies['gzip']), content)
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            PageCache(1000)
+
+
+class PageCacheTestsMixin:
+    """Tests shared by the backends, which create their caches by `create_cache(max_size)`.
+    """
+    def test_get(self):
+        cache = self.create_cache(10000)
+        page = make_page()
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', page)
+        self.assertEqual(cache.get('a'), page)
+        with override_settings(PAGE_CACHE_TIMEOUT=-1):
+            self.assertIsNone(cache.get('a'))
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (1, 2, 33))
+        self.assertEqual((stats['backend'], stats['entries'], stats['max_size']), (type(cache).__name__, 1, 10000))
+
+    def test_too_large(self):
+        cache = self.create_cache(1000)
+        cache.set('a', make_page())
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get_usage(), (0, 0))
+
+
+class MemoryPageCacheTests(PageCacheTestsMixin, SimpleTestCase):
+    def create_cache(self, max_size: int) -> 'PageCache':
+        return MemoryPageCache(max_size)
+
+    def test_evict_least_recently_used(self):
+        pages = {key: make_page() for key in 'abc'}
+        cache = self.create_cache(sum(page.size for page in pages.values()) - 1)
+        cache.set('a', pages['a'])
+        cache.set('b', pages['b'])
+        cache.get('a')
+        cache.set('c', pages['c'])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), (pages['a'], pages['c']))
+        self.assertEqual(cache.get_usage(), (2, pages['a'].size + pages['c'].size))
+        self.assertEqual(cache.evictions, 1)
+
+        # storing a page again replaces it.
+        cache.set('a', pages['b'])
+        self.assertEqual(cache.get('a'), pages['b'])
+        self.assertEqual(cache.get_usage(), (2, pages['b'].size + pages['c'].size))
+
+
+class DiskPageCacheTests(PageCacheTestsMixin, SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def create_cache(self, max_size: int) -> 'PageCache':
+        return DiskPageCache(max_size, self.directory)
+
+    def test_evict_least_recently_used(self):
+        pages = {key: make_page() for key in 'abc'}
+        cache = self.create_cache(10000)
+        cache.set('a', pages['a'])
+        cache.set('b', pages['b'])
+        # the modification times are the last uses, made apart for the file systems of a coarse resolution.
+        now = time.time()
+        os.utime(cache.get_path('a'), (now - 20, now - 20))
+        os.utime(cache.get_path('b'), (now - 10, now - 10))
+        self.assertEqual(cache.get('a'), pages['a'])
+        cache.set('c', pages['c'])
+        self.assertFalse(cache.get_path('b').exists())
+        self.assertEqual((cache.get('a'), cache.get('c')), (pages['a'], pages['c']))
+        entries, size = cache.get_usage()
+        self.assertEqual(entries, 2)
+        self.assertLessEqual(size, cache.max_size)
+        self.assertEqual(cache.evictions, 1)
+        # the workers share the directory.
+        self.assertEqual(self.create_cache(10000).get('c'), pages['c'])
+
+    def test_broken_file(self):
+        cache = self.create_cache(10000)
+        cache.get_path('a').write_bytes(b'not a page')
+        self.assertIsNone(cache.get('a'))
+
+
+class PageCacheViewTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(PAGE_CACHE_BACKEND='memory')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_page_cache.cache_clear()
+        self.addCleanup(get_page_cache.cache_clear)
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        create_book(self.user, self.author, 'War and Peace')
+        self.url = reverse('viewer:book_list')
+        # the first list of a session resets the page, which changes the key of the cached page.
+        self.client.get(self.url)
+
+    def test_cached_page(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual((response['X-Page-Cache'], response['Content-Encoding']), ('miss', 'gzip'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        content = gzip.decompress(response.content)
+        self.assertIn(b'War and Peace', content)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response.content, content)
+
+        create_book(self.user, self.author, 'Anna Karenina')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Anna Karenina')
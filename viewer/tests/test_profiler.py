@@ -0,0 +1,57 @@
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+from django.urls import reverse
+
+from viewer.models import ProfileCapture
+from viewer.tests.utils import ViewerTestCase, create_user, create_author, create_book
+
+
+class ProfilerMiddlewareTests(ViewerTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.profiler_dir = Path(directory.name)
+        settings_override = override_settings(PROFILER_DIR=self.profiler_dir, PROFILER_MAX_CAPTURES=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.staff = create_user('staff', is_staff=True, is_superuser=True)
+        create_book(self.user, create_author(self.user, 'Leo', 'Tolstoy'), 'War and Peace')
+
+    def test_not_requested(self):
+        response = self.client.get(reverse('viewer:book_list'), {'_profile': 1})
+        self.assertEqual(response.status_code, 200)
+        # only staff users are profiled.
+        self.assertNotIn('X-Profile-Capture', response)
+        self.client.force_login(self.staff)
+        self.assertNotIn('X-Profile-Capture', self.client.get(reverse('viewer:book_list')))
+        self.assertFalse(ProfileCapture.objects.exists())
+
+    def test_capture(self):
+        self.client.force_login(self.staff)
+        url = reverse('viewer:book_list')
+        response = self.client.get(url, {'_profile': 1})
+        capture = ProfileCapture.objects.get()
+        self.assertEqual(response['X-Profile-Capture'], str(capture.pk))
+        self.assertEqual((capture.user, capture.method, capture.path, capture.view_name, capture.status_code),
+                         (self.staff, 'GET', f'{url}?_profile=1', 'viewer:book_list', 200))
+        self.assertGreater(capture.query_count, 0)
+        self.assertTrue(all(path.is_file() for path in capture.get_files()))
+        report = capture.read_report()
+        self.assertTrue(report.startswith(f'GET {url}?_profile=1\nviewer:book_list -> 200\n'))
+        self.assertIn(f'SQL: {capture.query_count} queries', report)
+        self.assertIn('FROM "viewer_book"', report)
+
+    def test_header_and_pruning(self):
+        self.client.force_login(self.staff)
+        for _index in range(3):
+            self.client.get(reverse('viewer:book_list'), HTTP_X_PROFILE='1')
+        captures = list(ProfileCapture.objects.order_by('id'))
+        self.assertEqual(len(captures), 2)
+        # the files of the pruned capture are deleted with it.
+        self.assertEqual(len(list(self.profiler_dir.iterdir())), 4)
+
+        response = self.client.get(reverse('admin:viewer_profilecapture_change', args=[captures[0].pk]))
+        self.assertContains(response, 'viewer:book_list -&gt; 200')
@@ -0,0 +1,75 @@
+import gzip
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+NAME = 'css/base.css'
+
+
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # compressing the admin assets takes a while, so they are collected once.
+        static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(static_root.cleanup)
+        settings_override = override_settings(STATIC_ROOT=static_root.name, STATIC_SERVE=True)
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.content = (settings.BASE_DIR / 'assets' / NAME).read_bytes()
+
+    def get(self, name: str, **headers):
+        response = self.client.get(f'{settings.STATIC_URL}{name}', **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def get_content(self, response) -> bytes:
+        content = b''.join(response.streaming_content)
+        if response.get('Content-Encoding') == 'br':
+            return brotli.decompress(content)
+        if response.get('Content-Encoding') == 'gzip':
+            return gzip.decompress(content)
+        return content
+
+    def test_hashed_file(self):
+        name = staticfiles_storage.stored_name(NAME)
+        self.assertNotEqual(name, NAME)
+        # the brotli variants are written when the package is installed.
+        preferred = 'br' if brotli else 'gzip'
+        for accept_encoding, encoding in (('gzip, deflate, br', preferred), ('gzip', 'gzip'), ('br;q=0, gzip', 'gzip'),
+                                          ('', None), ('identity', None)):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.get(name, HTTP_ACCEPT_ENCODING=accept_encoding)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertEqual(response['Content-Type'], 'text/css')
+                self.assertEqual(response['Cache-Control'], f'public, max-age={settings.STATIC_MAX_AGE}, immutable')
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertNotIn('Content-Disposition', response)
+                self.assertEqual(self.get_content(response), self.content)
+
+    def test_unhashed_file(self):
+        response = self.get(NAME, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        self.assertEqual(self.get_content(response), self.content)
+
+        response = self.get(NAME, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        response = self.get(NAME, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_file(self):
+        for name in ('css/missing.css', 'css', '../manage.py'):
+            with self.subTest(name=name):
+                self.assertEqual(self.get(name).status_code, 404)
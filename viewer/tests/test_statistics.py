@@ -0,0 +1,71 @@
+import io
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from viewer.models import Library
+from viewer.tests.utils import (
+    ViewerTestCase, create_bookcase, create_author, create_book, get_slot, get_stats, rebuild_stats
+)
+
+
+class LibraryStatisticsTests(ViewerTestCase):
+    """Summary counters changed on writes stay equal to the counters rebuilt from scratch.
+    """
+    def setUp(self):
+        super().setUp()
+        self.author = create_author(self.user, 'Leo', 'Tolstoy')
+        self.other_author = create_author(self.user, 'Anton', 'Chekhov')
+        self.bookcase = create_bookcase(self.user, name='Hall', shelf_count=2, shelf_capacity=3)
+        self.other_bookcase = create_bookcase(self.user, name='Study', shelf_count=1, shelf_capacity=4)
+        self.book = create_book(self.user, self.author, 'War and Peace', slot=get_slot(self.bookcase, 1, 1))
+        create_book(self.user, self.author, 'Anna Karenina', slot=get_slot(self.bookcase, 1, 2))
+        create_book(self.user, self.other_author, 'The Seagull')
+
+    def assert_stats_rebuilt_equal(self):
+        stats = get_stats(self.user)
+        rebuild_stats(self.user)
+        self.assertEqual(get_stats(self.user), stats)
+
+    def test_counters(self):
+        stats = get_stats(self.user)
+        self.assertEqual(stats['library'], {'book_count': 3, 'unplaced_book_count': 1, 'bookcase_count': 2})
+        self.assertEqual(stats['bookcases'], {(self.bookcase.pk, 6, 2), (self.other_bookcase.pk, 4, 0)})
+        self.assertEqual(stats['authors'], {(self.author.pk, 2), (self.other_author.pk, 1)})
+        self.assert_stats_rebuilt_equal()
+
+    def test_counters_after_changes(self):
+        self.book.bookcase_slot = get_slot(self.other_bookcase, 1, 4)
+        self.book.author = self.other_author
+        self.book.save()
+        self.assertEqual(get_stats(self.user)['bookcases'], {(self.bookcase.pk, 6, 1), (self.other_bookcase.pk, 4, 1)})
+        self.assert_stats_rebuilt_equal()
+
+        self.book.bookcase_slot = None
+        self.book.save()
+        self.assertEqual(get_stats(self.user)['library']['unplaced_book_count'], 2)
+        self.assert_stats_rebuilt_equal()
+
+        self.book.delete()
+        self.assertEqual(get_stats(self.user)['library']['book_count'], 2)
+        self.assert_stats_rebuilt_equal()
+
+        self.bookcase.delete()
+        self.assertEqual(get_stats(self.user)['library'],
+                         {'book_count': 2, 'unplaced_book_count': 2, 'bookcase_count': 1})
+        self.assert_stats_rebuilt_equal()
+
+    def test_statistics_page(self):
+        response = self.client.get(reverse('viewer:statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['library'].book_count, 3)
+        self.assertEqual((response.context['slot_count'], response.context['occupied_slot_count']), (10, 2))
+        self.assertEqual([stats.author for stats in response.context['top_authors']], [self.author, self.other_author])
+
+    def test_rebuild_command(self):
+        Library.objects.filter(user=self.user).delete()
+        stdout = io.StringIO()
+        call_command('rebuild_library_stats', user_ids=[self.user.pk], stdout=stdout)
+        self.assertIn('Rebuilt 1/1 libraries.', stdout.getvalue())
+        self.assertEqual(get_stats(self.user)['library'],
+                         {'book_count': 3, 'unplaced_book_count': 1, 'bookcase_count': 2})
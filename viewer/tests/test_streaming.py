@@ -0,0 +1,101 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from viewer.models import Job
+from viewer.streaming import StreamingRouter, JobEventHub
+from viewer.tests.utils import create_user, create_bookcase, create_author, create_book, get_slot
+
+
+# the streams read the database in their own threads, which only see committed rows.
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', JOBS_POLL_INTERVAL=0.05)
+class StreamingRouterTests(TransactionTestCase):
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.cookie = f'{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        author = create_author(self.user, 'Leo', 'Tolstoy')
+        bookcase = create_bookcase(self.user, name='Hall')
+        self.book = create_book(self.user, author, 'War and Peace', slot=get_slot(bookcase, 1, 2))
+        create_book(create_user('other'), author, 'Anna Karenina')
+        self.application = StreamingRouter(get_asgi_application())
+
+    def get_scope(self, path: str, query_string: str = '', cookie: bool = True) -> dict:
+        return {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query_string.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'testserver')] + ([(b'cookie', self.cookie.encode())] if cookie else []),
+            'client': ('127.0.0.1', 12345),
+            'server': ('testserver', 80),
+        }
+
+    async def get(self, path: str, query_string: str = '', cookie: bool = True) -> tuple[dict, list[bytes]]:
+        """Response start message and body chunks of a GET request sent to the router.
+        """
+        communicator = ApplicationCommunicator(self.application, self.get_scope(path, query_string, cookie))
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(timeout=5)
+        chunks = []
+        while True:
+            message = await communicator.receive_output(timeout=5)
+            chunks.append(message['body'])
+            if not message.get('more_body'):
+                break
+        await communicator.wait(timeout=5)
+        return start, chunks
+
+    async def test_book_export(self):
+        start, chunks = await self.get(reverse('viewer:book_export'), 'bookcase_name=hall')
+        headers = dict(start['headers'])
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(headers[b'Content-Type'], b'text/csv; charset=utf-8')
+        self.assertEqual(headers[b'Content-Disposition'], b'attachment; filename="books.csv"')
+        # the headers of the security and clickjacking middleware.
+        self.assertEqual(headers[b'X-Frame-Options'], b'DENY')
+        self.assertEqual(headers[b'X-Content-Type-Options'], b'nosniff')
+        self.assertEqual(b''.join(chunks).decode().splitlines(), [
+            'id,name,author_firstname,author_lastname,bookcase,bookshelf_number,slot_number',
+            f'{self.book.pk},War and Peace,Leo,Tolstoy,Hall,1,2',
+        ])
+
+    async def test_book_export_errors(self):
+        start, chunks = await self.get(reverse('viewer:book_export'), 'bookcase=none')
+        self.assertEqual(start['status'], 400)
+        self.assertIn(b'bookcase', b''.join(chunks))
+
+        start, _chunks = await self.get(reverse('viewer:book_export'), cookie=False)
+        self.assertEqual(start['status'], 302)
+        self.assertTrue(dict(start['headers'])[b'Location'].startswith(settings.LOGIN_URL.encode()))
+
+    async def test_job_events(self):
+        job = await sync_to_async(Job.objects.create)(user=self.user, name='import_catalog', status=Job.RUNNING)
+        with mock.patch('viewer.streaming.job_event_hub', JobEventHub()):
+            communicator = ApplicationCommunicator(self.application, self.get_scope(reverse('viewer:job_events')))
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            start = await communicator.receive_output(timeout=5)
+            self.assertEqual(start['status'], 200)
+            self.assertEqual(dict(start['headers'])[b'Content-Type'], b'text/event-stream')
+            message = await communicator.receive_output(timeout=5)
+            self.assertTrue(message['body'].startswith(b'event: jobs\ndata: [{"id": %d' % job.pk))
+
+            await sync_to_async(Job.objects.filter(pk=job.pk).update)(status=Job.SUCCEEDED)
+            message = await communicator.receive_output(timeout=5)
+            self.assertEqual(message['body'], b'event: jobs\ndata: []\n\nevent: done\ndata: {}\n\n')
+            self.assertEqual(await communicator.receive_output(timeout=5), {'type': 'http.response.body', 'body': b''})
+            await communicator.wait(timeout=5)
+
+    async def test_job_events_without_login(self):
+        start, chunks = await self.get(reverse('viewer:job_events'), cookie=False)
+        self.assertEqual((start['status'], chunks), (204, [b'']))
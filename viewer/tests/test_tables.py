@@ -0,0 +1,53 @@
+from django.test import RequestFactory
+from django.urls import reverse
+
+from viewer.models import Book, Bookcase, BookAuthor
+from viewer.tables import BookTable, BookcaseTable, BookAuthorTable
+from viewer.tests.utils import ViewerTestCase, create_bookcase, create_author, create_book, get_slot
+
+
+class CompiledTableTests(ViewerTestCase):
+    """The compiled rendering matches the rendering by the table components.
+    """
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().get('/', {'ordering': 'name'})
+        self.request.user = self.user
+        bookcase = create_bookcase(self.user, name='Case <A>')
+        author = create_author(self.user, firstname='Tom & "Jerry"', lastname="O'Brien")
+        create_book(self.user, author, name='<script>alert(1)</script>', slot=get_slot(bookcase, 2, 3))
+        create_book(self.user, author, name='Unplaced', picture='covers/a&b.png')
+
+    def assert_renderings_equal(self, table_class, object_list) -> str:
+        compiled_html = table_class(self.request, object_list, compiled=True).render()
+        self.assertEqual(table_class(self.request, object_list, compiled=False).render(), compiled_html)
+        return compiled_html
+
+    def test_book_table(self):
+        html = self.assert_renderings_equal(BookTable, list(Book.objects.filter(owner=self.user).order_by('id')))
+        self.assertIn('Case &lt;A&gt;', html)
+        self.assertIn('&lt;script&gt;alert(1)&lt;/script&gt;', html)
+        self.assertIn('Tom &amp; &quot;Jerry&quot; O&#x27;Brien', html)
+        self.assertNotIn('<script>', html)
+        self.assertIn(reverse('viewer:book_update', kwargs={'pk': Book.objects.get(name='Unplaced').pk}), html)
+
+    def test_bookcase_table(self):
+        html = self.assert_renderings_equal(BookcaseTable, list(Bookcase.objects.filter(user=self.user)))
+        self.assertIn('Case &lt;A&gt;', html)
+        self.assertNotIn('Case <A>', html)
+        self.assertIn('<td>10</td>', html)
+
+    def test_book_author_table(self):
+        html = self.assert_renderings_equal(BookAuthorTable, list(BookAuthor.get_user_authors(self.user.pk)))
+        self.assertIn('Tom &amp; &quot;Jerry&quot;', html)
+        self.assertIn('<td>2</td>', html)
+
+    def test_empty_tables(self):
+        for table_class in (BookTable, BookcaseTable, BookAuthorTable):
+            with self.subTest(table=table_class.__name__):
+                self.assertIn('No items found', self.assert_renderings_equal(table_class, []))
+
+    def test_book_list_page(self):
+        response = self.client.get(reverse('viewer:book_list'))
+        self.assertContains(response, 'Case &lt;A&gt;')
+        self.assertNotContains(response, 'Case <A>')
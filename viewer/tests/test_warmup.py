@@ -0,0 +1,41 @@
+from copy import deepcopy
+from unittest import mock
+
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from viewer import warmup
+
+CACHED_TEMPLATES = deepcopy(settings.TEMPLATES)
+CACHED_TEMPLATES[0]['OPTIONS']['loaders'] = [('django.template.loaders.cached.Loader', settings.TEMPLATE_LOADERS)]
+
+
+class WarmupTests(SimpleTestCase):
+    def test_urls(self):
+        self.assertGreater(warmup.warmup_urls(), 20)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_templates(self):
+        loader, = engines['django'].engine.template_loaders
+        self.assertEqual(loader.get_template_cache, {})
+        count = warmup.warmup_templates()
+        # the templates of the project and the widgets, without the admin templates.
+        self.assertIn('dashboard_list.html', loader.get_template_cache)
+        self.assertIn('blocks/_uikit_table_pagination.html', loader.get_template_cache)
+        self.assertFalse(any(name.startswith('admin/') for name in loader.get_template_cache))
+        self.assertGreater(count, len(loader.get_template_cache))
+
+    def test_warmup(self):
+        # the application may be loaded before the workers are forked, simple test cases fail on queries.
+        timings = warmup.warmup()
+        self.assertEqual(set(timings), {'urls', 'templates', 'translations'})
+
+    def test_warmup_on_startup(self):
+        with mock.patch('viewer.warmup.warmup') as warmup_mock:
+            with override_settings(WARMUP_ON_STARTUP=False):
+                warmup.warmup_on_startup()
+            warmup_mock.assert_not_called()
+            with override_settings(WARMUP_ON_STARTUP=True):
+                warmup.warmup_on_startup()
+            warmup_mock.assert_called_once_with()
@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from viewer.models import Bookcase, BookcaseSlot, BookAuthor, Book, AuthorStats, Library, BookcaseStats
+
+
+def create_user(username: str = 'reader', **kwargs) -> 'User':
+    return User.objects.create_user(username, password='password', **kwargs)
+
+
+def create_bookcase(user: 'User', name: str = 'Bookcase', shelf_count: int = 2, shelf_capacity: int = 5) -> 'Bookcase':
+    bookcase = Bookcase.objects.create(user=user, name=name)
+    BookcaseSlot.bulk_create_for_bookcase(bookcase, shelf_count, shelf_capacity)
+    return bookcase
+
+
+def get_slot(bookcase: 'Bookcase', bookshelf_number: int = 1, number: int = 1) -> 'BookcaseSlot':
+    return BookcaseSlot.objects.select_related('bookcase').get(
+        bookcase=bookcase, bookshelf_number=bookshelf_number, number=number
+    )
+
+
+def create_author(user: 'User', firstname: str = 'Leo', lastname: str = 'Tolstoy') -> 'BookAuthor':
+    """Author added to the user's authors, like the author form does.
+    """
+    author, _created = BookAuthor.objects.get_or_create(firstname=firstname, lastname=lastname)
+    AuthorStats.add(user.pk, author.pk)
+    return author
+
+
+def create_book(user: 'User', author: 'BookAuthor', name: str = 'War and Peace', slot: 'BookcaseSlot' = None,
+                **kwargs) -> 'Book':
+    return Book.objects.create(owner=user, author=author, name=name, bookcase_slot=slot, **kwargs)
+
+
+def get_stats(user: 'User') -> dict:
+    """Summary counters of the user's library, bookcases and authors.
+    """
+    return {
+        'library': Library.objects.filter(user=user).values(*Library.COUNTER_FIELDS).first(),
+        'bookcases': set(BookcaseStats.objects.filter(user=user).values_list(
+            'bookcase_id', 'slot_count', 'occupied_slot_count'
+        )),
+        'authors': set(AuthorStats.objects.filter(user=user).values_list('author_id', 'book_count')),
+    }
+
+
+def rebuild_stats(user: 'User') -> None:
+    Library.rebuild([user.pk])
+    AuthorStats.rebuild([user.pk])
+    BookcaseStats.rebuild(Bookcase.objects.filter(user=user))
+
+
+# the test runner disables DEBUG, and the manifest of the hashed static file names is built by deployments only.
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ViewerTestCase(TestCase):
+    """Test case with a logged in user.
+    """
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_login(self.user)
@@ -0,0 +1,34 @@
+from io import BytesIO
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# twice the size of the bookcase grid pictures, for high density screens.
+THUMBNAIL_SIZE = (80, 80)
+THUMBNAIL_DIR = 'thumbnails'
+
+
+def get_thumbnail_name(picture_name: str) -> str:
+    return f'{THUMBNAIL_DIR}/{picture_name}'
+
+
+def make_thumbnail(picture) -> Optional[str]:
+    """Store a thumbnail of the picture in its own format, returns its name or None for unreadable pictures.
+
+    The name is derived from the picture name, so a picture keeps its thumbnail until it is replaced.
+    """
+    try:
+        with picture.open('rb'), Image.open(picture) as image:
+            image_format = image.format
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(THUMBNAIL_SIZE)
+            content = BytesIO()
+            image.save(content, format=image_format)
+    except (OSError, ValueError):
+        return None
+    name = get_thumbnail_name(picture.name)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(content.getvalue()))
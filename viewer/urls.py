@@ -1,6 +1,6 @@
 from django.urls import path
 
-from viewer import views
+from viewer import api, views
 
 app_name = 'viewer'
 
@@ -10,10 +10,13 @@ urlpatterns = [
     path('book/add/', views.BookCreateView.as_view(), name='book_add'),
     path('book/update/<int:pk>/', views.BookUpdateView.as_view(), name='book_update'),
     path('book/delete/<int:pk>/', views.BookDeleteView.as_view(), name='book_delete'),
+    path('book/export/', views.BookExportView.as_view(), name='book_export'),
+    path('book/duplicates/', views.BookDuplicateListView.as_view(), name='book_duplicates'),
 
     # Bookcase
     path('bookcase/list/', views.BookcaseListView.as_view(), name='bookcase_list'),
     path('bookcase/add/', views.BookcaseCreateView.as_view(), name='bookcase_add'),
+    path('bookcase/<int:pk>/', views.BookcaseDetailView.as_view(), name='bookcase_detail'),
     path('bookcase/update/<int:pk>/', views.BookcaseUpdateView.as_view(), name='bookcase_update'),
     path('bookcase/delete/<int:pk>/', views.BookcaseDeleteView.as_view(), name='bookcase_delete'),
 
@@ -22,4 +25,21 @@ urlpatterns = [
     path('book-author/add/', views.BookAuthorCreateView.as_view(), name='book_author_add'),
     path('book-author/update/<int:pk>/', views.BookAuthorUpdateView.as_view(), name='book_author_update'),
     path('book-author/delete/<int:pk>/', views.BookAuthorDeleteView.as_view(), name='book_author_delete'),
+
+    # Catalog
+    path('catalog/lookup/', views.CatalogLookupView.as_view(), name='catalog_lookup'),
+
+    # Statistics
+    path('statistics/', views.StatisticsView.as_view(), name='statistics'),
+
+    # Background jobs
+    path('job/list/', views.JobListView.as_view(), name='job_list'),
+    path('job/<int:pk>/', views.JobStatusView.as_view(), name='job_status'),
+    path('job/events/', views.JobEventsView.as_view(), name='job_events'),
+
+    # JSON API
+    path('api/v1/books/', api.BookApiListView.as_view(), name='api_v1_book_list'),
+    path('api/v1/bookcases/', api.BookcaseApiListView.as_view(), name='api_v1_bookcase_list'),
+    path('api/v1/book-authors/', api.BookAuthorApiListView.as_view(), name='api_v1_book_author_list'),
+    path('api/v1/changes/', api.ChangeFeedApiView.as_view(), name='api_v1_changes'),
 ]
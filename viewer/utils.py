@@ -0,0 +1,39 @@
+import hashlib
+import unicodedata
+from typing import Optional
+
+from django.db.models import Q
+
+
+def collation_key(value: str, max_length: Optional[int] = 254) -> str:
+    """Build a case and accent insensitive key to sort strings by in the database.
+
+    Keys are stored next to the original values, so sorting uses a plain index and
+    does not depend on the database collation.
+    """
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    key = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(key.casefold().split())[:max_length]
+
+
+def book_fingerprint(name: str, author_id: int) -> str:
+    """Fingerprint equal for the books of the same author with names differing only in case, accents or spacing.
+    """
+    return hashlib.sha1(f'{author_id}:{collation_key(name, max_length=None)}'.encode()).hexdigest()
+
+
+def prefix_q(field_name: str, prefix: str) -> 'Q':
+    """Condition for values starting with the prefix as a range, usable by a plain B-tree index in any collation.
+    """
+    return Q(**{f'{field_name}__gte': prefix, f'{field_name}__lt': prefix + '\U0010ffff'})
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Content encodings of the `Accept-Encoding` header, without the ones refused by a zero quality.
+    """
+    encodings = set()
+    for part in accept_encoding.split(','):
+        encoding, _separator, params = part.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(encoding.strip().lower())
+    return encodings
@@ -2,18 +2,27 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView
 from django.db import transaction
-from django.http import HttpResponseRedirect
+from django.http import (
+    HttpResponseRedirect, JsonResponse, StreamingHttpResponse, HttpResponse, HttpResponseBadRequest
+)
 from django.urls import reverse_lazy
+from django.utils.cache import patch_cache_control
 from django.utils.translation import ugettext_lazy as _
-from django.views.generic import CreateView, UpdateView, DeleteView
+from django.views.generic import CreateView, UpdateView, DeleteView, View, TemplateView, DetailView
+from django.views.generic.detail import SingleObjectMixin
 from django_filters.views import FilterView
 from template_tables.mixins import TemplateTableViewMixin, TemplateTablePaginationMixin
 
+from viewer.catalog import lookup, get_book_initial, get_author_initial
+from viewer.facets import get_book_facets
 from viewer.filters import BookFilter, BookcaseFilter, BookAuthorFilter
 from viewer.forms import LoginForm, BookcaseCreateForm, BookForm, BookAuthorForm, BookcaseEditForm
-from viewer.mixins import MessageMixin, RedirectMixin
-from viewer.models import Bookcase, Book, BookAuthor, BookcaseSlot
-from viewer.tables import BookcaseTable, TablePagination, BookTable, BookAuthorTable
+from viewer.jobs import enqueue
+from viewer.mixins import MessageMixin, RedirectMixin, PageCacheMixin
+from viewer.models import Bookcase, Book, BookAuthor, BookcaseSlot, Job, Library, BookcaseStats, AuthorStats
+from viewer.page_cache import get_page_cache
+from viewer.streaming import iter_book_export
+from viewer.tables import BookcaseTable, TablePagination, BookTable, BookAuthorTable, BookcaseGrid
 
 
 class CustomLoginView(LoginView):
@@ -27,6 +36,7 @@ class CustomLoginView(LoginView):
 BOOKS = 'books'
 BOOKCASES = 'bookcases'
 BOOK_AUTHORS = 'authors'
+STATISTICS = 'statistics'
 
 
 class DashboardViewMixin(LoginRequiredMixin):
@@ -47,7 +57,13 @@ class DashboardViewMixin(LoginRequiredMixin):
         BOOK_AUTHORS: {
             'url': reverse_lazy('viewer:book_author_list'),
             'icon': 'user',
-            'name': _('Authors')
+            'name': _('Authors'),
+            'add_divider': True
+        },
+        STATISTICS: {
+            'url': reverse_lazy('viewer:statistics'),
+            'icon': 'info',
+            'name': _('Statistics')
         }
     }
     alias: str = None
@@ -60,6 +76,8 @@ class DashboardViewMixin(LoginRequiredMixin):
             'actions': self.get_actions(),
             'menu': self.menu,
             'alias': self.alias,
+            'jobs_url': reverse_lazy('viewer:job_list'),
+            'job_events_url': reverse_lazy('viewer:job_events'),
         })
         return context
 
@@ -67,7 +85,7 @@ class DashboardViewMixin(LoginRequiredMixin):
         return self.actions
 
 
-class DashboardFilterView(DashboardViewMixin, FilterView):
+class DashboardFilterView(DashboardViewMixin, PageCacheMixin, FilterView):
     """Base list view for dashboard with predefined actions.
     """
     pass
@@ -88,11 +106,35 @@ class BookListView(TemplateTableViewMixin, TemplateTablePaginationMixin, Dashboa
             'url': reverse_lazy('viewer:book_add'),
             'icon': 'plus',
             'name': _('Add book')
+        },
+        {
+            'url': reverse_lazy('viewer:book_duplicates'),
+            'icon': 'copy',
+            'name': _('Duplicates')
         }
     ]
 
     def get_queryset(self):
-        return super().get_queryset().filter(bookcase_slot__bookcase__user=self.request.user)
+        return super().get_queryset().visible().filter(owner=self.request.user)
+
+    def get_actions(self) -> list[dict]:
+        query = self.request.GET.copy()
+        query.pop('page', None)
+        return [
+            *self.actions,
+            {
+                'url': f'{reverse_lazy("viewer:book_export")}?{query.urlencode()}',
+                'icon': 'download',
+                'name': _('Export CSV'),
+                'keep_query': True
+            }
+        ]
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(object_list=object_list, **kwargs)
+        if not self.filterset.is_bound or self.filterset.is_valid():
+            context['facets'] = get_book_facets(self.request, self.filterset)
+        return context
 
 
 class BookcaseListView(TemplateTableViewMixin, TemplateTablePaginationMixin, DashboardFilterView):
@@ -114,11 +156,43 @@ class BookcaseListView(TemplateTableViewMixin, TemplateTablePaginationMixin, Das
     ]
 
     def get_queryset(self):
-        return super().get_queryset().filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user, is_deleted=False)
+
+
+class BookcaseDetailView(DashboardViewMixin, DetailView):
+    """View for rendering the shelves and slots of the bookcase with its books.
+
+    The grid is read by one query of the slots with their books, see `BookcaseGrid`.
+    """
+    model = Bookcase
+    context_object_name = 'bookcase'
+    template_name = 'dashboard_bookcase.html'
+
+    alias = BOOKCASES
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user, is_deleted=False)
+
+    def get_actions(self) -> list[dict]:
+        return [
+            {
+                'url': reverse_lazy('viewer:bookcase_update', kwargs={'pk': self.object.pk}),
+                'icon': 'pencil',
+                'name': _('Edit bookcase')
+            }
+        ]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'grid': BookcaseGrid(self.object),
+            'stats': BookcaseStats.objects.filter(bookcase=self.object).first(),
+        })
+        return context
 
 
 class BookAuthorListView(TemplateTableViewMixin, TemplateTablePaginationMixin, DashboardFilterView):
-    """View for rendering book author's table.
+    """View for rendering the table of the user's book authors, the most used first.
     """
     model = BookAuthor
     pagination_class = TablePagination
@@ -134,6 +208,79 @@ class BookAuthorListView(TemplateTableViewMixin, TemplateTablePaginationMixin, D
             'name': _('Add author')
         }
     ]
+    ordering = ('-book_count', 'lastname', 'id')
+
+    def get_queryset(self):
+        return BookAuthor.get_user_authors(self.request.user.pk).order_by(*self.ordering)
+
+
+class BookDuplicateListView(DashboardViewMixin, TemplateView):
+    """View for rendering groups of the user's duplicate books with merging in the background.
+    """
+    template_name = 'dashboard_duplicates.html'
+    groups_limit = 50
+
+    alias = BOOKS
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(object_list=object_list, **kwargs)
+        duplicates = Book.get_duplicates(Book.objects.visible().filter(owner=self.request.user))
+        fingerprints = [row['fingerprint'] for row in duplicates[:self.groups_limit]]
+        groups = {fingerprint: [] for fingerprint in fingerprints}
+        books = Book.objects.visible().filter(owner=self.request.user, fingerprint__in=fingerprints).order_by('id')
+        for book in books:
+            groups[book.fingerprint].append(book)
+        context.update({
+            'groups': list(groups.values()),
+            'group_count': duplicates.count() if len(fingerprints) == self.groups_limit else len(fingerprints),
+        })
+        return context
+
+    def post(self, request, *args, **kwargs):
+        enqueue('merge_book_duplicates', user=request.user, user_id=request.user.pk)
+        messages.success(request, _('Merging has been scheduled and will be finished shortly.'))
+        return HttpResponseRedirect(reverse_lazy('viewer:book_duplicates'))
+
+
+class StatisticsView(DashboardViewMixin, TemplateView):
+    """View for rendering the user's library statistics.
+
+    Everything is read from the summary tables, so rendering does not depend on the number of books.
+    """
+    template_name = 'dashboard_statistics.html'
+    top_authors_count = 10
+    top_libraries_count = 20
+
+    alias = STATISTICS
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(object_list=object_list, **kwargs)
+        user = self.request.user
+        bookcases = list(
+            BookcaseStats.objects
+            .filter(user=user, bookcase__is_deleted=False)
+            .select_related('bookcase')
+            .order_by('bookcase__name')
+        )
+        context.update({
+            'library': Library.get(user.pk),
+            'bookcases': bookcases,
+            'slot_count': sum(stats.slot_count for stats in bookcases),
+            'occupied_slot_count': sum(stats.occupied_slot_count for stats in bookcases),
+            'top_authors': (
+                AuthorStats.objects
+                .filter(user=user, book_count__gt=0)
+                .select_related('author')
+                .order_by('-book_count')[:self.top_authors_count]
+            ),
+        })
+        if user.is_staff:
+            context['top_libraries'] = (
+                Library.objects.select_related('user').order_by('-book_count')[:self.top_libraries_count]
+            )
+            page_cache = get_page_cache()
+            context['page_cache'] = page_cache.get_stats() if page_cache else None
+        return context
 
 
 class CreateOrUpdateMixinView(MessageMixin, RedirectMixin):
@@ -150,6 +297,35 @@ class CreateOrUpdateMixinView(MessageMixin, RedirectMixin):
         return form_kwargs
 
 
+class CatalogPrefillMixin:
+    """Mixin prefilling the create form from the catalog record passed in the `catalog` parameter.
+
+    `catalog_target` tells the catalog search on the page whether books or their authors are picked,
+    and the form is prefilled from a catalog book or author accordingly.
+    """
+    catalog_target: str = None
+
+    def get_initial(self):
+        initial = super().get_initial()
+        key = self.request.GET.get('catalog')
+        if key:
+            initial.update(self.get_catalog_initial(key))
+        return initial
+
+    def get_catalog_initial(self, key: str) -> dict:
+        if self.catalog_target == 'author':
+            return get_author_initial(key)
+        return get_book_initial(key, self.request.user.pk)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'catalog_target': self.catalog_target,
+            'catalog_lookup_url': reverse_lazy('viewer:catalog_lookup'),
+        })
+        return context
+
+
 class DeleteMixinView(MessageMixin, RedirectMixin):
     """Mixin to provide custom logic on objects deletion.
     """
@@ -166,16 +342,40 @@ class DeleteMixinView(MessageMixin, RedirectMixin):
         return context
 
 
-class BookCreateView(DashboardViewMixin, CreateOrUpdateMixinView, CreateView):
+class BackgroundDeleteMixinView(DeleteMixinView):
+    """Mixin to delete heavy objects in a background job instead of the request.
+    """
+    success_message = _('Deletion has been scheduled and will be finished shortly.')
+    job_name: str = None
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        # the object is hidden at once and deleted by the job in chunks.
+        self.object.mark_deleted()
+        enqueue(self.job_name, user=request.user, pk=self.object.pk)
+        messages.success(request, self.success_message)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class BookCreateView(DashboardViewMixin, CatalogPrefillMixin, CreateOrUpdateMixinView, CreateView):
     """View for bookcase creation.
     """
     model = Book
     context_object_name = 'book'
     form_class = BookForm
-    template_name = 'dashboard_form.html'
+    template_name = 'dashboard_catalog_form.html'
     success_url = reverse_lazy('viewer:book_list')
 
     alias = BOOKS
+    catalog_target = 'book'
+
+    def get_initial(self):
+        initial = super().get_initial()
+        # free slots of the bookcase grid link to the form with the slot picked.
+        bookcase_slot = self.request.GET.get('bookcase_slot')
+        if bookcase_slot and bookcase_slot.isdigit():
+            initial['bookcase_slot'] = int(bookcase_slot)
+        return initial
 
 
 class BookUpdateView(DashboardViewMixin, CreateOrUpdateMixinView, UpdateView):
@@ -237,28 +437,47 @@ class BookcaseUpdateView(DashboardViewMixin, CreateOrUpdateMixinView, UpdateView
 
     alias = BOOKCASES
 
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user, is_deleted=False)
+
 
-class BookcaseDeleteView(DashboardViewMixin, DeleteMixinView, DeleteView):
+class BookcaseDeleteView(DashboardViewMixin, BackgroundDeleteMixinView, DeleteView):
     """View for bookcase deletion.
     """
     model = Bookcase
     context_object_name = 'bookcase'
+    job_name = 'delete_bookcase'
     success_url = reverse_lazy('viewer:bookcase_list')
     template_name = 'dashboard_confirm.html'
 
     alias = BOOKCASES
 
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user, is_deleted=False)
+
 
-class BookAuthorCreateView(DashboardViewMixin, CreateOrUpdateMixinView, CreateView):
+class BookAuthorCreateView(DashboardViewMixin, CatalogPrefillMixin, CreateOrUpdateMixinView, CreateView):
     """View for book author creation.
     """
     model = BookAuthor
     context_object_name = 'book_author'
     form_class = BookAuthorForm
-    template_name = 'dashboard_form.html'
+    template_name = 'dashboard_catalog_form.html'
     success_url = reverse_lazy('viewer:book_author_list')
 
     alias = BOOK_AUTHORS
+    catalog_target = 'author'
+
+    def form_valid(self, form):
+        self.object, _created = BookAuthor.objects.get_or_create(
+            firstname=form.cleaned_data['firstname'], lastname=form.cleaned_data['lastname']
+        )
+        if self.object.is_deleted_for(self.request.user.pk):
+            form.add_error(None, _('The author is being deleted, please try again later.'))
+            return self.form_invalid(form)
+        AuthorStats.add(self.request.user.pk, self.object.pk)
+        messages.success(self.request, self.success_message)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class BookAuthorUpdateView(DashboardViewMixin, CreateOrUpdateMixinView, UpdateView):
@@ -272,13 +491,108 @@ class BookAuthorUpdateView(DashboardViewMixin, CreateOrUpdateMixinView, UpdateVi
 
     alias = BOOK_AUTHORS
 
+    def get_queryset(self):
+        return BookAuthor.get_user_authors(self.request.user.pk)
+
+    def form_valid(self, form):
+        user_id = self.request.user.pk
+        author = BookAuthor.objects.get(pk=self.object.pk)
+        target = (
+            BookAuthor.objects
+            .filter(firstname=form.cleaned_data['firstname'], lastname=form.cleaned_data['lastname'])
+            .exclude(pk=author.pk)
+            .first()
+        )
+        if target is None and not author.is_shared(user_id):
+            return super().form_valid(form)
+        if target is not None and target.is_deleted_for(user_id):
+            form.add_error(None, _('The author is being deleted, please try again later.'))
+            return self.form_invalid(form)
+        # the author is shared, so the user's books move to a copy instead of renaming it for everybody.
+        with transaction.atomic():
+            if target is None:
+                target = BookAuthor.objects.create(
+                    firstname=form.cleaned_data['firstname'], lastname=form.cleaned_data['lastname']
+                )
+            author.move_user_books(user_id, target)
+        self.object = target
+        messages.success(self.request, self.success_message)
+        return HttpResponseRedirect(self.get_success_url())
+
 
-class BookAuthorDeleteView(DashboardViewMixin, DeleteMixinView, DeleteView):
+class BookAuthorDeleteView(DashboardViewMixin, BackgroundDeleteMixinView, DeleteView):
     """View for book author deletion.
     """
     model = BookAuthor
     context_object_name = 'book_author'
+    job_name = 'delete_book_author'
     success_url = reverse_lazy('viewer:book_author_list')
     template_name = 'dashboard_confirm.html'
 
     alias = BOOK_AUTHORS
+
+    def get_queryset(self):
+        return BookAuthor.get_user_authors(self.request.user.pk)
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if not self.object.is_shared(request.user.pk):
+            return super().delete(request, *args, **kwargs)
+        # only the user's books are deleted, the author stays with the other users.
+        AuthorStats.mark_deleted(request.user.pk, self.object.pk)
+        enqueue(self.job_name, user=request.user, pk=self.object.pk, user_id=request.user.pk)
+        messages.success(request, self.success_message)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class JobListView(LoginRequiredMixin, View):
+    """JSON list of the user's active jobs for the dashboard to poll.
+    """
+    def get(self, request, *args, **kwargs):
+        jobs = Job.objects.filter(user=request.user, status__in=Job.ACTIVE_STATUSES).order_by('id')
+        return JsonResponse({'jobs': [job.as_dict() for job in jobs]})
+
+
+class JobStatusView(LoginRequiredMixin, SingleObjectMixin, View):
+    """JSON status and progress of a single user's job.
+    """
+    model = Job
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(self.get_object().as_dict())
+
+
+class CatalogLookupView(LoginRequiredMixin, View):
+    """JSON list of the catalog books matching the ISBN or the title prefix in the `q` parameter.
+    """
+    def get(self, request, *args, **kwargs):
+        response = JsonResponse({'results': lookup(request.GET.get('q', '').strip(), request.user.pk)})
+        patch_cache_control(response, private=True, max_age=300)
+        return response
+
+
+class BookExportView(LoginRequiredMixin, View):
+    """CSV export of the filtered user's books.
+
+    Under ASGI the chunks of the response are read by `viewer.streaming.stream_book_export`.
+    """
+    def get(self, request, *args, **kwargs):
+        filterset = BookFilter(request.GET, queryset=Book.objects.visible().filter(owner=request.user))
+        if not filterset.is_valid():
+            # an invalid filter would export the whole library instead of the requested books.
+            return HttpResponseBadRequest(filterset.errors.as_text(), content_type='text/plain; charset=utf-8')
+        response = StreamingHttpResponse(iter_book_export(filterset.qs), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="books.csv"'
+        return response
+
+
+class JobEventsView(View):
+    """Fallback of the job events stream served by `viewer.streaming.stream_job_events` under ASGI.
+
+    Event streams would hold a WSGI worker each, so clients are told to poll the job list instead.
+    """
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(status=204)
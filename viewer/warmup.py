@@ -0,0 +1,112 @@
+import logging
+import time
+from pathlib import Path
+from typing import Iterator
+
+from django.conf import settings
+from django.forms.renderers import get_default_renderer
+from django.template import engines, TemplateSyntaxError
+from django.urls import get_resolver, URLResolver, reverse, NoReverseMatch
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+# templates of the admin are used by few staff requests and are compiled on demand.
+SKIPPED_TEMPLATE_PREFIXES = ('admin/', 'registration/')
+FORM_TEMPLATE_PREFIX = 'django/forms/'
+
+
+def iter_resolvers(resolver: 'URLResolver', namespace: str = '') -> Iterator[tuple[str, 'URLResolver']]:
+    yield namespace, resolver
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            child_namespace = namespace
+            if pattern.namespace:
+                child_namespace = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from iter_resolvers(pattern, child_namespace)
+
+
+def warmup_urls() -> int:
+    """Import the URL configuration with all views and build the reverse lookup tables of every resolver.
+
+    Returns the number of reversed URL names.
+    """
+    count = 0
+    for namespace, resolver in iter_resolvers(get_resolver()):
+        for name in resolver.reverse_dict:
+            if not isinstance(name, str):
+                continue
+            try:
+                reverse(f'{namespace}:{name}' if namespace else name)
+            except NoReverseMatch:
+                # the URL takes arguments, its lookup table is built anyway.
+                pass
+            count += 1
+    return count
+
+
+def iter_template_files(backend, prefix: str = '') -> Iterator[tuple[str, Path]]:
+    """Names and paths of the templates found by the loaders of the backend, the first one of every name.
+    """
+    names = set()
+    # the cached loader wraps the loaders reading the template directories.
+    loaders = [inner for loader in backend.engine.template_loaders for inner in getattr(loader, 'loaders', [loader])]
+    for loader in loaders:
+        for directory in loader.get_dirs():
+            for path in Path(directory).rglob('*'):
+                name = path.relative_to(directory).as_posix()
+                skipped = not name.startswith(prefix) or name.startswith(SKIPPED_TEMPLATE_PREFIXES)
+                if skipped or name in names or path.suffix not in TEMPLATE_SUFFIXES or not path.is_file():
+                    continue
+                names.add(name)
+                yield name, path
+
+
+def warmup_templates() -> int:
+    """Compile the templates of the template engines and the widget templates of the form renderer.
+
+    Compiled templates are kept by the cached loaders. Returns the number of compiled templates.
+    """
+    count = 0
+    backends = [(backend, '') for backend in engines.all()]
+    # the form renderer engine reads all application directories, only its own templates are used by it.
+    backends.append((get_default_renderer().engine, FORM_TEMPLATE_PREFIX))
+    for backend, prefix in backends:
+        for name, _path in iter_template_files(backend, prefix):
+            try:
+                backend.get_template(name)
+            except TemplateSyntaxError as error:
+                # templates of third party apps may be included only in some configurations.
+                logger.debug('Template %s is not compiled: %s', name, error)
+                continue
+            count += 1
+    return count
+
+
+def warmup_translations() -> int:
+    """Load the translation catalogs of the default language.
+    """
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('')
+    return 1
+
+
+def warmup() -> dict[str, float]:
+    """Pay the one-time costs of the first requests when the application is loaded.
+
+    No database connections are opened, so the application can be loaded before forking workers.
+    Returns the duration of every step in milliseconds.
+    """
+    timings = {}
+    for name, step in (('urls', warmup_urls), ('templates', warmup_templates), ('translations', warmup_translations)):
+        started = time.perf_counter()
+        count = step()
+        timings[name] = (time.perf_counter() - started) * 1000
+        logger.info('Warmed up %d %s in %.1f ms.', count, name, timings[name])
+    return timings
+
+
+def warmup_on_startup() -> None:
+    if settings.WARMUP_ON_STARTUP:
+        warmup()